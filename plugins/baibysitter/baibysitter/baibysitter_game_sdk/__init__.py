@@ -0,0 +1,103 @@
+"""
+Babysitter plugin for the GAME SDK.
+
+The public names below are importable from the package, but each submodule
+(and its dependencies: requests, httpx, game_sdk...) is only imported the
+first time one of its names is used (PEP 562).
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+_EXPORTS = {
+    "ChatAgent": "chat_agent",
+    "Chat": "chat_agent",
+    "ChatStreamEvent": "chat_agent",
+    "AsyncChatAgent": "async_chat_agent",
+    "AsyncChat": "async_chat_agent",
+    "GAMEClientV2": "api_v2",
+    "GAMEAPIError": "api_v2",
+    "PoolConfig": "api_v2",
+    "get_shared_session": "api_v2",
+    "AsyncGAMEClientV2": "async_api_v2",
+    "Babysitter": "baibysitter",
+    "AsyncBabysitter": "baibysitter",
+    "wrap_send_native": "baibysitter",
+    "wrap_send_native_async": "baibysitter",
+    "wrap_transaction_fn": "baibysitter",
+    "wrap_transaction_fn_async": "baibysitter",
+    "ActionSpace": "action_space",
+    "CompactHistoryStore": "history",
+    "HistoryStore": "history",
+    "SessionStore": "sessions",
+    "SQLiteSessionStore": "sessions",
+    "HistorySink": "history_sink",
+    "ChatScheduler": "scheduler",
+    "ShardedRunner": "sharding",
+    "ShardApp": "sharding",
+    "HashRing": "sharding",
+    "VerdictCache": "verdict_cache",
+    "PolicyEngine": "policy",
+    "EndpointPool": "endpoints",
+    "Token": "transactions",
+    "Transaction": "transactions",
+    "ETH": "transactions",
+    "SelectorIndex": "calldata",
+    "ChainReadCache": "chain_cache",
+    "NonceManager": "nonce",
+    "TransactionPreparer": "tx_prep",
+    "TransactionBatcher": "batching",
+    "RetryPolicy": "resilience",
+    "CircuitBreakers": "resilience",
+    "deadline": "resilience",
+    "Compression": "wire",
+    "MetricsRegistry": "metrics",
+    "get_registry": "metrics",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    # la próxima vez lo encuentra sin pasar por __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from baibysitter.baibysitter_game_sdk.action_space import ActionSpace
+    from baibysitter.baibysitter_game_sdk.api_v2 import GAMEAPIError, GAMEClientV2, PoolConfig, get_shared_session
+    from baibysitter.baibysitter_game_sdk.async_api_v2 import AsyncGAMEClientV2
+    from baibysitter.baibysitter_game_sdk.async_chat_agent import AsyncChat, AsyncChatAgent
+    from baibysitter.baibysitter_game_sdk.baibysitter import (
+        AsyncBabysitter,
+        Babysitter,
+        wrap_send_native,
+        wrap_send_native_async,
+        wrap_transaction_fn,
+        wrap_transaction_fn_async,
+    )
+    from baibysitter.baibysitter_game_sdk.batching import TransactionBatcher
+    from baibysitter.baibysitter_game_sdk.calldata import SelectorIndex
+    from baibysitter.baibysitter_game_sdk.chain_cache import ChainReadCache
+    from baibysitter.baibysitter_game_sdk.chat_agent import Chat, ChatAgent, ChatStreamEvent
+    from baibysitter.baibysitter_game_sdk.endpoints import EndpointPool
+    from baibysitter.baibysitter_game_sdk.history import CompactHistoryStore, HistoryStore
+    from baibysitter.baibysitter_game_sdk.history_sink import HistorySink
+    from baibysitter.baibysitter_game_sdk.metrics import MetricsRegistry, get_registry
+    from baibysitter.baibysitter_game_sdk.nonce import NonceManager
+    from baibysitter.baibysitter_game_sdk.policy import PolicyEngine
+    from baibysitter.baibysitter_game_sdk.resilience import CircuitBreakers, RetryPolicy, deadline
+    from baibysitter.baibysitter_game_sdk.scheduler import ChatScheduler
+    from baibysitter.baibysitter_game_sdk.sharding import HashRing, ShardApp, ShardedRunner
+    from baibysitter.baibysitter_game_sdk.sessions import SessionStore, SQLiteSessionStore
+    from baibysitter.baibysitter_game_sdk.transactions import ETH, Token, Transaction
+    from baibysitter.baibysitter_game_sdk.tx_prep import TransactionPreparer
+    from baibysitter.baibysitter_game_sdk.wire import Compression
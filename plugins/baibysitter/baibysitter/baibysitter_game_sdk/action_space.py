@@ -0,0 +1,71 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+
+class ActionSpace(dict):
+    """
+    fn_name -> Function mapping that caches the function definitions sent to
+    the agent on every turn.
+
+    The definitions (and their hash) are rebuilt only when the mapping is
+    mutated. Changing a Function in place can't be detected, call refresh()
+    after doing that.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._defs: Optional[List[Dict[str, Any]]] = None
+        self._hash: Optional[str] = None
+
+    def refresh(self):
+        self._defs = None
+        self._hash = None
+
+    def get_function_defs(self) -> List[Dict[str, Any]]:
+        if self._defs is None:
+            self._defs = [f.get_function_def() for f in self.values()]
+        return self._defs
+
+    @property
+    def hash(self) -> str:
+        """Stable identifier of the current function definitions"""
+        if self._hash is None:
+            encoded = json.dumps(self.get_function_defs(), sort_keys=True, default=str)
+            self._hash = hashlib.sha256(encoded.encode()).hexdigest()
+        return self._hash
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.refresh()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.refresh()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self.refresh()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.refresh()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self.refresh()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self.refresh()
+        return result
+
+    def setdefault(self, key, default=None):
+        result = super().setdefault(key, default)
+        self.refresh()
+        return result
+
+    def clear(self):
+        super().clear()
+        self.refresh()
@@ -1,14 +1,176 @@
-import requests
-from typing import List, Dict
+from __future__ import annotations
+
+import json
+import threading
+from urllib.parse import urlencode
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from baibysitter.baibysitter_game_sdk.lazy import lazy_import
+from baibysitter.baibysitter_game_sdk.metrics import get_registry, SIZE_BUCKETS
+from baibysitter.baibysitter_game_sdk.resilience import RetryPolicy, CircuitBreakers, call_with_retry, bounded_timeout, POST_RETRY_STATUSES
+from baibysitter.baibysitter_game_sdk.wire import Compression, WireEncoder
+
+# requests se importa con el primer cliente, no al importar el paquete
+requests = lazy_import("requests")
+adapters = lazy_import("requests.adapters")
+urllib3_exceptions = lazy_import("urllib3.exceptions")
+
+
+DEFAULT_BASE_URL = "https://sdk.game.virtuals.io/v2"
+# respuesta de update_chat en modo streaming: un evento JSON por línea
+STREAM_CONTENT_TYPE = "application/x-ndjson"
+
+
+class GAMEAPIError(ValueError):
+    """Non-200 answer from the GAME API (status_code has the HTTP status)"""
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PoolConfig:
+    """
+    Connection pool settings for the GAME API transport.
+
+    pool_connections: number of per-host pools kept alive
+    pool_maxsize: max connections kept open to a single host
+    pool_block: when True, callers wait for a free connection instead of
+        opening extra ones beyond pool_maxsize (hard per-host cap)
+    """
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 100,
+        pool_block: bool = True,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.read_timeout)
+
+
+def is_connect_error(exc: BaseException) -> bool:
+    """
+    True if exc happened while connecting, so the request never reached the
+    server. requests raises ConnectionError also when the server drops the
+    connection after the body was sent (RemoteDisconnected, ProtocolError).
+    """
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    # urllib3 queda envuelto en MaxRetryError (reason) o en los args/causa
+    pending, seen = [exc], set()
+    while pending:
+        error = pending.pop()
+        if error is None or id(error) in seen:
+            continue
+        seen.add(id(error))
+        if isinstance(error, urllib3_exceptions.NewConnectionError):
+            return True
+        pending += [error.__cause__, error.__context__, getattr(error, "reason", None)]
+        pending += [arg for arg in error.args if isinstance(arg, BaseException)]
+    return False
+
+
+def create_session(config: Optional[PoolConfig] = None) -> requests.Session:
+    """
+    Creates a keep-alive session with a bounded connection pool
+    """
+    config = config or PoolConfig()
+    adapter = adapters.HTTPAdapter(
+        pool_connections=config.pool_connections,
+        pool_maxsize=config.pool_maxsize,
+        pool_block=config.pool_block,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session(config: Optional[PoolConfig] = None) -> requests.Session:
+    """
+    Returns the process-wide session so many clients (and ChatAgents) reuse
+    the same connection pool. config only applies on first call.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session(config)
+        return _shared_session
+
+
+# partes fijas de las rutas, el resto (ids) se agrupa en ":id" para las métricas
+_STATIC_PATH_PARTS = {"agents", "tasks", "next", "actions", "maps", "conversation", "function", "result", "results", "end", "history", "batch"}
+
+
+def endpoint_label(path: str) -> str:
+    return "/".join(
+        part if not part or part in _STATIC_PATH_PARTS else ":id"
+        for part in path.split("/")
+    )
+
+
+def history_query(offset: Optional[int] = None, limit: Optional[int] = None) -> str:
+    params = {name: value for name, value in (("offset", offset), ("limit", limit)) if value is not None}
+    return f"?{urlencode(params)}" if params else ""
+
+
+def is_stream_response(headers) -> bool:
+    return headers.get("Content-Type", "").split(";")[0].strip() == STREAM_CONTENT_TYPE
+
 
 class GAMEClientV2:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        session: Optional[requests.Session] = None,
+        pool_config: Optional[PoolConfig] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        compression: Optional[Compression] = None,
+        post_retry_policy: Optional[RetryPolicy] = None,
+        endpoint_retry: Optional[Dict[str, RetryPolicy]] = None,
+    ):
         self.api_key = api_key
-        self.base_url = "https://sdk.game.virtuals.io/v2"
+        self.base_url = base_url
         self.headers = {
             "Content-Type": "application/json",
             "x-api-key": self.api_key
         }
+        self.wire = WireEncoder(compression, "game")
+        self.pool_config = pool_config or PoolConfig()
+        # si no nos pasan una sesión creamos una propia (y la cerramos en close)
+        self._owns_session = session is None
+        self.session = session or create_session(self.pool_config)
+        # GETs
+        self.retry_policy = retry_policy or RetryPolicy(
+            retry_exceptions=(requests.ConnectionError, requests.Timeout)
+        )
+        # POSTs: solo lo que seguro no llegó al servidor, salvo que el endpoint
+        # (ver endpoint_label) tenga su propia política en endpoint_retry
+        self.post_retry_policy = post_retry_policy or RetryPolicy(
+            retry_statuses=POST_RETRY_STATUSES,
+            retry_exceptions=(requests.ConnectionError,),
+            retry_if=is_connect_error,
+        )
+        self.endpoint_retry = endpoint_retry or {}
+        # un circuit breaker por endpoint (ver endpoint_label)
+        self.breakers = breakers or CircuitBreakers()
+
+    def close(self):
+        if self._owns_session:
+            self.session.close()
 
     def create_agent(self, name: str, description: str, goal: str) -> str:
         """
@@ -22,11 +184,7 @@ class GAMEClientV2:
             }
         }
 
-        response = requests.post(
-            f"{self.base_url}/agents",
-            headers=self.headers,
-            json=payload
-        )
+        response = self._post("/agents", payload)
 
         return self._get_response_body(response)["id"]
 
@@ -43,11 +201,7 @@ class GAMEClientV2:
             }
         }
 
-        response = requests.post(
-            f"{self.base_url}/maps",
-            headers=self.headers,
-            json=payload
-        )
+        response = self._post("/maps", payload)
 
         return self._get_response_body(response)["id"]
 
@@ -61,11 +215,7 @@ class GAMEClientV2:
             }
         }
 
-        response = requests.post(
-            f"{self.base_url}/agents/{agent_id}/tasks",
-            headers=self.headers,
-            json=payload
-        )
+        response = self._post(f"/agents/{agent_id}/tasks", payload)
 
         return self._get_response_body(response)
 
@@ -73,16 +223,14 @@ class GAMEClientV2:
         """
         API call to get worker actions (for standalone worker)
         """
-        response = requests.post(
-            f"{self.base_url}/agents/{agent_id}/tasks/{submission_id}/next",
-            headers=self.headers | {"model_name": model_name},
-            json={
-                "data": data
-            }
+        response = self._post(
+            f"/agents/{agent_id}/tasks/{submission_id}/next",
+            {"data": data},
+            headers={"model_name": model_name},
         )
 
         if response.status_code != 200:
-            raise ValueError(f"Failed to get worker action (status {response.status_code}). Response: {response.text}")
+            raise GAMEAPIError(f"Failed to get worker action (status {response.status_code}). Response: {response.text}", response.status_code)
 
         response_json = response.json()
 
@@ -92,105 +240,192 @@ class GAMEClientV2:
         """
         API call to get agent actions/next step (for agent)
         """
-        response = requests.post(
-            f"{self.base_url}/agents/{agent_id}/actions",
-            headers=self.headers | {"model_name": model_name},
-            json={
-                "data": data
-            }
+        response = self._post(
+            f"/agents/{agent_id}/actions",
+            {"data": data},
+            headers={"model_name": model_name},
         )
 
         if response.status_code != 200:
-            raise ValueError(f"Failed to get agent action (status {response.status_code}). Response: {response.text}")
+            raise GAMEAPIError(f"Failed to get agent action (status {response.status_code}). Response: {response.text}", response.status_code)
 
         response_json = response.json()
 
         return response_json["data"]
-    
+
     def create_chat(self, data: dict) -> str:
-        response = requests.post(
-            f"{self.base_url}/conversation",
-            headers=self.headers,
-            json={
-                "data": data
-            }
-        )
-        
+        response = self._post("/conversation", {"data": data})
+
         chat_id = self._get_response_body(response).get("conversation_id")
         if not chat_id:
             raise Exception("Agent did not return a conversation_id for the chat.")
         return chat_id
-    
+
     def update_chat(self, conversation_id: str, data: dict) -> dict:
-        response = requests.post(
-            f"{self.base_url}/conversation/{conversation_id}/next",
-            headers=self.headers,
-            json={
-                "data": data
-            }
-        )
-        
+        response = self._post(f"/conversation/{conversation_id}/next", {"data": data})
+
         if response.status_code != 200:
-            raise ValueError(f"Failed to update conversation (status {response.status_code}). Response: {response.text}")
+            raise GAMEAPIError(f"Failed to update conversation (status {response.status_code}). Response: {response.text}", response.status_code)
 
         response_json = response.json()
 
         return response_json["data"]
-    
-    def report_function(self, conversation_id: str, data: dict) -> dict:
-        response = requests.post(
-            f"{self.base_url}/conversation/{conversation_id}/function/result",
-            headers=self.headers,
-            json={
-                "data": data
-            }
+
+    def stream_chat(self, conversation_id: str, data: dict) -> Iterator[Dict[str, Any]]:
+        """
+        Like update_chat but asks for a streamed (NDJSON) response and returns
+        an iterator of the events as they arrive:
+
+            {"type": "message_delta", "content": str}
+            {"type": "function_call", "function_call": {"id", "fn_name", "args"}}
+            {"type": "done", "data": {...same body as update_chat...}}
+
+        A server that answers with plain JSON yields a single "done" event.
+        The request is sent and its status checked before returning
+        """
+        path = f"/conversation/{conversation_id}/next"
+        response = self._post(
+            path,
+            {"data": {**data, "stream": True}},
+            headers={"Accept": f"{STREAM_CONTENT_TYPE}, application/json"},
+            stream=True,
         )
 
+        if response.status_code != 200:
+            raise GAMEAPIError(f"Failed to update conversation (status {response.status_code}). Response: {response.text}", response.status_code)
+
+        if not is_stream_response(response.headers):
+            return iter([{"type": "done", "data": response.json()["data"]}])
+        return self._iter_events(response, endpoint_label(path))
+
+    def _iter_events(self, response: requests.Response, endpoint: str) -> Iterator[Dict[str, Any]]:
+        size = 0
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                size += len(line)
+                yield json.loads(line)
+        finally:
+            response.close()
+            get_registry().observe("game_response_bytes", size, buckets=SIZE_BUCKETS, endpoint=endpoint)
+
+    def report_function(self, conversation_id: str, data: dict) -> dict:
+        response = self._post(f"/conversation/{conversation_id}/function/result", {"data": data})
+
+        return self._get_response_body(response)
+
+    def report_functions(self, conversation_id: str, data: dict) -> dict:
+        """
+        Reports the results of several function calls of one turn at once
+        data: {"results": [{"fn_id": str, "result": str}, ...]}
+        """
+        response = self._post(f"/conversation/{conversation_id}/function/results", {"data": data})
+
         return self._get_response_body(response)
-    
+
     def end_chat(self, conversation_id: str, data: dict) -> dict:
-        response = requests.post(
-            f"{self.base_url}/conversation/{conversation_id}/end",
-            headers=self.headers,
-            json={
-                "data": data
-            }
-        )
+        response = self._post(f"/conversation/{conversation_id}/end", {"data": data})
 
         return self._get_response_body(response)
-    
+
     def save_message(self, conversation_id: str, message: dict) -> dict:
         """
         Guarda un mensaje en el historial de la conversación
-        message debe contener: 
+        message debe contener:
         {
             "role": "user" | "assistant",
             "content": str
         }
         """
-        response = requests.post(
-            f"{self.base_url}/conversation/{conversation_id}/history",
-            headers=self.headers,
-            json={
-                "data": message
-            }
-        )
+        response = self._post(f"/conversation/{conversation_id}/history", {"data": message})
         return self._get_response_body(response)
 
-    def get_chat_history(self, conversation_id: str) -> List[dict]:
+    def save_messages(self, conversation_id: str, messages: List[dict]) -> dict:
         """
-        Obtiene todo el historial de la conversación
+        Guarda varios mensajes del historial en una sola llamada, en orden.
+        Cada mensaje: {"role": ..., "content": ..., "seq": int}
         """
-        response = requests.get(
-            f"{self.base_url}/conversation/{conversation_id}/history",
-            headers=self.headers
-        )
+        response = self._post(f"/conversation/{conversation_id}/history/batch", {"data": {"messages": messages}})
+        return self._get_response_body(response)
+
+    def get_chat_history(
+        self,
+        conversation_id: str,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        """
+        Obtiene el historial de la conversación (todo, o la página offset/limit)
+        """
+        response = self._get(f"/conversation/{conversation_id}/history{history_query(offset, limit)}")
         return self._get_response_body(response).get("messages", [])
-    
+
+    def _post(
+        self,
+        path: str,
+        payload: dict,
+        headers: Optional[dict] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        metrics = get_registry()
+        endpoint = endpoint_label(path)
+        body, sent, sent_headers = self.wire.encode(payload, self.headers | headers if headers else self.headers)
+        metrics.observe("game_request_bytes", len(sent), buckets=SIZE_BUCKETS, endpoint=endpoint)
+        with metrics.timer("game_request_seconds", endpoint=endpoint):
+            response = self._send_post(path, endpoint, sent, sent_headers, stream)
+            if self.wire.rejected(response.status_code, sent_headers):
+                # el servidor no acepta cuerpos comprimidos, va sin comprimir
+                response.close()
+                sent_headers = {k: v for k, v in sent_headers.items() if k != "Content-Encoding"}
+                response = self._send_post(path, endpoint, body, sent_headers, stream)
+        # en streaming el cuerpo se cuenta mientras se lee (ver _iter_events)
+        if not stream:
+            metrics.observe("game_response_bytes", len(response.content), buckets=SIZE_BUCKETS, endpoint=endpoint)
+        return response
+
+    def _send_post(self, path: str, endpoint: str, body: bytes, headers: dict, stream: bool) -> requests.Response:
+        return call_with_retry(
+            lambda: self.session.post(
+                f"{self.base_url}{path}",
+                headers=headers,
+                data=body,
+                timeout=self._timeout(),
+                stream=stream,
+            ),
+            self.endpoint_retry.get(endpoint, self.post_retry_policy),
+            self.breakers.get(endpoint),
+            endpoint,
+        )
+
+    def _get(self, path: str) -> requests.Response:
+        metrics = get_registry()
+        endpoint = endpoint_label(path)
+        with metrics.timer("game_request_seconds", endpoint=endpoint):
+            response = call_with_retry(
+                lambda: self.session.get(
+                    f"{self.base_url}{path}",
+                    headers=self.headers,
+                    timeout=self._timeout(),
+                ),
+                self.retry_policy,
+                self.breakers.get(endpoint),
+                endpoint,
+            )
+        metrics.observe("game_response_bytes", len(response.content), buckets=SIZE_BUCKETS, endpoint=endpoint)
+        return response
+
+    def _timeout(self) -> Tuple[float, float]:
+        # los timeouts nunca pasan del deadline del turno
+        return (
+            bounded_timeout(self.pool_config.connect_timeout),
+            bounded_timeout(self.pool_config.read_timeout),
+        )
+
     def _get_response_body(self, response: requests.Response) -> dict:
         if response.status_code != 200:
-            raise ValueError(f"Failed to get response body (status {response.status_code}). Response: {response.text}")
+            raise GAMEAPIError(f"Failed to get response body (status {response.status_code}). Response: {response.text}", response.status_code)
 
         response_json = response.json()
 
-        return response_json["data"]
\ No newline at end of file
+        return response_json["data"]
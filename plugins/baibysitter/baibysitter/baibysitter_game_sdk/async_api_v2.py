@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+from baibysitter.baibysitter_game_sdk.api_v2 import (
+    DEFAULT_BASE_URL,
+    GAMEAPIError,
+    STREAM_CONTENT_TYPE,
+    PoolConfig,
+    endpoint_label,
+    history_query,
+    is_stream_response,
+)
+from baibysitter.baibysitter_game_sdk.lazy import lazy_import
+from baibysitter.baibysitter_game_sdk.metrics import get_registry, SIZE_BUCKETS
+from baibysitter.baibysitter_game_sdk.resilience import RetryPolicy, CircuitBreakers, acall_with_retry, bounded_timeout, POST_RETRY_STATUSES
+from baibysitter.baibysitter_game_sdk.wire import Compression, WireEncoder
+
+httpx = lazy_import("httpx")
+
+
+def create_async_client(config: Optional[PoolConfig] = None) -> httpx.AsyncClient:
+    """
+    Creates a keep-alive httpx.AsyncClient with the same limits as the sync pool
+    """
+    config = config or PoolConfig()
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.pool_maxsize,
+            max_keepalive_connections=config.pool_maxsize,
+        ),
+        timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+    )
+
+
+class AsyncGAMEClientV2:
+    """
+    asyncio version of GAMEClientV2, same methods but awaitable
+    """
+    def __init__(
+        self,
+        api_key: str,
+        client: Optional[httpx.AsyncClient] = None,
+        pool_config: Optional[PoolConfig] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        compression: Optional[Compression] = None,
+        post_retry_policy: Optional[RetryPolicy] = None,
+        endpoint_retry: Optional[Dict[str, RetryPolicy]] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.headers = {
+            "Content-Type": "application/json",
+            "x-api-key": self.api_key
+        }
+        self.wire = WireEncoder(compression, "game")
+        self.pool_config = pool_config or PoolConfig()
+        self._owns_client = client is None
+        self.http = client or create_async_client(self.pool_config)
+        self.retry_policy = retry_policy or RetryPolicy(retry_exceptions=(httpx.TransportError,))
+        # POSTs: solo lo que seguro no llegó al servidor (ver GAMEClientV2)
+        self.post_retry_policy = post_retry_policy or RetryPolicy(
+            retry_statuses=POST_RETRY_STATUSES,
+            retry_exceptions=(httpx.ConnectError, httpx.ConnectTimeout),
+        )
+        self.endpoint_retry = endpoint_retry or {}
+        self.breakers = breakers or CircuitBreakers()
+
+    async def aclose(self):
+        if self._owns_client:
+            await self.http.aclose()
+
+    async def create_agent(self, name: str, description: str, goal: str) -> str:
+        payload = {
+            "data": {
+                "name": name,
+                "goal": goal,
+                "description": description
+            }
+        }
+
+        response = await self._post("/agents", payload)
+
+        return self._get_response_body(response)["id"]
+
+    async def create_workers(self, workers: List) -> str:
+        payload = {
+            "data": {
+                "locations": [
+                    {"id": w.id, "name": w.id, "description": w.worker_description}
+                    for w in workers
+                ]
+            }
+        }
+
+        response = await self._post("/maps", payload)
+
+        return self._get_response_body(response)["id"]
+
+    async def set_worker_task(self, agent_id: str, task: str) -> Dict:
+        response = await self._post(f"/agents/{agent_id}/tasks", {"data": {"task": task}})
+
+        return self._get_response_body(response)
+
+    async def get_worker_action(self, agent_id: str, submission_id: str, data: dict, model_name: str) -> Dict:
+        response = await self._post(
+            f"/agents/{agent_id}/tasks/{submission_id}/next",
+            {"data": data},
+            headers={"model_name": model_name},
+        )
+
+        if response.status_code != 200:
+            raise GAMEAPIError(f"Failed to get worker action (status {response.status_code}). Response: {response.text}", response.status_code)
+
+        return response.json()["data"]
+
+    async def get_agent_action(self, agent_id: str, data: dict, model_name: str) -> Dict:
+        response = await self._post(
+            f"/agents/{agent_id}/actions",
+            {"data": data},
+            headers={"model_name": model_name},
+        )
+
+        if response.status_code != 200:
+            raise GAMEAPIError(f"Failed to get agent action (status {response.status_code}). Response: {response.text}", response.status_code)
+
+        return response.json()["data"]
+
+    async def create_chat(self, data: dict) -> str:
+        response = await self._post("/conversation", {"data": data})
+
+        chat_id = self._get_response_body(response).get("conversation_id")
+        if not chat_id:
+            raise Exception("Agent did not return a conversation_id for the chat.")
+        return chat_id
+
+    async def update_chat(self, conversation_id: str, data: dict) -> dict:
+        response = await self._post(f"/conversation/{conversation_id}/next", {"data": data})
+
+        if response.status_code != 200:
+            raise GAMEAPIError(f"Failed to update conversation (status {response.status_code}). Response: {response.text}", response.status_code)
+
+        return response.json()["data"]
+
+    async def stream_chat(self, conversation_id: str, data: dict) -> AsyncIterator[Dict[str, Any]]:
+        """Same events as GAMEClientV2.stream_chat, as an async iterator"""
+        path = f"/conversation/{conversation_id}/next"
+        response = await self._post(
+            path,
+            {"data": {**data, "stream": True}},
+            headers={"Accept": f"{STREAM_CONTENT_TYPE}, application/json"},
+            stream=True,
+        )
+
+        if response.status_code != 200:
+            await response.aread()
+            await response.aclose()
+            raise GAMEAPIError(f"Failed to update conversation (status {response.status_code}). Response: {response.text}", response.status_code)
+
+        if not is_stream_response(response.headers):
+            await response.aread()
+            await response.aclose()
+            return self._single_event({"type": "done", "data": response.json()["data"]})
+        return self._iter_events(response, endpoint_label(path))
+
+    async def _single_event(self, event: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        yield event
+
+    async def _iter_events(self, response: httpx.Response, endpoint: str) -> AsyncIterator[Dict[str, Any]]:
+        size = 0
+        try:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                size += len(line)
+                yield json.loads(line)
+        finally:
+            await response.aclose()
+            get_registry().observe("game_response_bytes", size, buckets=SIZE_BUCKETS, endpoint=endpoint)
+
+    async def report_function(self, conversation_id: str, data: dict) -> dict:
+        response = await self._post(f"/conversation/{conversation_id}/function/result", {"data": data})
+
+        return self._get_response_body(response)
+
+    async def report_functions(self, conversation_id: str, data: dict) -> dict:
+        response = await self._post(f"/conversation/{conversation_id}/function/results", {"data": data})
+
+        return self._get_response_body(response)
+
+    async def end_chat(self, conversation_id: str, data: dict) -> dict:
+        response = await self._post(f"/conversation/{conversation_id}/end", {"data": data})
+
+        return self._get_response_body(response)
+
+    async def save_message(self, conversation_id: str, message: dict) -> dict:
+        response = await self._post(f"/conversation/{conversation_id}/history", {"data": message})
+        return self._get_response_body(response)
+
+    async def save_messages(self, conversation_id: str, messages: List[dict]) -> dict:
+        response = await self._post(f"/conversation/{conversation_id}/history/batch", {"data": {"messages": messages}})
+        return self._get_response_body(response)
+
+    async def get_chat_history(
+        self,
+        conversation_id: str,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[dict]:
+        response = await self._get(f"/conversation/{conversation_id}/history{history_query(offset, limit)}")
+        return self._get_response_body(response).get("messages", [])
+
+    async def _post(
+        self,
+        path: str,
+        payload: dict,
+        headers: Optional[dict] = None,
+        stream: bool = False,
+    ) -> httpx.Response:
+        metrics = get_registry()
+        endpoint = endpoint_label(path)
+        body, sent, sent_headers = self.wire.encode(payload, self.headers | headers if headers else self.headers)
+        metrics.observe("game_request_bytes", len(sent), buckets=SIZE_BUCKETS, endpoint=endpoint)
+        with metrics.timer("game_request_seconds", endpoint=endpoint):
+            response = await self._send_post(path, endpoint, sent, sent_headers, stream)
+            if self.wire.rejected(response.status_code, sent_headers):
+                await response.aclose()
+                sent_headers = {k: v for k, v in sent_headers.items() if k != "Content-Encoding"}
+                response = await self._send_post(path, endpoint, body, sent_headers, stream)
+        if not stream:
+            metrics.observe("game_response_bytes", len(response.content), buckets=SIZE_BUCKETS, endpoint=endpoint)
+        return response
+
+    async def _send_post(self, path: str, endpoint: str, body: bytes, headers: dict, stream: bool) -> httpx.Response:
+        return await acall_with_retry(
+            lambda: self.http.send(
+                self.http.build_request(
+                    "POST",
+                    f"{self.base_url}{path}",
+                    headers=headers,
+                    content=body,
+                    timeout=self._timeout(),
+                ),
+                stream=stream,
+            ),
+            self.endpoint_retry.get(endpoint, self.post_retry_policy),
+            self.breakers.get(endpoint),
+            endpoint,
+        )
+
+    async def _get(self, path: str) -> httpx.Response:
+        metrics = get_registry()
+        endpoint = endpoint_label(path)
+        with metrics.timer("game_request_seconds", endpoint=endpoint):
+            response = await acall_with_retry(
+                lambda: self.http.get(f"{self.base_url}{path}", headers=self.headers, timeout=self._timeout()),
+                self.retry_policy,
+                self.breakers.get(endpoint),
+                endpoint,
+            )
+        metrics.observe("game_response_bytes", len(response.content), buckets=SIZE_BUCKETS, endpoint=endpoint)
+        return response
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            bounded_timeout(self.pool_config.read_timeout),
+            connect=bounded_timeout(self.pool_config.connect_timeout),
+        )
+
+    def _get_response_body(self, response: httpx.Response) -> dict:
+        if response.status_code != 200:
+            raise GAMEAPIError(f"Failed to get response body (status {response.status_code}). Response: {response.text}", response.status_code)
+
+        return response.json()["data"]
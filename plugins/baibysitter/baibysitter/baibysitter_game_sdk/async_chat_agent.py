@@ -0,0 +1,352 @@
+import asyncio
+import inspect
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from baibysitter.baibysitter_game_sdk.custom_types import (
+    ChatResponse,
+    FunctionCall,
+    FunctionCallResponse,
+    FunctionResult,
+    FunctionResultStatus,
+    GameChatResponse,
+    Function,
+)
+from baibysitter.baibysitter_game_sdk.api_v2 import DEFAULT_BASE_URL, GAMEAPIError, PoolConfig
+from baibysitter.baibysitter_game_sdk.async_api_v2 import AsyncGAMEClientV2
+from baibysitter.baibysitter_game_sdk.chat_agent import (
+    END_FLUSH_TIMEOUT,
+    Chat,
+    ChatStreamEvent,
+    _StreamTurn,
+    load_session_history,
+    session_meta,
+)
+from baibysitter.baibysitter_game_sdk.function_calls import SerialKey, arun_function_calls
+from baibysitter.baibysitter_game_sdk.history import HistoryStore
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+from baibysitter.baibysitter_game_sdk.resilience import aiter_within, deadline, deadline_at
+from baibysitter.baibysitter_game_sdk.sessions import SessionStore
+from baibysitter.baibysitter_game_sdk.history_sink import BATCH_UNSUPPORTED_STATUSES, HistorySink
+from baibysitter.baibysitter_game_sdk.wire import Compression
+
+if TYPE_CHECKING:
+    import httpx
+
+
+async def execute_function(fn: Function, fn_id: str, args: Dict[str, Any]) -> FunctionResult:
+    """
+    Runs a Function from the event loop: coroutine executables are awaited,
+    sync ones are offloaded to a thread so they don't block other chats
+    """
+    if not inspect.iscoroutinefunction(fn.executable):
+        return await asyncio.to_thread(fn.execute, fn_id=fn_id, args=args)
+
+    # mismo procesado de argumentos que Function.execute
+    processed_args = {
+        name: value["value"] if isinstance(value, dict) and "value" in value else value
+        for name, value in (args or {}).items()
+    }
+    try:
+        status, feedback, info = await fn.executable(**processed_args)
+        return FunctionResult(
+            action_id=fn_id,
+            action_status=status,
+            feedback_message=feedback,
+            info=info,
+        )
+    except Exception as e:
+        return FunctionResult(
+            action_id=fn_id,
+            action_status=FunctionResultStatus.FAILED,
+            feedback_message=f"Error executing function: {str(e)}",
+            info={},
+        )
+
+
+class AsyncChat(Chat):
+    """
+    Chat driven by an event loop. Same API as Chat but next/end are awaitable
+    """
+    def __init__(
+        self,
+        conversation_id: str,
+        client: AsyncGAMEClientV2,
+        action_space: Optional[List[Function]] = None,
+        get_state_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+        history_store: Optional[HistoryStore] = None,
+        send_functions_hash: bool = False,
+        max_parallel_calls: int = 4,
+        serial_keys: Optional[Dict[str, SerialKey]] = None,
+        session_store: Optional[SessionStore] = None,
+        history_sink: Optional[HistorySink] = None,
+        state_diff: bool = False,
+    ):
+        super().__init__(
+            conversation_id,
+            client,
+            action_space,
+            get_state_fn,
+            history_store,
+            send_functions_hash,
+            max_parallel_calls,
+            serial_keys,
+            session_store,
+            history_sink,
+            state_diff,
+        )
+
+    async def next(self, message: str, timeout: Optional[float] = None) -> ChatResponse:
+        with deadline(timeout), get_registry().timer("chat_turn_seconds"):
+            try:
+                return await self._next(message)
+            finally:
+                await self._acheckpoint()
+
+    async def _acheckpoint(self):
+        if self.session_store is not None:
+            await asyncio.to_thread(self._auto_checkpoint)
+
+    async def _aadd_message(self, role: str, content: str):
+        """_add_message that never blocks the event loop on a full history sink"""
+        seq = self.history.total
+        self.history.append(role, content)
+        if self.history_sink is not None and not self.history_sink.add(self.chat_id, role, content, seq, block=False):
+            # el sink está lleno: se espera en un hilo, no en el event loop
+            await asyncio.to_thread(self.history_sink.add, self.chat_id, role, content, seq)
+
+    async def _astore_streamed(self, turn: _StreamTurn):
+        text = turn.take_message()
+        if text:
+            await self._aadd_message("assistant", text)
+
+    async def _next(self, message: str) -> ChatResponse:
+        metrics = get_registry()
+        await self._aadd_message("user", message)
+
+        with metrics.timer("chat_phase_seconds", phase="update_chat"):
+            convo_response, function_calls = await self._update_conversation(message)
+
+        if convo_response.message:
+            await self._aadd_message("assistant", convo_response.message)
+
+        if len(function_calls) > 1:
+            results = await arun_function_calls(
+                function_calls,
+                self._execute_function_call,
+                self.max_parallel_calls,
+                self.serial_keys,
+            )
+            with metrics.timer("chat_phase_seconds", phase="report_function"):
+                response_message = await self._report_function_results(results)
+            return self._multi_response(convo_response, function_calls, results, response_message)
+
+        if convo_response.function_call:
+            fn_name = convo_response.function_call.fn_name
+            result = await self._execute_function_call(convo_response.function_call)
+            with metrics.timer("chat_phase_seconds", phase="report_function"):
+                response_message = await self._report_function_result(result)
+            function_call_response = FunctionCallResponse(
+                fn_name=fn_name,
+                fn_args=convo_response.function_call.args,
+                result=result,
+            )
+        else:
+            response_message = convo_response.message or ""
+            function_call_response = None
+
+        return ChatResponse(
+            message=response_message,
+            is_finished=convo_response.is_finished,
+            function_call=function_call_response,
+        )
+
+    async def stream_next(self, message: str, timeout: Optional[float] = None) -> AsyncIterator[ChatStreamEvent]:
+        """Async generator version of Chat.stream_next"""
+        events = aiter_within(self._stream_next(message), deadline_at(timeout))
+        with get_registry().timer("chat_turn_seconds"):
+            try:
+                async for event in events:
+                    yield event
+            finally:
+                await events.aclose()
+                await self._acheckpoint()
+
+    async def _stream_next(self, message: str) -> AsyncIterator[ChatStreamEvent]:
+        metrics = get_registry()
+        turn = _StreamTurn()
+        await self._aadd_message("user", message)
+
+        with metrics.timer("chat_phase_seconds", phase="update_chat"):
+            events = await self._send_update(self.client.stream_chat, message)
+
+        async for event in events:
+            if event.get("type") == "done":
+                self._ack_state(event.get("data") or {})
+            content, calls = turn.read(event)
+            if content:
+                yield ChatStreamEvent("message_delta", content=content)
+            for function_call in calls:
+                yield ChatStreamEvent("function_call", function_call=function_call)
+            if calls and not turn.results:
+                await self._astore_streamed(turn)
+                first = turn.function_calls[0]
+                turn.results.append(await self._execute_function_call(first))
+                yield ChatStreamEvent("function_result", function_call=first, result=turn.results[0])
+
+        await self._astore_streamed(turn)
+
+        pending = turn.pending
+        if pending:
+            results = await arun_function_calls(
+                pending,
+                self._execute_function_call,
+                self.max_parallel_calls,
+                self.serial_keys,
+            )
+            turn.results.extend(results)
+            for function_call, result in zip(pending, results):
+                yield ChatStreamEvent("function_result", function_call=function_call, result=result)
+
+        report_message = None
+        if turn.function_calls:
+            with metrics.timer("chat_phase_seconds", phase="report_function"):
+                if len(turn.results) > 1:
+                    report_message = await self._report_function_results(turn.results)
+                else:
+                    report_message = await self._report_function_result(turn.results[0])
+            yield ChatStreamEvent("message_delta", content=report_message)
+
+        yield ChatStreamEvent("done", response=turn.response(report_message))
+
+    async def end(self, message: Optional[str] = None, flush_timeout: Optional[float] = END_FLUSH_TIMEOUT):
+        if self.history_sink is not None:
+            self._flushed(await asyncio.to_thread(self.history_sink.flush, self.chat_id, flush_timeout))
+        await self.client.end_chat(
+            self.chat_id,
+            {
+                "message": message,
+            },
+        )
+
+    async def _update_conversation(self, message: str) -> Tuple[GameChatResponse, List[FunctionCall]]:
+        return self._parse_update(await self._send_update(self.client.update_chat, message))
+
+    async def _send_update(self, send: Callable[[str, Dict[str, Any]], Awaitable[Any]], message: str) -> Any:
+        data = self._build_update_data(message)
+        try:
+            result = await send(self.chat_id, data)
+        except GAMEAPIError as e:
+            if not self._needs_full_payload(data, e):
+                raise
+            data = self._with_full_payload(data)
+            result = await send(self.chat_id, data)
+        self._sent_functions_hash = data.get("functions_hash")
+        if isinstance(result, dict):
+            self._ack_state(result)
+        return result
+
+    async def _execute_function_call(self, function_call: FunctionCall) -> FunctionResult:
+        fn_to_call = self._get_function(function_call.fn_name)
+        with get_registry().timer("chat_phase_seconds", phase="action", fn_name=function_call.fn_name):
+            return await execute_function(fn_to_call, function_call.id, function_call.args)
+
+    async def _report_function_result(self, result: FunctionResult) -> str:
+        response = await self.client.report_function(self.chat_id, self._build_report_data(result))
+        return self._get_report_message(response)
+
+    async def _report_function_results(self, results: List[FunctionResult]) -> str:
+        if self._batch_reports:
+            try:
+                response = await self.client.report_functions(self.chat_id, self._build_batch_report_data(results))
+                return self._get_report_message(response)
+            except GAMEAPIError as e:
+                if e.status_code not in BATCH_UNSUPPORTED_STATUSES:
+                    raise
+                self._batch_reports = False
+        message = ""
+        for result in results:
+            message = await self._report_function_result(result)
+        return message
+
+
+class AsyncChatAgent:
+    def __init__(
+        self,
+        api_key: str,
+        prompt: str,
+        client: Optional["httpx.AsyncClient"] = None,
+        pool_config: Optional[PoolConfig] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        session_store: Optional[SessionStore] = None,
+        history_sink: Optional[HistorySink] = None,
+        compression: Optional[Compression] = None,
+        state_diff: bool = False,
+    ):
+        self._api_key = api_key
+        self.prompt = prompt
+        self.session_store = session_store
+        self.history_sink = history_sink
+        self.state_diff = state_diff
+
+        # pasar el mismo httpx.AsyncClient para compartir el pool entre agentes
+        if api_key.startswith("apt-"):
+            self.client = AsyncGAMEClientV2(
+                api_key, client=client, pool_config=pool_config, base_url=base_url, compression=compression
+            )
+        else:
+            raise Exception("Please use V2 API key to use ChatAgent")
+
+    async def create_chat(
+        self,
+        partner_id: str,
+        partner_name: str,
+        action_space: Optional[List[Function]] = None,
+        get_state_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+        history_store: Optional[HistoryStore] = None,
+    ) -> AsyncChat:
+
+        chat_id = await self.client.create_chat(
+            {
+                "prompt": self.prompt,
+                "partner_id": partner_id,
+                "partner_name": partner_name,
+            },
+        )
+
+        if self.session_store is not None:
+            await asyncio.to_thread(self.session_store.save_session, chat_id, session_meta(partner_id, partner_name))
+        return AsyncChat(
+            chat_id,
+            self.client,
+            action_space,
+            get_state_fn,
+            history_store,
+            session_store=self.session_store,
+            history_sink=self.history_sink,
+            state_diff=self.state_diff,
+        )
+
+    async def resume_chat(
+        self,
+        chat_id: str,
+        action_space: Optional[List[Function]] = None,
+        get_state_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+        history_store: Optional[HistoryStore] = None,
+        recent: int = 50,
+    ) -> AsyncChat:
+        """Same as ChatAgent.resume_chat"""
+        history, session_store = await asyncio.to_thread(
+            load_session_history, self.session_store, chat_id, history_store, recent
+        )
+        return AsyncChat(
+            chat_id,
+            self.client,
+            action_space,
+            get_state_fn,
+            history,
+            session_store=session_store,
+            history_sink=self.history_sink,
+            state_diff=self.state_diff,
+        )
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -1,68 +1,738 @@
-import httpx
-from decimal import Decimal
-from typing import Dict, Any, Tuple, Optional, List
-from baibysitter.baibysitter_game_sdk.custom_types import FunctionResultStatus, AgentMessage
-from baibysitter.baibysitter_game_sdk.chat_agent import Chat
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, Callable, Tuple, Optional, List, Sequence, Union
+from baibysitter.baibysitter_game_sdk.lazy import lazy_import
+from baibysitter.baibysitter_game_sdk.context import ConversationContext
+from baibysitter.baibysitter_game_sdk.verdict_cache import VerdictCache
+from baibysitter.baibysitter_game_sdk.chain_cache import ChainReadCache
+from baibysitter.baibysitter_game_sdk.policy import PolicyDecision, PolicyEngine, SpendReservation, APPROVE, ESCALATE, REJECT
+from baibysitter.baibysitter_game_sdk.endpoints import Endpoint, EndpointPool, LEAST_OUTSTANDING
+from baibysitter.baibysitter_game_sdk.transactions import ETH, Token, Transaction, same_token
+from baibysitter.baibysitter_game_sdk.calldata import DEFAULT_SELECTORS, SelectorIndex
+from baibysitter.baibysitter_game_sdk.metrics import get_registry, SIZE_BUCKETS
+from baibysitter.baibysitter_game_sdk.wire import Compression, WireEncoder
+from baibysitter.baibysitter_game_sdk.resilience import (
+    RetryPolicy,
+    CircuitBreakers,
+    call_with_retry,
+    acall_with_retry,
+    bounded_timeout,
+    remaining,
+)
+
+if TYPE_CHECKING:
+    from baibysitter.baibysitter_game_sdk.chat_agent import Chat
+
+# httpx y game_sdk se cargan recién cuando se usan: un proceso que solo
+# valida no importa el SDK de chat, y uno sync no paga asyncio
+httpx = lazy_import("httpx")
+asyncio = lazy_import("asyncio")
+inspect = lazy_import("inspect")
+
+logger = logging.getLogger(__name__)
+
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# respuestas del validador cuando no reconoce el contextId
+UNKNOWN_CONTEXT_STATUSES = (404, 409, 410)
+UNKNOWN_CONTEXT_ERROR = "UNKNOWN_CONTEXT"
+
+
+def endpoint_urls(api_url: Union[str, Sequence[str]]) -> List[str]:
+    return [api_url] if isinstance(api_url, str) else list(api_url)
+
+
 class Babysitter:
-    def __init__(self, api_url: str):
-        self.api_url = api_url
-        
+    def __init__(
+        self,
+        api_url: Union[str, Sequence[str]],
+        incremental: bool = False,
+        verdict_cache: Optional[VerdictCache] = None,
+        timeout: float = 30.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        policy: Optional[PolicyEngine] = None,
+        balancing: str = LEAST_OUTSTANDING,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        token: Token = ETH,
+        compression: Optional[Compression] = None,
+        hedge_workers: Optional[int] = None,
+    ):
+        """
+        api_url: validator URL, or a list of them (a cluster of sentinels)
+        token: asset of the validated transfers (erc20TokenAddress and the
+        decimals used to convert float amounts)
+        incremental: keep a context handle per chat on the validator and only
+        send the messages added since the last validation
+        verdict_cache: reuse verdicts for identical transfers in an unchanged conversation
+        timeout: per request, capped by the current deadline (see resilience.deadline)
+        policy: local rules checked first, only ESCALATE decisions reach the validator.
+        Its token must be the same as token (ValueError otherwise)
+        balancing: "least_outstanding" or "latency", see EndpointPool
+        hedge: with several endpoints, send a second copy of a slow validation
+        to another endpoint after hedge_delay (default: p95 latency)
+        hedge_workers: threads for the hedge copies (the first request is
+        sent from the calling thread), ThreadPoolExecutor's default if None
+        compression: gzip/zstd for request bodies above a size threshold
+        (the transcript in "reason" is most of the payload)
+        """
+        if policy is not None and not same_token(policy.token, token):
+            # los límites de la política están en unidades de su token
+            raise ValueError(f"PolicyEngine limits are in {policy.token!r}, Babysitter validates {token!r}")
+        urls = endpoint_urls(api_url)
+        self.endpoints = EndpointPool(urls, strategy=balancing, hedge=hedge, hedge_delay=hedge_delay)
+        self.api_url = urls[0]
+        # con varios endpoints el breaker cubre todo el cluster, la salud de
+        # cada uno la lleva el pool
+        self._breaker_key = self.api_url if len(urls) == 1 else "babysitter"
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self.hedge_workers = hedge_workers
+        self._hedge_lock = threading.Lock()
+        self.incremental = incremental
+        self.verdict_cache = verdict_cache
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy(retry_exceptions=(httpx.TransportError,))
+        # mientras el validador falla las validaciones se rechazan al instante
+        self.breakers = breakers or CircuitBreakers()
+        self.policy = policy
+        self.token = token
+        self.wire = WireEncoder(compression, "babysitter")
+        self._contexts: Dict[str, ConversationContext] = {}
+        self._contexts_lock = threading.Lock()
+
+    def get_context(self, chat: Chat) -> ConversationContext:
+        """Returns the rendered transcript of the chat, up to date with its history"""
+        with self._contexts_lock:
+            context = self._contexts.get(chat.chat_id)
+            if context is None:
+                context = self._contexts[chat.chat_id] = ConversationContext()
+        context.sync(chat.history)
+        return context
+
+    def forget_chat(self, chat_id: str):
+        with self._contexts_lock:
+            self._contexts.pop(chat_id, None)
+
     def validate_transaction(
-        self, 
+        self,
         from_address: str,
-        to_address: str, 
+        to_address: str,
         amount: float,
         chat: Chat,
     ) -> Tuple[bool, str]:
         """
         Validates a transaction by consulting the external API
         """
-        messages = chat.get_history()
-        
-        conversation = []
-        for msg in messages:
-            role = "User" if msg["role"] == "user" else "Assistant"
-            conversation.append(f"{role}: {msg['content']}")
-        
-        reason = "\n".join(conversation)
-        
-        tx_data = {
+        return self.validate_transactions(from_address, [(to_address, amount)], chat)[0]
+
+    def validate_transactions(
+        self,
+        from_address: str,
+        transfers: List[Tuple[str, float]],
+        chat: Chat,
+    ) -> List[Tuple[bool, str]]:
+        """
+        Validates several transfers (to_address, amount in token units) from
+        the same wallet in one request. Returns one (is_approved, message) per transfer
+        """
+        verdicts, txs, indexes = self._from_amounts(transfers)
+        if txs:
+            for i, verdict in zip(indexes, self.validate_txs(from_address, txs, chat)):
+                verdicts[i] = verdict
+        return verdicts
+
+    def validate_txs(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+        chat: Chat,
+        token_address: Optional[str] = None,
+    ) -> List[Tuple[bool, str]]:
+        """
+        Same as validate_transactions with values already in base units (wei).
+        token_address: erc20TokenAddress for these transactions, by default
+        the one of the configured token
+        """
+        if not txs:
+            return []
+        verdicts, escalated, reservations = self._apply_policy(from_address, txs)
+        try:
+            if escalated:
+                remote = self._validate_remote(from_address, [txs[i] for i in escalated], chat, token_address)
+                for i, verdict in zip(escalated, remote):
+                    verdicts[i] = verdict
+        finally:
+            self._settle_spend(verdicts, reservations)
+        return verdicts
+
+    def _from_amounts(
+        self,
+        transfers: List[Tuple[str, float]],
+    ) -> Tuple[List[Optional[Tuple[bool, str]]], List[Transaction], List[int]]:
+        """Transactions for the valid amounts (and their indexes), the rest are rejected here"""
+        verdicts: List[Optional[Tuple[bool, str]]] = [None] * len(transfers)
+        txs = []
+        indexes = []
+        for i, (to_address, amount) in enumerate(transfers):
+            try:
+                txs.append(Transaction(to_address, self.token.to_units(amount)))
+            except ValueError:
+                verdicts[i] = (False, f"REJECTED: invalid amount {amount!r}")
+                continue
+            indexes.append(i)
+        return verdicts, txs, indexes
+
+    def _apply_policy(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+    ) -> Tuple[List[Optional[Tuple[bool, str]]], List[int], List[Optional[SpendReservation]]]:
+        """
+        Local verdicts (None where escalated), the indexes to send to the
+        validator and the spend reserved for each transaction. Each one is
+        checked against the spend windows with the earlier ones of the batch
+        already reserved. Contract calls (with calldata) go to the validator
+        unless the policy rejects them (see _check_call)
+        """
+        if self.policy is None:
+            return [None] * len(txs), list(range(len(txs))), [None] * len(txs)
+        verdicts: List[Optional[Tuple[bool, str]]] = []
+        escalated = []
+        reservations: List[Optional[SpendReservation]] = []
+        for i, tx in enumerate(txs):
+            if tx.data:
+                decision, reservation = self._check_call(from_address, tx)
+                reservations.append(reservation)
+                if decision is not None and decision.decision == REJECT:
+                    verdicts.append((False, decision.message))
+                else:
+                    verdicts.append(None)
+                    escalated.append(i)
+                continue
+            decision, reservation = self.policy.evaluate_and_reserve(from_address, tx.to, tx.value)
+            reservations.append(reservation)
+            if decision.decision == ESCALATE:
+                verdicts.append(None)
+                escalated.append(i)
+            else:
+                verdicts.append((decision.decision == APPROVE, decision.message))
+        return verdicts, escalated, reservations
+
+    def _check_call(
+        self,
+        from_address: str,
+        tx: Transaction,
+    ) -> Tuple[Optional[PolicyDecision], Optional[SpendReservation]]:
+        """
+        An ERC-20 call on the policy's token is evaluated with its recipient
+        (or spender) and amount. Any other call only reserves its native value
+        """
+        decoded = DEFAULT_SELECTORS.decode(tx.data)
+        movement = decoded.token_movement() if decoded is not None else None
+        if movement is None or tx.to.lower() != self.policy.token.address.lower():
+            return None, self.policy.reserve_value(from_address, tx.value)
+        recipient, amount = movement
+        return self.policy.evaluate_and_reserve(from_address, recipient, amount)
+
+    def _settle_spend(
+        self,
+        verdicts: List[Optional[Tuple[bool, str]]],
+        reservations: List[Optional[SpendReservation]],
+    ):
+        """Keeps the spend of approved transfers, releases the rest (rejected or failed)"""
+        for verdict, reservation in zip(verdicts, reservations):
+            if reservation is not None and (verdict is None or not verdict[0]):
+                reservation.release()
+
+    def _validate_remote(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+        chat: Chat,
+        token_address: Optional[str] = None,
+    ) -> List[Tuple[bool, str]]:
+        context = self.get_context(chat)
+        token_address = token_address or self.token.address
+        verdicts, keys = self._cached_verdicts(from_address, txs, context, token_address)
+        missing = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        if not missing:
+            return verdicts
+
+        try:
+            remote = self._request_verdicts(from_address, [txs[i] for i in missing], context, token_address)
+        except Exception as e:
+            get_registry().inc("babysitter_verdicts_total", len(missing), outcome="error")
+            remote = [(False, f"Validation error: {str(e)}")] * len(missing)
+            keys = None
+        return self._merge_verdicts(verdicts, missing, remote, keys)
+
+    def _request_verdicts(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+        context: ConversationContext,
+        token_address: str,
+    ) -> List[Tuple[bool, str]]:
+        tx_data = self._build_payload(from_address, txs, context, token_address)
+        response = self._post(tx_data)
+        if self._is_unknown_context(response, tx_data):
+            # el validador perdió el contexto, mandamos todo de nuevo
+            context.reset()
+            tx_data = self._build_payload(from_address, txs, context, token_address)
+            response = self._post(tx_data)
+        return self._parse_response(response, context, tx_data)
+
+    def _post(self, tx_data: Dict[str, Any]) -> httpx.Response:
+        body, sent, headers = self.wire.encode(tx_data, JSON_HEADERS)
+        metrics = get_registry()
+        metrics.observe("babysitter_request_bytes", len(sent), buckets=SIZE_BUCKETS)
+        with metrics.timer("babysitter_validation_seconds"):
+            response = self._post_body(sent, headers)
+            if self.wire.rejected(response.status_code, headers):
+                # el validador no acepta cuerpos comprimidos, va sin comprimir
+                response = self._post_body(body, JSON_HEADERS)
+        self._raise_for_unavailable(response)
+        return response
+
+    def _post_body(self, body: bytes, headers: Dict[str, str]) -> httpx.Response:
+        return call_with_retry(
+            lambda: self._send(body, headers),
+            self.retry_policy,
+            self.breakers.get(self._breaker_key),
+            "babysitter",
+        )
+
+    def _send(self, body: bytes, headers: Dict[str, str]) -> httpx.Response:
+        """
+        One attempt: the balanced endpoint from the calling thread, plus a
+        hedge copy from the pool if it is slow. The hedge verdict is used
+        when the first request fails or gets no verdict
+        """
+        picked: List[Endpoint] = []
+        if not self.endpoints.hedge:
+            return self._send_to(body, headers, picked)
+        answered = threading.Event()
+        # el hilo del pool necesita su propia copia del contexto (deadline)
+        hedge = self._get_hedge_executor().submit(
+            contextvars.copy_context().run, self._send_hedge, body, headers, picked, answered, self._hedge_wait()
+        )
+        try:
+            response = self._send_to(body, headers, picked)
+        except Exception as e:
+            answered.set()
+            return self._hedge_verdict(hedge, None, e)
+        answered.set()
+        if response.status_code not in self.retry_policy.retry_statuses:
+            return response
+        return self._hedge_verdict(hedge, response, None)
+
+    def _send_hedge(
+        self,
+        body: bytes,
+        headers: Dict[str, str],
+        picked: List[Endpoint],
+        answered: threading.Event,
+        delay: float,
+    ) -> Optional[httpx.Response]:
+        """The hedge copy, sent only if the first request is still running after delay"""
+        if answered.wait(delay):
+            return None
+        get_registry().inc("babysitter_hedged_total")
+        return self._send_to(body, headers, picked)
+
+    def _send_to(self, body: bytes, headers: Dict[str, str], picked: List[Endpoint]) -> httpx.Response:
+        """Sends to the best endpoint not in picked (the ones this attempt already uses)"""
+        endpoint = self.endpoints.pick(exclude=picked)
+        picked.append(endpoint)
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = httpx.post(
+                endpoint.url,
+                content=body,
+                headers=headers,
+                timeout=bounded_timeout(self.timeout)
+            )
+            ok = response.status_code not in self.retry_policy.retry_statuses
+            return response
+        finally:
+            self._finish(endpoint, start, ok)
+
+    def _finish(self, endpoint: Endpoint, start: float, ok: Optional[bool]):
+        elapsed = time.perf_counter() - start
+        self.endpoints.finish(endpoint, elapsed, ok)
+        get_registry().observe("babysitter_endpoint_seconds", elapsed, endpoint=endpoint.url)
+
+    def _hedge_wait(self) -> float:
+        delay = self.endpoints.hedge_delay()
+        left = remaining()
+        return delay if left is None else max(min(delay, left), 0.0)
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.hedge_workers,
+                    thread_name_prefix="babysitter-hedge",
+                )
+            return self._hedge_executor
+
+    def _hedge_verdict(
+        self,
+        hedge: Future,
+        response: Optional[httpx.Response],
+        error: Optional[Exception],
+    ) -> httpx.Response:
+        """
+        The hedge response if it is a verdict (not a retryable status).
+        Otherwise the first request's response or error goes back to call_with_retry
+        """
+        try:
+            result = hedge.result()
+        except Exception:
+            result = None
+        if result is not None and result.status_code not in self.retry_policy.retry_statuses:
+            get_registry().inc("babysitter_hedge_wins_total")
+            return result
+        if response is not None:
+            return response
+        if result is not None:
+            return result
+        raise error
+
+    def close(self):
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+
+    def _raise_for_unavailable(self, response: httpx.Response):
+        # un 429/5xx después de los reintentos no es un veredicto
+        if response.status_code in self.retry_policy.retry_statuses:
+            raise ValueError(f"Validator unavailable (status {response.status_code})")
+
+    def _cached_verdicts(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+        context: ConversationContext,
+        token_address: str,
+    ) -> Tuple[List[Optional[Tuple[bool, str]]], Optional[List[Any]]]:
+        if self.verdict_cache is None:
+            return [None] * len(txs), None
+        digest = context.digest
+        keys = [
+            VerdictCache.make_key(from_address, tx.to, tx.value, token_address, digest, tx.data)
+            for tx in txs
+        ]
+        verdicts = [self.verdict_cache.get(key) for key in keys]
+        hits = sum(1 for verdict in verdicts if verdict is not None)
+        if hits:
+            get_registry().inc("babysitter_verdicts_total", hits, outcome="cached")
+        return verdicts, keys
+
+    def _merge_verdicts(
+        self,
+        verdicts: List[Optional[Tuple[bool, str]]],
+        missing: List[int],
+        remote: List[Tuple[bool, str]],
+        keys: Optional[List[Any]],
+    ) -> List[Tuple[bool, str]]:
+        # keys es None cuando hubo error, esos resultados no se cachean
+        for i, verdict in zip(missing, remote):
+            verdicts[i] = verdict
+            if keys is not None and self.verdict_cache is not None:
+                self.verdict_cache.put(keys[i], verdict)
+        return verdicts
+
+    def _build_payload(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+        context: ConversationContext,
+        token_address: str,
+    ) -> Dict[str, Any]:
+        return {
             "safeAddress": from_address,
-            "erc20TokenAddress": "ETH",
-            "reason": reason,
-            "transactions": [{
-                "to": to_address,
-                "data": "",
-                "value": str(Decimal(str(amount)) * Decimal('1000000000000000000'))
-            }]
+            "erc20TokenAddress": token_address,
+            **context.build_fields(self.incremental),
+            "transactions": [tx.as_payload() for tx in txs]
         }
-        
+
+    def _is_unknown_context(self, response: httpx.Response, tx_data: Dict[str, Any]) -> bool:
+        if "contextId" not in tx_data:
+            return False
+        if response.status_code in UNKNOWN_CONTEXT_STATUSES:
+            return True
         try:
-            response = httpx.post(
-                self.api_url, 
-                json=tx_data, 
-                timeout=30.0
+            return response.json().get("error") == UNKNOWN_CONTEXT_ERROR
+        except ValueError:
+            return False
+
+    def _parse_response(
+        self,
+        response: httpx.Response,
+        context: ConversationContext,
+        tx_data: Dict[str, Any],
+    ) -> List[Tuple[bool, str]]:
+        response_data = response.json()
+        if self.incremental and response_data.get("contextId"):
+            context.acknowledge(
+                response_data["contextId"],
+                tx_data["contextLength"],
+                tx_data["contextDigest"],
             )
-            response_data = response.json()
-            message = response_data.get('message', '')
-            is_approved = 'APPROVED' in message
-            return is_approved, message
-                
+        message = response_data.get('message', '')
+        count = len(tx_data["transactions"])
+        verdicts = self._verdicts_from_response(response_data, message, count)
+        metrics = get_registry()
+        for is_approved, _ in verdicts:
+            metrics.inc("babysitter_verdicts_total", outcome="approved" if is_approved else "rejected")
+        return verdicts
+
+    def _verdicts_from_response(
+        self,
+        response_data: Dict[str, Any],
+        message: str,
+        count: int,
+    ) -> List[Tuple[bool, str]]:
+
+        # veredicto por transacción si el validador lo devuelve, si no el mensaje general
+        results = response_data.get('results')
+        if isinstance(results, list) and len(results) == count:
+            verdicts = []
+            for result in results:
+                tx_message = result.get('message', message) if isinstance(result, dict) else str(result)
+                verdicts.append(('APPROVED' in tx_message, tx_message))
+            return verdicts
+
+        is_approved = 'APPROVED' in message
+        return [(is_approved, message)] * count
+
+
+class AsyncBabysitter(Babysitter):
+    """
+    Babysitter for asyncio code. Keeps one httpx.AsyncClient so validations
+    reuse connections instead of opening a new one per transaction
+    """
+    def __init__(
+        self,
+        api_url: Union[str, Sequence[str]],
+        client: Optional[httpx.AsyncClient] = None,
+        timeout: float = 30.0,
+        incremental: bool = False,
+        verdict_cache: Optional[VerdictCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakers] = None,
+        policy: Optional[PolicyEngine] = None,
+        balancing: str = LEAST_OUTSTANDING,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        token: Token = ETH,
+        compression: Optional[Compression] = None,
+    ):
+        super().__init__(
+            api_url,
+            incremental=incremental,
+            verdict_cache=verdict_cache,
+            timeout=timeout,
+            retry_policy=retry_policy,
+            breakers=breakers,
+            policy=policy,
+            balancing=balancing,
+            hedge=hedge,
+            hedge_delay=hedge_delay,
+            token=token,
+            compression=compression,
+        )
+        self.http = client or httpx.AsyncClient(timeout=timeout)
+
+    async def validate_transaction(
+        self,
+        from_address: str,
+        to_address: str,
+        amount: float,
+        chat: Chat,
+    ) -> Tuple[bool, str]:
+        """
+        Validates a transaction by consulting the external API
+        """
+        return (await self.validate_transactions(from_address, [(to_address, amount)], chat))[0]
+
+    async def validate_transactions(
+        self,
+        from_address: str,
+        transfers: List[Tuple[str, float]],
+        chat: Chat,
+    ) -> List[Tuple[bool, str]]:
+        verdicts, txs, indexes = self._from_amounts(transfers)
+        if txs:
+            for i, verdict in zip(indexes, await self.validate_txs(from_address, txs, chat)):
+                verdicts[i] = verdict
+        return verdicts
+
+    async def validate_txs(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+        chat: Chat,
+        token_address: Optional[str] = None,
+    ) -> List[Tuple[bool, str]]:
+        if not txs:
+            return []
+        verdicts, escalated, reservations = self._apply_policy(from_address, txs)
+        try:
+            if escalated:
+                remote = await self._avalidate_remote(from_address, [txs[i] for i in escalated], chat, token_address)
+                for i, verdict in zip(escalated, remote):
+                    verdicts[i] = verdict
+        finally:
+            self._settle_spend(verdicts, reservations)
+        return verdicts
+
+    async def _avalidate_remote(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+        chat: Chat,
+        token_address: Optional[str] = None,
+    ) -> List[Tuple[bool, str]]:
+        context = self.get_context(chat)
+        token_address = token_address or self.token.address
+        verdicts, keys = self._cached_verdicts(from_address, txs, context, token_address)
+        missing = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        if not missing:
+            return verdicts
+
+        try:
+            remote = await self._arequest_verdicts(from_address, [txs[i] for i in missing], context, token_address)
         except Exception as e:
-            return False, f"Validation error: {str(e)}"
+            get_registry().inc("babysitter_verdicts_total", len(missing), outcome="error")
+            remote = [(False, f"Validation error: {str(e)}")] * len(missing)
+            keys = None
+        return self._merge_verdicts(verdicts, missing, remote, keys)
+
+    async def _arequest_verdicts(
+        self,
+        from_address: str,
+        txs: List[Transaction],
+        context: ConversationContext,
+        token_address: str,
+    ) -> List[Tuple[bool, str]]:
+        tx_data = self._build_payload(from_address, txs, context, token_address)
+        response = await self._apost(tx_data)
+        if self._is_unknown_context(response, tx_data):
+            context.reset()
+            tx_data = self._build_payload(from_address, txs, context, token_address)
+            response = await self._apost(tx_data)
+        return self._parse_response(response, context, tx_data)
+
+    async def _apost(self, tx_data: Dict[str, Any]) -> httpx.Response:
+        body, sent, headers = self.wire.encode(tx_data, JSON_HEADERS)
+        metrics = get_registry()
+        metrics.observe("babysitter_request_bytes", len(sent), buckets=SIZE_BUCKETS)
+        with metrics.timer("babysitter_validation_seconds"):
+            response = await self._apost_body(sent, headers)
+            if self.wire.rejected(response.status_code, headers):
+                response = await self._apost_body(body, JSON_HEADERS)
+        self._raise_for_unavailable(response)
+        return response
+
+    async def _apost_body(self, body: bytes, headers: Dict[str, str]) -> httpx.Response:
+        return await acall_with_retry(
+            lambda: self._asend(body, headers),
+            self.retry_policy,
+            self.breakers.get(self._breaker_key),
+            "babysitter",
+        )
+
+    async def _asend(self, body: bytes, headers: Dict[str, str]) -> httpx.Response:
+        picked: List[Endpoint] = []
+        if not self.endpoints.hedge:
+            return await self._asend_to(body, headers, picked)
+        tasks = [asyncio.ensure_future(self._asend_to(body, headers, picked))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_wait())
+            if not done:
+                get_registry().inc("babysitter_hedged_total")
+                tasks.append(asyncio.ensure_future(self._asend_to(body, headers, picked)))
+            return await self._afirst_verdict(tasks)
+        finally:
+            # la copia que perdió se cancela
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _asend_to(self, body: bytes, headers: Dict[str, str], picked: List[Endpoint]) -> httpx.Response:
+        # se elige dentro de la tarea: una copia cancelada antes de empezar
+        # no deja una request "en vuelo" en el pool
+        endpoint = self.endpoints.pick(exclude=picked)
+        picked.append(endpoint)
+        start = time.perf_counter()
+        ok: Optional[bool] = None
+        try:
+            response = await self.http.post(
+                endpoint.url,
+                content=body,
+                headers=headers,
+                timeout=bounded_timeout(self.timeout),
+            )
+            ok = response.status_code not in self.retry_policy.retry_statuses
+            return response
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            ok = False
+            raise
+        finally:
+            self._finish(endpoint, start, ok)
+
+    async def _afirst_verdict(self, tasks: List[asyncio.Future]) -> httpx.Response:
+        response = None
+        error: Optional[BaseException] = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                result = task.result()
+                if result.status_code not in self.retry_policy.retry_statuses:
+                    if task is not tasks[0]:
+                        get_registry().inc("babysitter_hedge_wins_total")
+                    return result
+                response = result
+        if response is not None:
+            return response
+        raise error
+
+    async def aclose(self):
+        self.close()
+        await self.http.aclose()
+
 
 def wrap_send_native(
     original_fn,
     babysitter: Babysitter,
     wallet_address: str,
     chat: Chat,
+    read_cache: Optional[ChainReadCache] = None,
 ) -> callable:
+    """
+    read_cache: cached reads of wallet_address (balance...) are dropped once
+    original_fn has run
+    """
+    from baibysitter.baibysitter_game_sdk.custom_types import FunctionResultStatus
+
     def wrapped_send_native(to_address: str, amount: float) -> Tuple[FunctionResultStatus, str, Dict[str, Any]]:
-        print(f"\n💰 Transaction details:")
-        print(f"   From: {wallet_address}")
-        print(f"   To: {to_address}")
-        print(f"   Amount: {amount} ETH")
-        
+        logger.debug("Validating transfer from=%s to=%s amount=%s ETH", wallet_address, to_address, amount)
+
         try:
             is_valid, message = babysitter.validate_transaction(
                 from_address=wallet_address,
@@ -70,13 +740,144 @@ def wrap_send_native(
                 amount=amount,
                 chat=chat
             )
-            
+
+            if not is_valid:
+                logger.info("Transfer to %s rejected: %s", to_address, message)
+                return FunctionResultStatus.FAILED, f"Transaction rejected: {message}", {}
+
+            try:
+                return original_fn(to_address, amount)
+            finally:
+                if read_cache is not None:
+                    read_cache.invalidate_address(wallet_address)
+
+        except Exception as e:
+            return FunctionResultStatus.FAILED, f"Execution error: {str(e)}", {}
+
+    return wrapped_send_native
+
+
+def wrap_send_native_async(
+    original_fn,
+    babysitter: AsyncBabysitter,
+    wallet_address: str,
+    chat: Chat,
+    read_cache: Optional[ChainReadCache] = None,
+) -> callable:
+    """
+    Async version of wrap_send_native. original_fn can be a coroutine function
+    or a regular function (it is run in a thread so signing doesn't block the loop)
+    """
+    from baibysitter.baibysitter_game_sdk.custom_types import FunctionResultStatus
+
+    async def wrapped_send_native(to_address: str, amount: float) -> Tuple[FunctionResultStatus, str, Dict[str, Any]]:
+        try:
+            is_valid, message = await babysitter.validate_transaction(
+                from_address=wallet_address,
+                to_address=to_address,
+                amount=amount,
+                chat=chat
+            )
+
             if not is_valid:
                 return FunctionResultStatus.FAILED, f"Transaction rejected: {message}", {}
-            
-            return original_fn(to_address, amount)
-            
+
+            try:
+                if inspect.iscoroutinefunction(original_fn):
+                    return await original_fn(to_address, amount)
+                return await asyncio.to_thread(original_fn, to_address, amount)
+            finally:
+                if read_cache is not None:
+                    read_cache.invalidate_address(wallet_address)
+
         except Exception as e:
             return FunctionResultStatus.FAILED, f"Execution error: {str(e)}", {}
-        
-    return wrapped_send_native 
\ No newline at end of file
+
+    return wrapped_send_native
+
+
+def _tx_token_address(tx: Transaction, selectors: SelectorIndex) -> Optional[str]:
+    """The called contract for ERC-20 transfer/approve calls, None (configured token) otherwise"""
+    if not tx.data:
+        return None
+    decoded = selectors.decode(tx.data)
+    if decoded is not None and decoded.is_token_call:
+        logger.debug("Validating %s on token %s", decoded, tx.to)
+        return tx.to
+    return None
+
+
+def wrap_transaction_fn(
+    original_fn,
+    babysitter: Babysitter,
+    wallet_address: str,
+    chat: Chat,
+    build_tx: Callable[..., Transaction],
+    selectors: SelectorIndex = DEFAULT_SELECTORS,
+    read_cache: Optional[ChainReadCache] = None,
+) -> callable:
+    """
+    Generic wrap_send_native for any tool that builds a transaction (ERC-20
+    transfer/approve, raw contract calls...). build_tx gets the same
+    arguments as the tool and returns the Transaction it will send (see
+    calldata.erc20_transfer / erc20_approve / raw_call). ERC-20 calls are
+    validated with the token contract as erc20TokenAddress, the calldata
+    goes to the validator as is
+    """
+    from baibysitter.baibysitter_game_sdk.custom_types import FunctionResultStatus
+
+    def wrapped(*args, **kwargs) -> Tuple[FunctionResultStatus, str, Dict[str, Any]]:
+        try:
+            tx = build_tx(*args, **kwargs)
+            token_address = _tx_token_address(tx, selectors)
+            is_valid, message = babysitter.validate_txs(wallet_address, [tx], chat, token_address)[0]
+
+            if not is_valid:
+                logger.info("Transaction to %s rejected: %s", tx.to, message)
+                return FunctionResultStatus.FAILED, f"Transaction rejected: {message}", {}
+
+            try:
+                return original_fn(*args, **kwargs)
+            finally:
+                if read_cache is not None:
+                    read_cache.invalidate_address(wallet_address)
+
+        except Exception as e:
+            return FunctionResultStatus.FAILED, f"Execution error: {str(e)}", {}
+
+    return wrapped
+
+
+def wrap_transaction_fn_async(
+    original_fn,
+    babysitter: AsyncBabysitter,
+    wallet_address: str,
+    chat: Chat,
+    build_tx: Callable[..., Transaction],
+    selectors: SelectorIndex = DEFAULT_SELECTORS,
+    read_cache: Optional[ChainReadCache] = None,
+) -> callable:
+    """Async version of wrap_transaction_fn"""
+    from baibysitter.baibysitter_game_sdk.custom_types import FunctionResultStatus
+
+    async def wrapped(*args, **kwargs) -> Tuple[FunctionResultStatus, str, Dict[str, Any]]:
+        try:
+            tx = build_tx(*args, **kwargs)
+            token_address = _tx_token_address(tx, selectors)
+            is_valid, message = (await babysitter.validate_txs(wallet_address, [tx], chat, token_address))[0]
+
+            if not is_valid:
+                return FunctionResultStatus.FAILED, f"Transaction rejected: {message}", {}
+
+            try:
+                if inspect.iscoroutinefunction(original_fn):
+                    return await original_fn(*args, **kwargs)
+                return await asyncio.to_thread(original_fn, *args, **kwargs)
+            finally:
+                if read_cache is not None:
+                    read_cache.invalidate_address(wallet_address)
+
+        except Exception as e:
+            return FunctionResultStatus.FAILED, f"Execution error: {str(e)}", {}
+
+    return wrapped
@@ -0,0 +1,146 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from baibysitter.baibysitter_game_sdk.custom_types import FunctionResultStatus
+from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter
+from baibysitter.baibysitter_game_sdk.chain_cache import ChainReadCache
+from baibysitter.baibysitter_game_sdk.chat_agent import Chat
+from baibysitter.baibysitter_game_sdk.transactions import Transaction
+
+
+class _PendingTransfer:
+    __slots__ = ("tx", "verdict", "done")
+
+    def __init__(self, tx: Transaction):
+        self.tx = tx
+        self.verdict: Optional[Tuple[bool, str]] = None
+        self.done = threading.Event()
+
+
+class _ChatQueue:
+    __slots__ = ("chat", "transfers", "has_leader", "full")
+
+    def __init__(self, chat: Chat):
+        self.chat = chat
+        self.transfers: List[_PendingTransfer] = []
+        self.has_leader = False
+        self.full = threading.Event()
+
+
+class TransactionBatcher:
+    """
+    Coalesces transfers from one wallet into a single validation request.
+
+    One batcher can be shared by every chat of the wallet. Transfers are
+    queued per chat (a validation request carries one conversation): the
+    first caller of validate() for a chat waits up to `window` seconds (or
+    until max_batch transfers are queued) and then sends everything queued
+    for that chat with Babysitter.validate_txs. Every caller blocks until
+    its own verdict is back.
+    """
+    def __init__(
+        self,
+        babysitter: Babysitter,
+        wallet_address: str,
+        window: float = 0.05,
+        max_batch: int = 16,
+    ):
+        self.babysitter = babysitter
+        self.wallet_address = wallet_address
+        self.window = window
+        self.max_batch = max_batch
+        self._queues: Dict[str, _ChatQueue] = {}
+        self._lock = threading.Lock()
+
+    def validate(self, chat: Chat, to_address: str, amount: float) -> Tuple[bool, str]:
+        """amount in units of the Babysitter token"""
+        try:
+            value = self.babysitter.token.to_units(amount)
+        except ValueError:
+            return False, f"REJECTED: invalid amount {amount!r}"
+        return self.validate_tx(chat, Transaction(to_address, value))
+
+    def validate_tx(self, chat: Chat, tx: Transaction) -> Tuple[bool, str]:
+        pending = _PendingTransfer(tx)
+        with self._lock:
+            queue = self._queues.get(chat.chat_id)
+            if queue is None:
+                queue = self._queues[chat.chat_id] = _ChatQueue(chat)
+            queue.transfers.append(pending)
+            leader = not queue.has_leader
+            queue.has_leader = True
+            if len(queue.transfers) >= self.max_batch:
+                queue.full.set()
+
+        if leader:
+            queue.full.wait(self.window)
+            self.flush(chat)
+
+        pending.done.wait()
+        return pending.verdict
+
+    def flush(self, chat: Optional[Chat] = None):
+        """Sends whatever is queued right now (for one chat, or all)"""
+        with self._lock:
+            if chat is None:
+                queues = list(self._queues.values())
+                self._queues = {}
+            else:
+                queue = self._queues.pop(chat.chat_id, None)
+                queues = [queue] if queue is not None else []
+
+        for queue in queues:
+            batch = queue.transfers
+            for start in range(0, len(batch), self.max_batch):
+                self._send(queue.chat, batch[start:start + self.max_batch])
+
+    def _send(self, chat: Chat, batch: List[_PendingTransfer]):
+        try:
+            verdicts = self.babysitter.validate_txs(
+                self.wallet_address,
+                [p.tx for p in batch],
+                chat,
+            )
+        except Exception as e:
+            verdicts = [(False, f"Validation error: {str(e)}")] * len(batch)
+
+        for i, pending in enumerate(batch):
+            pending.verdict = verdicts[i] if i < len(verdicts) else (False, "Validation error: missing verdict")
+            pending.done.set()
+
+
+def wrap_send_native_batched(
+    original_fn,
+    batcher: TransactionBatcher,
+    chat: Chat,
+    read_cache: Optional[ChainReadCache] = None,
+) -> callable:
+    """
+    Like wrap_send_native but the validation goes through a TransactionBatcher,
+    so transfers issued together (parallel calls of the same turn) share one
+    request. Only calls that run at the same time can be merged: with
+    chat.max_parallel_calls <= 1 every transfer is validated right away
+    instead of waiting for the batcher window
+    """
+    def validate(to_address: str, amount: float) -> Tuple[bool, str]:
+        if chat.max_parallel_calls <= 1:
+            # las llamadas van de a una, esperar la ventana solo suma latencia
+            return batcher.babysitter.validate_transaction(batcher.wallet_address, to_address, amount, chat)
+        return batcher.validate(chat, to_address, amount)
+
+    def wrapped_send_native(to_address: str, amount: float) -> Tuple[FunctionResultStatus, str, Dict[str, Any]]:
+        try:
+            is_valid, message = validate(to_address, amount)
+
+            if not is_valid:
+                return FunctionResultStatus.FAILED, f"Transaction rejected: {message}", {}
+
+            try:
+                return original_fn(to_address, amount)
+            finally:
+                if read_cache is not None:
+                    read_cache.invalidate_address(batcher.wallet_address)
+
+        except Exception as e:
+            return FunctionResultStatus.FAILED, f"Execution error: {str(e)}", {}
+
+    return wrapped_send_native
@@ -0,0 +1,195 @@
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from baibysitter.baibysitter_game_sdk.transactions import Token, Transaction
+
+# selectores de ERC-20 ya calculados, no hace falta keccak para estos
+ERC20_SELECTORS = {
+    "a9059cbb": "transfer(address,uint256)",
+    "095ea7b3": "approve(address,uint256)",
+    "23b872dd": "transferFrom(address,address,uint256)",
+    "39509351": "increaseAllowance(address,uint256)",
+}
+# (índice del destinatario, índice del monto) en los argumentos
+TOKEN_MOVEMENTS = {
+    "transfer": (0, 1),
+    "approve": (0, 1),
+    "transferFrom": (1, 2),
+    "increaseAllowance": (0, 1),
+}
+
+WORD = 32
+
+
+def function_selector(signature: str) -> str:
+    """4-byte selector (8 hex chars) of a canonical signature like transfer(address,uint256)"""
+    for selector, known in ERC20_SELECTORS.items():
+        if known == signature:
+            return selector
+    from eth_utils import keccak  # viene con web3
+    return keccak(text=signature)[:4].hex()
+
+
+@lru_cache(maxsize=1024)
+def parse_signature(signature: str) -> Tuple[str, Tuple[str, ...]]:
+    """'transfer(address,uint256)' -> ('transfer', ('address', 'uint256'))"""
+    name, _, rest = signature.partition("(")
+    types = rest.rstrip(")")
+    return name, tuple(t.strip() for t in types.split(",")) if types else ()
+
+
+def _is_static(abi_type: str) -> bool:
+    if abi_type in ("address", "bool"):
+        return True
+    if abi_type.startswith(("uint", "int")) and not abi_type.endswith("]"):
+        return True
+    return abi_type.startswith("bytes") and abi_type[5:].isdigit()
+
+
+def _decode_word(abi_type: str, word: bytes) -> Any:
+    if abi_type == "address":
+        return "0x" + word[12:].hex()
+    if abi_type == "bool":
+        return word[-1] == 1
+    if abi_type.startswith("uint"):
+        return int.from_bytes(word, "big")
+    if abi_type.startswith("int"):
+        return int.from_bytes(word, "big", signed=True)
+    return "0x" + word[:int(abi_type[5:])].hex()
+
+
+def _encode_word(abi_type: str, value: Any) -> bytes:
+    if abi_type == "address":
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value).rjust(WORD, b"\0")
+    if abi_type == "bool":
+        return int(bool(value)).to_bytes(WORD, "big")
+    if abi_type.startswith("uint"):
+        return int(value).to_bytes(WORD, "big")
+    if abi_type.startswith("int"):
+        return int(value).to_bytes(WORD, "big", signed=True)
+    raw = bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return raw.ljust(WORD, b"\0")
+
+
+def encode_call(signature: str, args: Sequence[Any]) -> str:
+    """Calldata (0x hex) for a call with static arguments (address, uintN, intN, bool, bytesN)"""
+    _, types = parse_signature(signature)
+    if len(types) != len(args):
+        raise ValueError(f"{signature} takes {len(types)} arguments, got {len(args)}")
+    if not all(_is_static(t) for t in types):
+        raise ValueError(f"Only static argument types can be encoded: {signature}")
+    return "0x" + function_selector(signature) + b"".join(
+        _encode_word(t, a) for t, a in zip(types, args)
+    ).hex()
+
+
+class DecodedCall:
+    __slots__ = ("selector", "signature", "name", "args")
+
+    def __init__(self, selector: str, signature: str, name: str, args: Optional[Tuple[Any, ...]]):
+        self.selector = selector
+        self.signature = signature
+        self.name = name
+        # None si la firma tiene tipos dinámicos (no se decodifican)
+        self.args = args
+
+    @property
+    def is_token_call(self) -> bool:
+        return self.name in TOKEN_MOVEMENTS and self.args is not None
+
+    def token_movement(self) -> Optional[Tuple[str, int]]:
+        """(recipient or spender, amount in token base units) for ERC-20 calls"""
+        if not self.is_token_call:
+            return None
+        recipient, amount = TOKEN_MOVEMENTS[self.name]
+        return self.args[recipient], self.args[amount]
+
+    def __repr__(self) -> str:
+        return f"DecodedCall({self.signature}, args={self.args!r})"
+
+
+class SelectorIndex:
+    """
+    selector -> function signature, built once from the known ERC-20 methods
+    plus whatever is registered (signatures or contract ABIs), so decoding a
+    call is a dict lookup and fixed-size slicing.
+    """
+    def __init__(self, signatures: Iterable[str] = ()):
+        self._signatures: Dict[str, str] = dict(ERC20_SELECTORS)
+        self._lock = threading.Lock()
+        for signature in signatures:
+            self.register(signature)
+
+    def register(self, signature: str, selector: Optional[str] = None) -> str:
+        selector = (selector or function_selector(signature)).lower().removeprefix("0x")
+        with self._lock:
+            self._signatures[selector] = signature
+        return selector
+
+    def register_abi(self, abi: List[Dict[str, Any]]):
+        """Adds every function of a contract ABI (the JSON list)"""
+        for entry in abi:
+            if entry.get("type", "function") != "function":
+                continue
+            types = ",".join(i["type"] for i in entry.get("inputs", []))
+            self.register(f"{entry['name']}({types})")
+
+    def lookup(self, selector: str) -> Optional[str]:
+        return self._signatures.get(selector.lower().removeprefix("0x"))
+
+    def decode(self, data: str) -> Optional[DecodedCall]:
+        """The call in data (0x hex calldata), None if its selector is unknown"""
+        data = data[2:] if data.startswith("0x") else data
+        if len(data) < 8:
+            return None
+        selector = data[:8].lower()
+        signature = self._signatures.get(selector)
+        if signature is None:
+            return None
+        name, types = parse_signature(signature)
+        if not all(_is_static(t) for t in types):
+            return DecodedCall(selector, signature, name, None)
+        try:
+            raw = bytes.fromhex(data[8:8 + 2 * WORD * len(types)])
+        except ValueError:
+            return None
+        if len(raw) < WORD * len(types):
+            return None
+        args = tuple(
+            _decode_word(t, raw[i * WORD:(i + 1) * WORD]) for i, t in enumerate(types)
+        )
+        return DecodedCall(selector, signature, name, args)
+
+
+DEFAULT_SELECTORS = SelectorIndex()
+
+
+def _check_contract(token: Token):
+    # sin address el token es la moneda nativa (ETH), no hay contrato al que llamar
+    if token.is_native:
+        raise ValueError(f"{token!r} has no contract address, use Token(symbol, decimals, address)")
+
+
+def erc20_transfer(token: Token):
+    """build_tx for a tool with (to_address, amount in token units) args that sends token"""
+    _check_contract(token)
+
+    def build_tx(to_address: str, amount) -> Transaction:
+        data = encode_call("transfer(address,uint256)", [to_address, token.to_units(amount)])
+        return Transaction(token.address, 0, data)
+    return build_tx
+
+
+def erc20_approve(token: Token):
+    """build_tx for a tool with (spender, amount in token units) args"""
+    _check_contract(token)
+
+    def build_tx(spender: str, amount) -> Transaction:
+        data = encode_call("approve(address,uint256)", [spender, token.to_units(amount)])
+        return Transaction(token.address, 0, data)
+    return build_tx
+
+
+def raw_call(to: str, data: str, value: int = 0) -> Transaction:
+    """build_tx for tools that already take the target, calldata and wei value"""
+    return Transaction(to, int(value), data)
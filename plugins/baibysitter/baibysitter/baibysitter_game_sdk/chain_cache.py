@@ -0,0 +1,181 @@
+import functools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+
+T = TypeVar("T")
+
+FOREVER = float("inf")
+
+
+class _Entry:
+    __slots__ = ("value", "block", "expires_at", "address")
+
+    def __init__(self, value: Any, block: Optional[int], expires_at: float, address: Optional[str]):
+        self.value = value
+        self.block = block
+        self.expires_at = expires_at
+        self.address = address
+
+
+class ChainReadCache:
+    """
+    Read-through cache for on-chain reads that don't change within a block
+    (balance, gas price, chain id, token balances...).
+
+    An entry is served until the first of:
+    - a newer block head is seen (on_new_block(), or polled every
+      block_poll_interval seconds when set)
+    - ttl seconds pass
+    - invalidate_address() for the address it belongs to (call it after
+      sending from that address)
+
+    Concurrent misses for the same key share a single RPC call.
+    """
+    def __init__(self, w3=None, ttl: float = 2.0, block_poll_interval: Optional[float] = None):
+        self.w3 = w3
+        self.ttl = ttl
+        self.block_poll_interval = block_poll_interval
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._inflight: Dict[Hashable, Future] = {}
+        # se incrementa al invalidar, así no guardamos lecturas que empezaron antes del envío
+        self._generations: Dict[str, int] = {}
+        self._head: Optional[int] = None
+        self._head_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: Hashable,
+        load: Callable[[], T],
+        address: Optional[str] = None,
+        ttl: Optional[float] = None,
+        per_block: bool = True,
+    ) -> T:
+        """
+        Cached value of key, calling load() on a miss.
+        address: the account the value belongs to (for invalidate_address)
+        per_block: False for values that don't change with new blocks (chain id)
+        """
+        address = address.lower() if address else None
+        head = self.current_block() if per_block else None
+        metrics = get_registry()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry):
+                metrics.inc("chain_cache_total", result="hit")
+                return entry.value
+            future = self._inflight.get(key)
+            if future is not None:
+                metrics.inc("chain_cache_total", result="shared")
+                leader = False
+            else:
+                future = self._inflight[key] = Future()
+                generation = self._generations.get(address, 0)
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        metrics.inc("chain_cache_total", result="miss")
+        try:
+            value = load()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            del self._inflight[key]
+            if self._generations.get(address, 0) == generation:
+                self._entries[key] = _Entry(value, head, expires_at, address)
+        future.set_result(value)
+        return value
+
+    def _is_fresh(self, entry: _Entry) -> bool:
+        if time.monotonic() >= entry.expires_at:
+            return False
+        if entry.block is not None and self._head is not None and entry.block < self._head:
+            return False
+        return True
+
+    def current_block(self) -> Optional[int]:
+        """Latest known block head (polled if block_poll_interval is set)"""
+        if self.w3 is None or self.block_poll_interval is None:
+            return self._head
+        if time.monotonic() - self._head_checked_at < self.block_poll_interval:
+            return self._head
+        block = self.get(("block_number",), self._load_block_number, ttl=self.block_poll_interval, per_block=False)
+        self.on_new_block(block)
+        return self._head
+
+    def _load_block_number(self) -> int:
+        with get_registry().timer("rpc_seconds", call="block_number"):
+            block = self.w3.eth.block_number
+        self._head_checked_at = time.monotonic()
+        return block
+
+    def on_new_block(self, block_number: int):
+        """Call from a newHeads subscription; older entries become stale"""
+        with self._lock:
+            if self._head is None or block_number > self._head:
+                self._head = block_number
+
+    def invalidate_address(self, address: str):
+        address = address.lower()
+        with self._lock:
+            self._generations[address] = self._generations.get(address, 0) + 1
+            for key in [k for k, e in self._entries.items() if e.address == address]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def cached(
+        self,
+        name: str,
+        address: Optional[str] = None,
+        ttl: Optional[float] = None,
+        per_block: bool = True,
+    ) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """
+        Decorator for read functions (that raise on error), the arguments are
+        part of the key:
+
+            @cache.cached("usdc_balance", address=account.address)
+            def usdc_balance():
+                return usdc.functions.balanceOf(account.address).call()
+        """
+        def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs) -> T:
+                key = (name, address, args, tuple(sorted(kwargs.items())))
+                return self.get(key, lambda: fn(*args, **kwargs), address=address, ttl=ttl, per_block=per_block)
+            return wrapper
+        return decorator
+
+    # lecturas comunes
+
+    def balance(self, address: str) -> int:
+        return self.get(("balance", address.lower()), lambda: self._rpc("get_balance", address), address=address)
+
+    def gas_price(self) -> int:
+        return self.get(("gas_price",), lambda: self._rpc("gas_price"))
+
+    def chain_id(self) -> int:
+        return self.get(("chain_id",), lambda: self._rpc("chain_id"), ttl=FOREVER, per_block=False)
+
+    def _rpc(self, call: str, *args) -> Any:
+        with get_registry().timer("rpc_seconds", call=call):
+            attr = getattr(self.w3.eth, call)
+            return attr(*args) if args else attr
+
+    def stats(self) -> Tuple[int, int]:
+        """(cached entries, in-flight loads)"""
+        with self._lock:
+            return len(self._entries), len(self._inflight)
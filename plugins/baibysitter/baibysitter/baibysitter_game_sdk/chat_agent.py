@@ -1,13 +1,161 @@
-from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
 from baibysitter.baibysitter_game_sdk.custom_types import (
     ChatResponse,
+    FunctionCall,
     FunctionCallResponse,
     FunctionResult,
     GameChatResponse,
     Function,
     AgentMessage,
 )
-from game_sdk.game.api_v2 import GAMEClientV2
+from baibysitter.baibysitter_game_sdk.api_v2 import DEFAULT_BASE_URL, GAMEAPIError, GAMEClientV2, PoolConfig
+from baibysitter.baibysitter_game_sdk.history import HistoryStore, CompactHistoryStore
+from baibysitter.baibysitter_game_sdk.action_space import ActionSpace
+from baibysitter.baibysitter_game_sdk.function_calls import SerialKey, run_function_calls
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+from baibysitter.baibysitter_game_sdk.resilience import deadline, deadline_at, iter_within
+from baibysitter.baibysitter_game_sdk.sessions import SessionStore
+from baibysitter.baibysitter_game_sdk.history_sink import BATCH_UNSUPPORTED_STATUSES, HistorySink
+from baibysitter.baibysitter_game_sdk.wire import Compression, json_dumps
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+# el servidor no reconoce el functions_hash o la state_base: se reenvía el turno completo
+UNKNOWN_BASE_STATUSES = (400, 409, 412)
+# cuánto espera end() a que el HistorySink entregue los mensajes del chat
+END_FLUSH_TIMEOUT = 10.0
+
+
+class ChatStreamEvent:
+    """
+    Event yielded by Chat.stream_next:
+
+    "message_delta": content holds the next chunk of the agent message
+    "function_call": the agent called function_call. The first call of the
+    turn runs right away, the rest once the response is complete (like next())
+    "function_result": result of that call (FunctionResult)
+    "done": response holds the ChatResponse next() would have returned
+    """
+    __slots__ = ("type", "content", "function_call", "result", "response")
+
+    def __init__(
+        self,
+        type: str,
+        content: Optional[str] = None,
+        function_call: Optional[FunctionCall] = None,
+        result: Optional[FunctionResult] = None,
+        response: Optional[ChatResponse] = None,
+    ):
+        self.type = type
+        self.content = content
+        self.function_call = function_call
+        self.result = result
+        self.response = response
+
+    def __repr__(self) -> str:
+        return f"ChatStreamEvent(type={self.type!r}, content={self.content!r})"
+
+
+class MultiChatResponse(ChatResponse):
+    """
+    ChatResponse of a turn where the agent called several functions.
+    function_call is the first one, function_calls all of them in order
+    """
+    function_calls: List[FunctionCallResponse] = []
+
+
+def parse_function_calls(data: Dict[str, Any], convo_response: GameChatResponse) -> List[FunctionCall]:
+    """Every function call of a turn ("function_calls" or the single one)"""
+    if data.get("function_calls"):
+        return [FunctionCall.model_validate(call) for call in data["function_calls"]]
+    if convo_response.function_call:
+        return [convo_response.function_call]
+    return []
+
+
+def _call_key(function_call: FunctionCall) -> Any:
+    return function_call.id if function_call.id is not None else (function_call.fn_name, repr(function_call.args))
+
+
+class _StreamTurn:
+    """Accumulates the events of one streamed turn (shared by Chat and AsyncChat)"""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.parts: List[str] = []
+        self.function_calls: List[FunctionCall] = []
+        self.results: List[FunctionResult] = []
+        self.is_finished = False
+        self._stored = 0
+        self._seen = set()
+
+    def take_message(self) -> str:
+        """Text received since the last call, to store it in the history in order"""
+        text = "".join(self.parts[self._stored:])
+        self._stored = len(self.parts)
+        return text
+
+    @property
+    def message(self) -> str:
+        return "".join(self.parts)
+
+    def read(self, event: Dict[str, Any]) -> Tuple[Optional[str], List[FunctionCall]]:
+        """Returns the new message chunk and the function calls not seen before"""
+        kind = event.get("type")
+        content = None
+        calls: List[FunctionCall] = []
+        if kind == "message_delta":
+            content = event.get("content") or ""
+        elif kind == "function_call":
+            calls = [FunctionCall.model_validate(event["function_call"])]
+        elif kind == "done":
+            # el cuerpo final trae lo que no haya llegado en eventos
+            data = event.get("data") or {}
+            convo_response = GameChatResponse.model_validate(data)
+            self.is_finished = convo_response.is_finished
+            if not self.parts:
+                content = convo_response.message
+            calls = parse_function_calls(data, convo_response)
+
+        if content:
+            if not self.parts:
+                get_registry().observe("chat_first_chunk_seconds", time.perf_counter() - self.start)
+            self.parts.append(content)
+        # "done" repite las llamadas que ya llegaron como eventos
+        new_calls = []
+        for call in calls:
+            key = _call_key(call)
+            if key not in self._seen:
+                self._seen.add(key)
+                new_calls.append(call)
+        self.function_calls.extend(new_calls)
+        return content or None, new_calls
+
+    @property
+    def pending(self) -> List[FunctionCall]:
+        """Calls not executed yet"""
+        return self.function_calls[len(self.results):]
+
+    def response(self, report_message: Optional[str]) -> ChatResponse:
+        if not self.function_calls:
+            return ChatResponse(message=self.message, is_finished=self.is_finished, function_call=None)
+        responses = [
+            FunctionCallResponse(fn_name=call.fn_name, fn_args=call.args, result=result)
+            for call, result in zip(self.function_calls, self.results)
+        ]
+        if len(responses) == 1:
+            return ChatResponse(message=report_message, is_finished=self.is_finished, function_call=responses[0])
+        return MultiChatResponse(
+            message=report_message,
+            is_finished=self.is_finished,
+            function_call=responses[0],
+            function_calls=responses,
+        )
 
 
 class Chat:
@@ -17,49 +165,130 @@ class Chat:
         client: GAMEClientV2,
         action_space: Optional[List[Function]] = None,
         get_state_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+        history_store: Optional[HistoryStore] = None,
+        send_functions_hash: bool = False,
+        max_parallel_calls: int = 4,
+        serial_keys: Optional[Dict[str, SerialKey]] = None,
+        session_store: Optional[SessionStore] = None,
+        history_sink: Optional[HistorySink] = None,
+        state_diff: bool = False,
     ):
+        """
+        send_functions_hash: send a hash of the function definitions and skip
+        the full list while it is unchanged (falls back to the full list if
+        the server answers 400/409/412, unknown hash)
+        max_parallel_calls: how many function calls of one turn run at once
+        serial_keys: fn_name -> key (or fn(args) -> key). Calls with the same
+            key run one after the other, e.g. {"send_native": "wallet"}
+        session_store: new messages are checkpointed there after every turn
+        history_sink: mirrors every message to the server-side history in
+            the background (flushed by end())
+        state_diff: once the server confirms it keeps the state (it answers
+            with the state_version it got), only the keys of get_state_fn()
+            that changed are sent. Falls back to the full state otherwise
+        action_space can also be a function chat -> list of Function, called
+        the first time the functions are needed (the tools are built lazily)
+        """
         self.chat_id = conversation_id
         self.client = client
-        self.action_space = {f.fn_name: f for f in action_space} if action_space else None
+        self._action_space_lock = threading.Lock()
+        self.action_space = action_space
         self.get_state_fn = get_state_fn
-        self.conversation_history = []  # Agregamos el historial localmente
+        # historial local, sin límite salvo que se pase un store acotado
+        self.history = history_store if history_store is not None else CompactHistoryStore()
+        self.send_functions_hash = send_functions_hash
+        self._sent_functions_hash: Optional[str] = None
+        self.max_parallel_calls = max_parallel_calls
+        self.serial_keys = serial_keys or {}
+        self._batch_reports = True
+        self.session_store = session_store
+        # índice absoluto del primer mensaje que falta guardar en session_store
+        self._checkpointed = self.history.total
+        self._checkpoint_lock = threading.Lock()
+        self.history_sink = history_sink
+        self.state_diff = state_diff
+        self._state_version = 0
+        # estado que el servidor confirmó tener: (versión, JSON de cada clave)
+        self._acked_state: Optional[Tuple[int, Dict[str, bytes]]] = None
+        # el del turno en curso, hasta que llegue la confirmación
+        self._pending_state: Optional[Tuple[int, Dict[str, bytes], Dict[str, Any]]] = None
+
+    @property
+    def action_space(self) -> Optional[ActionSpace]:
+        if self._action_space_factory is not None:
+            with self._action_space_lock:
+                factory = self._action_space_factory
+                if factory is not None:
+                    self._set_action_space(factory(self))
+        return self._action_space
+
+    @action_space.setter
+    def action_space(self, action_space):
+        with self._action_space_lock:
+            self._set_action_space(action_space)
+
+    def _set_action_space(self, action_space):
+        # acepta lista de Function, dict fn_name -> Function o una factory
+        self._action_space_factory = None
+        if callable(action_space) and not isinstance(action_space, (dict, list, tuple)):
+            self._action_space_factory = action_space
+            self._action_space = None
+        elif not action_space:
+            self._action_space = None
+        elif isinstance(action_space, dict):
+            self._action_space = ActionSpace(action_space)
+        else:
+            self._action_space = ActionSpace({f.fn_name: f for f in action_space})
 
-    def next(self, message: str) -> ChatResponse:
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        """
+        Copy of the messages in the history store (read-only: appending to
+        the returned list changes nothing, use history.append(role, content))
+        """
+        return self.history.get_history()
+
+    def next(self, message: str, timeout: Optional[float] = None) -> ChatResponse:
+        """
+        timeout: latency budget for the whole turn in seconds. Every request
+        of the turn (GAME API, Babysitter) uses the time left as its timeout
+        and DeadlineExceeded is raised once it runs out
+        """
+        with deadline(timeout), get_registry().timer("chat_turn_seconds"):
+            try:
+                return self._next(message)
+            finally:
+                self._auto_checkpoint()
+
+    def _next(self, message: str) -> ChatResponse:
+        metrics = get_registry()
         # Guardamos el mensaje del usuario localmente
-        self.conversation_history.append({
-            "role": "user",
-            "content": message
-        })
+        self._add_message("user", message)
 
-        convo_response = self._update_conversation(message)
+        with metrics.timer("chat_phase_seconds", phase="update_chat"):
+            convo_response, function_calls = self._update_conversation(message)
 
         # Guardamos la respuesta del asistente localmente
         if convo_response.message:
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": convo_response.message
-            })
+            self._add_message("assistant", convo_response.message)
+
+        if len(function_calls) > 1:
+            results = run_function_calls(
+                function_calls,
+                self._execute_function_call,
+                self.max_parallel_calls,
+                self.serial_keys,
+            )
+            with metrics.timer("chat_phase_seconds", phase="report_function"):
+                response_message = self._report_function_results(results)
+            return self._multi_response(convo_response, function_calls, results, response_message)
 
         # execute functions/actions if present
         if convo_response.function_call:
-            if not self.action_space:
-                raise Exception("No functions provided")
-
             fn_name = convo_response.function_call.fn_name
-
-            fn_to_call = self.action_space.get(fn_name)
-            if not fn_to_call:
-                raise Exception(
-                    f"Function {fn_name}, returned by the agent, not found in action space"
-                )
-
-            result = fn_to_call.execute(
-                **{
-                    "fn_id": convo_response.function_call.id,
-                    "args": convo_response.function_call.args,
-                }
-            )
-            response_message = self._report_function_result(result)
+            result = self._execute_function_call(convo_response.function_call)
+            with metrics.timer("chat_phase_seconds", phase="report_function"):
+                response_message = self._report_function_result(result)
             function_call_response = FunctionCallResponse(
                 fn_name=fn_name,
                 fn_args=convo_response.function_call.args,
@@ -75,7 +304,78 @@ class Chat:
             function_call=function_call_response,
         )
 
-    def end(self, message: Optional[str] = None):
+    def stream_next(self, message: str, timeout: Optional[float] = None) -> Iterator[ChatStreamEvent]:
+        """
+        Streaming version of next(): yields ChatStreamEvent as the response
+        arrives. The first function call is executed as soon as its event
+        arrives, without waiting for the rest of the body. Further calls run
+        like in next() (run_function_calls) once the body is complete and are
+        reported in one batch. The last event is "done"
+        """
+        # el deadline solo vale mientras corre el turno, no mientras el que
+        # consume tiene el evento en la mano
+        events = iter_within(self._stream_next(message), deadline_at(timeout))
+        with get_registry().timer("chat_turn_seconds"):
+            try:
+                yield from events
+            finally:
+                self._auto_checkpoint()
+
+    def _stream_next(self, message: str) -> Iterator[ChatStreamEvent]:
+        metrics = get_registry()
+        turn = _StreamTurn()
+        self._add_message("user", message)
+
+        with metrics.timer("chat_phase_seconds", phase="update_chat"):
+            events = self._send_update(self.client.stream_chat, message)
+
+        for event in events:
+            if event.get("type") == "done":
+                self._ack_state(event.get("data") or {})
+            content, calls = turn.read(event)
+            if content:
+                yield ChatStreamEvent("message_delta", content=content)
+            for function_call in calls:
+                yield ChatStreamEvent("function_call", function_call=function_call)
+            if calls and not turn.results:
+                # la primera llamada corre ya; el texto previo va antes al historial
+                self._store_streamed(turn)
+                first = turn.function_calls[0]
+                turn.results.append(self._execute_function_call(first))
+                yield ChatStreamEvent("function_result", function_call=first, result=turn.results[0])
+
+        self._store_streamed(turn)
+
+        pending = turn.pending
+        if pending:
+            results = run_function_calls(pending, self._execute_function_call, self.max_parallel_calls, self.serial_keys)
+            turn.results.extend(results)
+            for function_call, result in zip(pending, results):
+                yield ChatStreamEvent("function_result", function_call=function_call, result=result)
+
+        report_message = None
+        if turn.function_calls:
+            with metrics.timer("chat_phase_seconds", phase="report_function"):
+                if len(turn.results) > 1:
+                    report_message = self._report_function_results(turn.results)
+                else:
+                    report_message = self._report_function_result(turn.results[0])
+            yield ChatStreamEvent("message_delta", content=report_message)
+
+        yield ChatStreamEvent("done", response=turn.response(report_message))
+
+    def _store_streamed(self, turn: _StreamTurn):
+        text = turn.take_message()
+        if text:
+            self._add_message("assistant", text)
+
+    def end(self, message: Optional[str] = None, flush_timeout: Optional[float] = END_FLUSH_TIMEOUT):
+        """
+        flush_timeout: seconds to wait for the history sink to deliver this
+        chat's messages (None waits for as long as it takes)
+        """
+        if self.history_sink is not None:
+            self._flushed(self.history_sink.flush(self.chat_id, timeout=flush_timeout))
         self.client.end_chat(
             self.chat_id,
             {
@@ -83,21 +383,183 @@ class Chat:
             },
         )
 
-    def _update_conversation(self, message: str) -> GameChatResponse:
+    def _flushed(self, delivered: bool):
+        if not delivered:
+            # los mensajes siguen en la cola del sink, se mandan después
+            logger.warning("History of chat %s was not delivered before end, still pending in the sink", self.chat_id)
+
+    def _update_conversation(self, message: str) -> Tuple[GameChatResponse, List[FunctionCall]]:
+        return self._parse_update(self._send_update(self.client.update_chat, message))
+
+    def _parse_update(self, data: Dict[str, Any]) -> Tuple[GameChatResponse, List[FunctionCall]]:
+        """The response plus every function call of the turn"""
+        convo_response = GameChatResponse.model_validate(data)
+        return convo_response, parse_function_calls(data, convo_response)
+
+    def _send_update(self, send: Callable[[str, Dict[str, Any]], Any], message: str) -> Any:
+        """send is client.update_chat or client.stream_chat"""
+        data = self._build_update_data(message)
+        try:
+            result = send(self.chat_id, data)
+        except GAMEAPIError as e:
+            if not self._needs_full_payload(data, e):
+                raise
+            # el servidor no reconoce el hash o la base del diff, mandamos todo completo
+            data = self._with_full_payload(data)
+            result = send(self.chat_id, data)
+        self._sent_functions_hash = data.get("functions_hash")
+        if isinstance(result, dict):
+            self._ack_state(result)
+        return result
+
+    def _build_update_data(self, message: str) -> Dict[str, Any]:
         data = {
             "message": message,
-            "state": self.get_state_fn() if self.get_state_fn else None,
-            "functions": (
-                [f.get_function_def() for f in self.action_space.values()]
-                if self.action_space
-                else None
-            ),
+            **self._state_fields(),
+            "functions": self.action_space.get_function_defs() if self.action_space else None,
         }
-        result = self.client.update_chat(self.chat_id, data)
-        return GameChatResponse.model_validate(result)
+        if self.send_functions_hash and self.action_space:
+            functions_hash = self.action_space.hash
+            data["functions_hash"] = functions_hash
+            if functions_hash == self._sent_functions_hash:
+                data["functions"] = None
+        return data
+
+    def _sent_hash_only(self, data: Dict[str, Any]) -> bool:
+        return data.get("functions") is None and "functions_hash" in data
+
+    def _with_full_functions(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self._sent_functions_hash = None
+        return {**data, "functions": self.action_space.get_function_defs()}
+
+    def _state_fields(self) -> Dict[str, Any]:
+        """
+        "state" with the whole get_state_fn() result, or in diff mode
+        "state_patch" {"set": changed keys, "unset": removed keys} applied on
+        top of version "state_base". "state_version" numbers what is sent
+        """
+        state = self.get_state_fn() if self.get_state_fn else None
+        if not self.state_diff or not isinstance(state, dict):
+            return {"state": state}
+        if self._pending_state is not None:
+            # el turno anterior no llegó a confirmarse, no sabemos qué tiene el servidor
+            self._acked_state = None
+        self._state_version += 1
+        encoded = {key: json_dumps(value) for key, value in state.items()}
+        self._pending_state = (self._state_version, encoded, state)
+        fields: Dict[str, Any] = {"state_diff": True, "state_version": self._state_version}
+        if self._acked_state is None:
+            fields["state"] = state
+            get_registry().inc("chat_state_total", mode="full")
+            return fields
+        base_version, base = self._acked_state
+        fields["state"] = None
+        fields["state_patch"] = {
+            "set": {key: state[key] for key, value in encoded.items() if base.get(key) != value},
+            "unset": [key for key in base if key not in encoded],
+        }
+        fields["state_base"] = base_version
+        get_registry().inc("chat_state_total", mode="patch")
+        return fields
+
+    def _needs_full_payload(self, data: Dict[str, Any], error: GAMEAPIError) -> bool:
+        """
+        Only an "unknown hash/base" answer is retried with the full payload,
+        any other failure (5xx, bad JSON...) could mean the turn was processed
+        """
+        if error.status_code not in UNKNOWN_BASE_STATUSES:
+            return False
+        return self._sent_hash_only(data) or self._sent_state_patch(data)
+
+    def _sent_state_patch(self, data: Dict[str, Any]) -> bool:
+        return "state_patch" in data
+
+    def _with_full_state(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self._acked_state = None
+        full = {key: value for key, value in data.items() if key not in ("state_patch", "state_base")}
+        full["state"] = self._pending_state[2]
+        return full
+
+    def _with_full_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        if self._sent_hash_only(data):
+            data = self._with_full_functions(data)
+        if self._sent_state_patch(data):
+            data = self._with_full_state(data)
+        return data
+
+    def _ack_state(self, response: Dict[str, Any]):
+        """The server answers with the state_version it now holds, if it supports diffs"""
+        pending = self._pending_state
+        if pending is None:
+            return
+        self._pending_state = None
+        version, encoded, _ = pending
+        # sin confirmación el servidor no guarda el estado: el próximo turno va completo
+        self._acked_state = (version, encoded) if response.get("state_version") == version else None
+
+    def _get_function(self, fn_name: str) -> Function:
+        if not self.action_space:
+            raise Exception("No functions provided")
+
+        fn_to_call = self.action_space.get(fn_name)
+        if not fn_to_call:
+            raise Exception(
+                f"Function {fn_name}, returned by the agent, not found in action space"
+            )
+        return fn_to_call
+
+    def _execute_function_call(self, function_call: FunctionCall) -> FunctionResult:
+        fn_to_call = self._get_function(function_call.fn_name)
+        with get_registry().timer("chat_phase_seconds", phase="action", fn_name=function_call.fn_name):
+            return fn_to_call.execute(
+                **{
+                    "fn_id": function_call.id,
+                    "args": function_call.args,
+                }
+            )
 
     def _report_function_result(self, result: FunctionResult) -> str:
-        data = {
+        response = self.client.report_function(self.chat_id, self._build_report_data(result))
+        return self._get_report_message(response)
+
+    def _report_function_results(self, results: List[FunctionResult]) -> str:
+        if self._batch_reports:
+            try:
+                response = self.client.report_functions(self.chat_id, self._build_batch_report_data(results))
+                return self._get_report_message(response)
+            except GAMEAPIError as e:
+                if e.status_code not in BATCH_UNSUPPORTED_STATUSES:
+                    raise
+                # el servidor no acepta reportes en lote, los mandamos uno por uno
+                self._batch_reports = False
+        message = ""
+        for result in results:
+            message = self._report_function_result(result)
+        return message
+
+    def _build_batch_report_data(self, results: List[FunctionResult]) -> Dict[str, Any]:
+        return {"results": [self._build_report_data(result) for result in results]}
+
+    def _multi_response(
+        self,
+        convo_response: GameChatResponse,
+        function_calls: List[FunctionCall],
+        results: List[FunctionResult],
+        message: str,
+    ) -> MultiChatResponse:
+        responses = [
+            FunctionCallResponse(fn_name=call.fn_name, fn_args=call.args, result=result)
+            for call, result in zip(function_calls, results)
+        ]
+        return MultiChatResponse(
+            message=message,
+            is_finished=convo_response.is_finished,
+            function_call=responses[0],
+            function_calls=responses,
+        )
+
+    def _build_report_data(self, result: FunctionResult) -> Dict[str, Any]:
+        return {
             "fn_id": result.action_id,
             "result": (
                 f"{result.action_status.value}: {result.feedback_message}"
@@ -105,16 +567,49 @@ class Chat:
                 else result.action_status.value
             ),
         }
-        response = self.client.report_function(self.chat_id, data)
 
+    def _get_report_message(self, response: dict) -> str:
         message = response.get("message")
         if not message:
             raise Exception("Agent did not return a message for the function report.")
         return message
 
-    def get_history(self) -> List[Dict[str, str]]:
-        """Obtiene el historial de la conversación"""
-        return self.conversation_history
+    def checkpoint(self):
+        """Writes the messages added since the last checkpoint to the session store"""
+        if self.session_store is None:
+            return
+        with self._checkpoint_lock:
+            start, messages = self.history.read_from(self._checkpointed)
+            if messages:
+                self.session_store.append_messages(self.chat_id, start, messages)
+                self._checkpointed = start + len(messages)
+
+    def _auto_checkpoint(self):
+        # un fallo al guardar no debe romper el turno, se reintenta en el siguiente
+        try:
+            self.checkpoint()
+        except Exception:
+            logger.warning("Checkpoint of chat %s failed", self.chat_id, exc_info=True)
+
+    def get_stored_history(self, start: int = 0, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Ranged read of the full transcript from the session store (messages
+        with absolute index >= start), including turns no longer kept in memory
+        """
+        if self.session_store is None:
+            raise Exception("Chat has no session store")
+        self.checkpoint()
+        return self.session_store.read_range(self.chat_id, start, limit)
+
+    def _add_message(self, role: str, content: str):
+        seq = self.history.total
+        self.history.append(role, content)
+        if self.history_sink is not None:
+            self.history_sink.add(self.chat_id, role, content, seq)
+
+    def get_history(self, last_n: Optional[int] = None) -> List[Dict[str, str]]:
+        """Obtiene el historial de la conversación (o los últimos last_n mensajes)"""
+        return self.history.get_history(last_n)
 
 
 class ChatAgent:
@@ -122,12 +617,33 @@ class ChatAgent:
         self,
         api_key: str,
         prompt: str,
+        session: Optional["requests.Session"] = None,
+        pool_config: Optional[PoolConfig] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        session_store: Optional[SessionStore] = None,
+        history_sink: Optional[HistorySink] = None,
+        compression: Optional[Compression] = None,
+        state_diff: bool = False,
     ):
+        """
+        session_store: chats are persisted there and can be brought back
+        after a restart with resume_chat()
+        history_sink: write-behind mirror of the messages of every chat to
+        the server-side history
+        compression: gzip/zstd for request bodies above a size threshold
+        state_diff: chats send only the state keys that changed (see Chat)
+        """
         self._api_key = api_key
         self.prompt = prompt
+        self.session_store = session_store
+        self.history_sink = history_sink
+        self.state_diff = state_diff
 
+        # pasar get_shared_session() para compartir el pool entre agentes
         if api_key.startswith("apt-"):
-            self.client = GAMEClientV2(api_key)
+            self.client = GAMEClientV2(
+                api_key, session=session, pool_config=pool_config, base_url=base_url, compression=compression
+            )
         else:
             raise Exception("Please use V2 API key to use ChatAgent")
 
@@ -137,6 +653,7 @@ class ChatAgent:
         partner_name: str,
         action_space: Optional[List[Function]] = None,
         get_state_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+        history_store: Optional[HistoryStore] = None,
     ) -> Chat:
 
         chat_id = self.client.create_chat(
@@ -147,4 +664,60 @@ class ChatAgent:
             },
         )
 
-        return Chat(chat_id, self.client, action_space, get_state_fn)
+        if self.session_store is not None:
+            self.session_store.save_session(chat_id, session_meta(partner_id, partner_name))
+        return Chat(
+            chat_id,
+            self.client,
+            action_space,
+            get_state_fn,
+            history_store,
+            session_store=self.session_store,
+            history_sink=self.history_sink,
+            state_diff=self.state_diff,
+        )
+
+    def resume_chat(
+        self,
+        chat_id: str,
+        action_space: Optional[List[Function]] = None,
+        get_state_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+        history_store: Optional[HistoryStore] = None,
+        recent: int = 50,
+    ) -> Chat:
+        """
+        Rebuilds a chat saved in the session store, loading only its last
+        `recent` messages (older ones stay readable with get_stored_history).
+        Functions can't be persisted, pass the action space again
+        """
+        history, session_store = load_session_history(self.session_store, chat_id, history_store, recent)
+        return Chat(
+            chat_id,
+            self.client,
+            action_space,
+            get_state_fn,
+            history,
+            session_store=session_store,
+            history_sink=self.history_sink,
+            state_diff=self.state_diff,
+        )
+
+
+def session_meta(partner_id: str, partner_name: str) -> Dict[str, Any]:
+    return {"partner_id": partner_id, "partner_name": partner_name, "created_at": time.time()}
+
+
+def load_session_history(
+    session_store: Optional[SessionStore],
+    chat_id: str,
+    history_store: Optional[HistoryStore],
+    recent: int,
+) -> Tuple[HistoryStore, SessionStore]:
+    if session_store is None:
+        raise Exception("resume_chat needs a ChatAgent created with a session_store")
+    if session_store.load_session(chat_id) is None:
+        raise KeyError(f"Chat {chat_id} not found in the session store")
+    history = history_store if history_store is not None else CompactHistoryStore()
+    start, messages = session_store.read_recent(chat_id, recent)
+    history.restore(start, messages)
+    return history, session_store
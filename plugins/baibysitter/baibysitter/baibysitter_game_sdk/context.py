@@ -0,0 +1,119 @@
+import hashlib
+import threading
+from typing import Dict, List, Optional, Any
+from baibysitter.baibysitter_game_sdk.history import HistoryStore
+
+
+def render_message(msg: Dict[str, str]) -> str:
+    role = "User" if msg["role"] == "user" else "Assistant"
+    return f"{role}: {msg['content']}"
+
+
+class ConversationContext:
+    """
+    Rendered transcript of a chat as seen by the validator.
+
+    Messages are rendered once and appended to a cached prefix together with a
+    running sha256 digest, so a validation only costs the new messages. When
+    the validator hands back a context handle (context_id) we remember how much
+    of the transcript it already has (acked_count) and only send the delta.
+    If the history evicted messages the validator never got, the next
+    validation opens a new context with the retained window instead.
+
+    Counts are absolute message indexes of the chat HistoryStore. Lines for
+    messages the store already evicted are dropped too, so the cached prefix
+    follows the history window instead of growing forever.
+    """
+    def __init__(self):
+        self.lines: List[str] = []
+        self.first_index = 0
+        self.rendered_count = 0
+        self.context_id: Optional[str] = None
+        self.acked_count = 0
+        self.acked_digest: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._text: Optional[str] = ""
+        self._lock = threading.Lock()
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "\n".join(self.lines)
+        return self._text
+
+    def sync(self, history: HistoryStore):
+        """Renders messages that were appended to the chat history since the last sync"""
+        with self._lock:
+            start, new_messages = history.read_from(self.rendered_count)
+            if start > self.rendered_count:
+                # mensajes desalojados antes de renderizarlos, empezamos de nuevo la ventana
+                self.lines = []
+                self.first_index = start
+            for msg in new_messages:
+                line = render_message(msg)
+                self.lines.append(line)
+                self._hash.update(line.encode())
+                self._hash.update(b"\n")
+            self.rendered_count = start + len(new_messages)
+
+            evicted = history.first_index - self.first_index
+            if evicted > 0:
+                del self.lines[:evicted]
+                self.first_index += evicted
+            if new_messages or evicted > 0:
+                self._text = None
+
+    def delta(self) -> str:
+        return "\n".join(self.lines[max(self.acked_count - self.first_index, 0):])
+
+    def build_fields(self, incremental: bool) -> Dict[str, Any]:
+        """
+        Returns the transcript fields of the validation payload. Full transcript
+        unless incremental is on and the validator already holds a context.
+        contextLength/contextDigest always describe the whole transcript sent
+        so far, that is what gets acknowledged afterwards
+        """
+        with self._lock:
+            fields: Dict[str, Any] = {}
+            if not incremental:
+                fields["reason"] = self.text
+                return fields
+
+            fields["contextLength"] = self.rendered_count
+            fields["contextDigest"] = self.digest
+            if self.context_id is not None and self.acked_count < self.first_index:
+                # la historia desalojó mensajes que el validador nunca recibió:
+                # un delta dejaría un hueco, se abre un contexto nuevo con la ventana
+                self._forget()
+            if self.context_id is None:
+                fields["reason"] = self.text
+                fields["createContext"] = True
+            else:
+                fields["reason"] = self.delta()
+                fields["contextId"] = self.context_id
+                fields["contextOffset"] = self.acked_count
+                fields["contextBaseDigest"] = self.acked_digest
+            return fields
+
+    def acknowledge(self, context_id: str, upto: int, digest: str):
+        """The validator confirmed it holds the first `upto` rendered messages"""
+        with self._lock:
+            if upto < self.acked_count or upto > self.rendered_count:
+                return
+            self.context_id = context_id
+            self.acked_count = upto
+            self.acked_digest = digest
+
+    def reset(self):
+        """Forget the validator handle, next validation sends the full transcript"""
+        with self._lock:
+            self._forget()
+
+    def _forget(self):
+        self.context_id = None
+        self.acked_count = 0
+        self.acked_digest = None
@@ -0,0 +1,138 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Collection, Deque, List, Optional, Sequence
+
+LEAST_OUTSTANDING = "least_outstanding"
+LATENCY = "latency"
+
+
+class Endpoint:
+    __slots__ = ("url", "outstanding", "ewma", "failures", "failed_at", "cooldown_until", "requests")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.ewma: Optional[float] = None
+        self.failures = 0
+        self.failed_at = 0.0
+        self.cooldown_until = 0.0
+        self.requests = 0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+
+class EndpointPool:
+    """
+    Validator endpoints with passive health checks and load balancing.
+
+    An endpoint that fails failure_threshold times in a row is left out for
+    cooldown seconds (if every endpoint is cooling down the one that recovers
+    first is used). Among the healthy ones, endpoints that failed in the last
+    cooldown seconds go last, then:
+
+    least_outstanding: fewest requests in flight, then lowest latency
+    latency: lowest EWMA latency x (requests in flight + 1)
+
+    hedge: after hedge_delay seconds (default: p95 of recent latencies) a
+    second copy of the request goes to another endpoint and the first good
+    verdict wins.
+    """
+    def __init__(
+        self,
+        urls: Sequence[str],
+        strategy: str = LEAST_OUTSTANDING,
+        failure_threshold: int = 3,
+        cooldown: float = 10.0,
+        hedge: bool = False,
+        hedge_delay: Optional[float] = None,
+        min_hedge_delay: float = 0.01,
+        ewma_alpha: float = 0.3,
+    ):
+        if not urls:
+            raise ValueError("At least one validator endpoint is needed")
+        if strategy not in (LEAST_OUTSTANDING, LATENCY):
+            raise ValueError(f"Unknown balancing strategy {strategy!r}")
+        self.endpoints: List[Endpoint] = [Endpoint(url) for url in urls]
+        self.strategy = strategy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.hedge = hedge and len(self.endpoints) > 1
+        self._hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.ewma_alpha = ewma_alpha
+        # últimas latencias (todas las réplicas) para el p95 del hedge
+        self._latencies: Deque[float] = deque(maxlen=256)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def pick(self, exclude: Collection[Endpoint] = ()) -> Endpoint:
+        """Chooses an endpoint and counts the request as in flight"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude] or self.endpoints
+            healthy = [e for e in candidates if e.healthy(now)]
+            if healthy:
+                endpoint = min(healthy, key=lambda e: self._score(e, now))
+            else:
+                endpoint = min(candidates, key=lambda e: e.cooldown_until)
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _score(self, endpoint: Endpoint, now: float):
+        # los que acaban de fallar van al final, random() rompe empates
+        failing = endpoint.failures > 0 and now < endpoint.failed_at + self.cooldown
+        latency = endpoint.ewma if endpoint.ewma is not None else 0.0
+        if self.strategy == LATENCY:
+            return (failing, latency * (endpoint.outstanding + 1), random.random())
+        return (failing, endpoint.outstanding, latency, random.random())
+
+    def finish(self, endpoint: Endpoint, latency: float, ok: Optional[bool]):
+        """
+        Ends a request picked with pick(). ok=None for an abandoned request
+        (the losing copy of a hedge), which says nothing about the endpoint
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok is None:
+                return
+            if ok:
+                endpoint.failures = 0
+                endpoint.ewma = latency if endpoint.ewma is None else (
+                    self.ewma_alpha * latency + (1 - self.ewma_alpha) * endpoint.ewma
+                )
+                self._latencies.append(latency)
+            else:
+                endpoint.failures += 1
+                endpoint.failed_at = time.monotonic()
+                if endpoint.failures >= self.failure_threshold:
+                    endpoint.cooldown_until = endpoint.failed_at + self.cooldown
+
+    def hedge_delay(self) -> float:
+        if self._hedge_delay is not None:
+            return self._hedge_delay
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < 20:
+            # pocas muestras todavía, esperamos más antes de duplicar
+            return max(latencies[-1] if latencies else 0.5, self.min_hedge_delay)
+        return max(latencies[int(0.95 * (len(latencies) - 1))], self.min_hedge_delay)
+
+    def stats(self) -> List[dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": e.url,
+                    "healthy": e.healthy(now),
+                    "outstanding": e.outstanding,
+                    "ewma_seconds": e.ewma,
+                    "requests": e.requests,
+                }
+                for e in self.endpoints
+            ]
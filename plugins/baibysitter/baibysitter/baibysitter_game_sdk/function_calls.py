@@ -0,0 +1,94 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, Union
+from baibysitter.baibysitter_game_sdk.lazy import lazy_import
+
+# para arun_function_calls
+asyncio = lazy_import("asyncio")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# fn_name -> clave fija o función(args) -> clave (None = sin restricción)
+SerialKey = Union[str, Callable[[Dict[str, Any]], Optional[str]]]
+
+
+def serial_key(function_call: Any, serial_keys: Dict[str, SerialKey]) -> Optional[str]:
+    key = serial_keys.get(function_call.fn_name)
+    if callable(key):
+        return key(function_call.args)
+    return key
+
+
+def group_calls(calls: Sequence[Any], serial_keys: Dict[str, SerialKey]) -> List[List[int]]:
+    """
+    Splits the calls of a turn in lanes (lists of indexes). Calls with the
+    same serial key share a lane and run in order; every other call gets its
+    own lane and may run concurrently
+    """
+    lanes: List[List[int]] = []
+    by_key: Dict[str, List[int]] = {}
+    for i, call in enumerate(calls):
+        key = serial_key(call, serial_keys)
+        if key is None:
+            lanes.append([i])
+            continue
+        lane = by_key.get(key)
+        if lane is None:
+            lane = by_key[key] = []
+            lanes.append(lane)
+        lane.append(i)
+    return lanes
+
+
+def run_function_calls(
+    calls: Sequence[T],
+    execute: Callable[[T], R],
+    max_parallel: int = 4,
+    serial_keys: Optional[Dict[str, SerialKey]] = None,
+) -> List[R]:
+    """
+    Runs execute(call) for every call on up to max_parallel threads, keeping
+    serial lanes in order. Results come back in the order of calls
+    """
+    lanes = group_calls(calls, serial_keys or {})
+    results: List[Any] = [None] * len(calls)
+
+    def run_lane(lane: List[int]):
+        for i in lane:
+            results[i] = execute(calls[i])
+
+    if len(lanes) <= 1 or max_parallel <= 1:
+        for lane in lanes:
+            run_lane(lane)
+        return results
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_parallel, len(lanes)),
+        thread_name_prefix="chat-functions",
+    ) as executor:
+        # cada hilo con su copia del contexto (deadline del turno)
+        futures = [executor.submit(contextvars.copy_context().run, run_lane, lane) for lane in lanes]
+        for future in futures:
+            future.result()
+    return results
+
+
+async def arun_function_calls(
+    calls: Sequence[T],
+    execute: Callable[[T], Awaitable[R]],
+    max_parallel: int = 4,
+    serial_keys: Optional[Dict[str, SerialKey]] = None,
+) -> List[R]:
+    """asyncio version of run_function_calls"""
+    lanes = group_calls(calls, serial_keys or {})
+    results: List[Any] = [None] * len(calls)
+    semaphore = asyncio.Semaphore(max(max_parallel, 1))
+
+    async def run_lane(lane: List[int]):
+        for i in lane:
+            async with semaphore:
+                results[i] = await execute(calls[i])
+
+    await asyncio.gather(*(run_lane(lane) for lane in lanes))
+    return results
@@ -0,0 +1,172 @@
+import json
+import sys
+from abc import ABC, abstractmethod
+import threading
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def estimate_tokens(content: str) -> int:
+    """Rough token count (~4 chars per token), good enough for budgeting"""
+    return len(content) // 4 + 1
+
+
+class HistoryStore(ABC):
+    """
+    Storage for the local conversation history of a Chat.
+
+    Messages get an absolute index (0 for the first message ever appended)
+    that doesn't change when old messages are evicted, so consumers like
+    Babysitter can ask for "everything after message N".
+    """
+    @abstractmethod
+    def append(self, role: str, content: str):
+        """Adds a message with the next absolute index (total)"""
+
+    @abstractmethod
+    def get_history(self, last_n: Optional[int] = None) -> List[Dict[str, str]]:
+        """Retained messages (or the last `last_n`) as role/content dicts"""
+
+    @abstractmethod
+    def read_from(self, index: int) -> Tuple[int, List[Dict[str, str]]]:
+        """
+        Returns (start, messages) with the retained messages whose absolute
+        index is >= index. start is the absolute index of messages[0], bigger
+        than index if some of them were already evicted
+        """
+
+    @abstractmethod
+    def restore(self, start: int, messages: List[Dict[str, str]]):
+        """
+        Loads messages into an empty store, messages[0] gets absolute index
+        start (used to resume a chat with only its recent turns)
+        """
+
+    @property
+    @abstractmethod
+    def total(self) -> int:
+        """Number of messages ever appended"""
+
+    @property
+    @abstractmethod
+    def first_index(self) -> int:
+        """Absolute index of the oldest retained message"""
+
+    def __len__(self) -> int:
+        return self.total - self.first_index
+
+
+class _Turn:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: str, content: str, tokens: int):
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+
+class CompactHistoryStore(HistoryStore):
+    """
+    In-memory history with __slots__ records and interned roles.
+
+    max_messages / max_tokens bound what stays in memory, oldest turns are
+    evicted first (the newest message is always kept). If spill_path is set
+    evicted turns are appended to that file as JSON lines and can be read
+    back with read_spilled().
+    """
+    def __init__(
+        self,
+        max_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        spill_path: Optional[str] = None,
+    ):
+        self.max_messages = max_messages
+        self.max_tokens = max_tokens
+        self.spill_path = spill_path
+        self._turns: deque = deque()
+        self._first_index = 0
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        return self._first_index + len(self._turns)
+
+    @property
+    def first_index(self) -> int:
+        return self._first_index
+
+    @property
+    def tokens(self) -> int:
+        return self._tokens
+
+    def append(self, role: str, content: str):
+        turn = _Turn(sys.intern(role), content, estimate_tokens(content))
+        with self._lock:
+            self._turns.append(turn)
+            self._tokens += turn.tokens
+            self._evict()
+
+    def restore(self, start: int, messages: List[Dict[str, str]]):
+        with self._lock:
+            if self._turns or self._first_index:
+                raise ValueError("restore() needs an empty history store")
+            self._first_index = start
+            for message in messages:
+                turn = _Turn(sys.intern(message["role"]), message["content"], estimate_tokens(message["content"]))
+                self._turns.append(turn)
+                self._tokens += turn.tokens
+            self._evict()
+
+    def get_history(self, last_n: Optional[int] = None) -> List[Dict[str, str]]:
+        with self._lock:
+            turns = list(self._turns)
+        if last_n is not None:
+            turns = turns[-last_n:] if last_n > 0 else []
+        return [t.as_dict() for t in turns]
+
+    def read_from(self, index: int) -> Tuple[int, List[Dict[str, str]]]:
+        with self._lock:
+            start = max(index, self._first_index)
+            offset = start - self._first_index
+            turns = list(islice(self._turns, offset, None))
+        return start, [t.as_dict() for t in turns]
+
+    def read_spilled(self) -> Iterator[Dict[str, str]]:
+        """Evicted messages from the spill log, oldest first"""
+        if not self.spill_path:
+            return
+        try:
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def _over_budget(self) -> bool:
+        if len(self._turns) <= 1:
+            return False
+        if self.max_messages is not None and len(self._turns) > self.max_messages:
+            return True
+        return self.max_tokens is not None and self._tokens > self.max_tokens
+
+    def _evict(self):
+        evicted = []
+        while self._over_budget():
+            turn = self._turns.popleft()
+            self._tokens -= turn.tokens
+            evicted.append((self._first_index, turn))
+            self._first_index += 1
+        if evicted and self.spill_path:
+            self._spill(evicted)
+
+    def _spill(self, evicted: List[Tuple[int, _Turn]]):
+        # log append-only, una línea JSON por mensaje
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            for index, turn in evicted:
+                f.write(json.dumps({"index": index, "role": turn.role, "content": turn.content}) + "\n")
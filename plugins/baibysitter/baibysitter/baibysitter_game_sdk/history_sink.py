@@ -0,0 +1,255 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, List, Optional
+from baibysitter.baibysitter_game_sdk.api_v2 import GAMEAPIError
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+# el servidor no tiene /history/batch, se manda mensaje por mensaje
+BATCH_UNSUPPORTED_STATUSES = (404, 405, 501)
+BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+# 4xx que pueden salir bien si se reintenta, el resto no se arregla solo
+RETRYABLE_CLIENT_STATUSES = (408, 425, 429)
+
+
+def _retryable(status_code: int) -> bool:
+    return status_code >= 500 or status_code in RETRYABLE_CLIENT_STATUSES
+
+
+class _Queue:
+    __slots__ = ("messages", "first_added", "inflight", "retry_at", "failures", "rejections", "flush_requested")
+
+    def __init__(self):
+        self.messages: Deque[Dict] = deque()
+        self.first_added = 0.0
+        self.inflight = False
+        self.retry_at = 0.0
+        self.failures = 0
+        self.rejections = 0
+        self.flush_requested = False
+
+
+class HistorySink:
+    """
+    Write-behind mirror of chat messages to the server-side history
+    (save_messages), so persisting history doesn't add requests to the turn.
+
+    Messages are buffered per conversation and sent by background threads in
+    batches of up to max_batch, when a batch is full or flush_interval
+    seconds after its first message. Each conversation has at most one batch
+    in flight and a failed batch is retried (with backoff) before anything
+    after it, so messages arrive in order, at least once. "seq" (the absolute
+    history index) lets the server drop duplicates.
+
+    client is a GAMEClientV2 (a sync client, also for AsyncChat). add() blocks
+    while max_pending messages are waiting (add(..., block=False) returns
+    False instead, for callers on an event loop). A batch the server keeps rejecting
+    with a non-retryable 4xx is logged and dropped after max_attempts tries.
+    """
+    def __init__(
+        self,
+        client,
+        max_batch: int = 50,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+        max_backoff: float = 30.0,
+        workers: int = 1,
+        max_attempts: int = 5,
+    ):
+        self.client = client
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self._queues: Dict[str, _Queue] = {}
+        self._pending = 0
+        self._closed = False
+        self._batch_supported = True
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"history-sink-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def add(self, conversation_id: str, role: str, content: str, seq: int, block: bool = True) -> bool:
+        """Queues a message. With block=False a full sink returns False (nothing queued)"""
+        with self._cond:
+            while self._pending >= self.max_pending and not self._closed:
+                if not block:
+                    return False
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("HistorySink is closed")
+            queue = self._queues.get(conversation_id)
+            if queue is None:
+                queue = self._queues[conversation_id] = _Queue()
+            if not queue.messages:
+                queue.first_added = time.monotonic()
+            queue.messages.append({"role": role, "content": content, "seq": seq})
+            self._pending += 1
+            if len(queue.messages) >= self.max_batch:
+                self._cond.notify_all()
+            return True
+
+    def flush(self, conversation_id: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Sends what is buffered (for one conversation, or all) right away and
+        waits until it is delivered. False if timeout passed first
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                targets = self._targets(conversation_id)
+                if not targets:
+                    return True
+                # se marca en cada vuelta: una cola vaciada pierde la marca
+                for queue in targets:
+                    queue.flush_requested = True
+                left = None if end is None else end - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cond.notify_all()
+                self._cond.wait(left)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flushes everything and stops the background threads"""
+        delivered = self.flush(timeout=timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        return delivered
+
+    def _targets(self, conversation_id: Optional[str]) -> List[_Queue]:
+        if conversation_id is None:
+            return [q for q in self._queues.values() if q.messages]
+        queue = self._queues.get(conversation_id)
+        return [queue] if queue is not None and queue.messages else []
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+            conversation_id, messages = batch
+            self._send(conversation_id, messages)
+
+    def _next_batch(self):
+        """Waits (holding the condition) for a conversation ready to send"""
+        while True:
+            now = time.monotonic()
+            wait = self.flush_interval
+            for conversation_id, queue in self._queues.items():
+                if queue.inflight or not queue.messages:
+                    continue
+                if now < queue.retry_at:
+                    wait = min(wait, queue.retry_at - now)
+                    continue
+                due = queue.first_added + self.flush_interval
+                if self._closed or queue.flush_requested or len(queue.messages) >= self.max_batch or now >= due:
+                    queue.inflight = True
+                    return conversation_id, list(islice(queue.messages, 0, self.max_batch))
+                wait = min(wait, due - now)
+            if self._closed and not self._pending:
+                return None
+            self._cond.wait(max(wait, 0.001))
+
+    def _send(self, conversation_id: str, messages: List[Dict]):
+        metrics = get_registry()
+        sent = 0
+        try:
+            if self._batch_supported:
+                try:
+                    with metrics.timer("history_sink_seconds"):
+                        self.client.save_messages(conversation_id, messages)
+                    metrics.observe("history_sink_batch_size", len(messages), buckets=BATCH_BUCKETS)
+                    self._ack(conversation_id, len(messages))
+                    return
+                except GAMEAPIError as e:
+                    if e.status_code not in BATCH_UNSUPPORTED_STATUSES:
+                        raise
+                    logger.info("History batch endpoint not available, saving messages one by one")
+                    self._batch_supported = False
+            for message in messages:
+                with metrics.timer("history_sink_seconds"):
+                    self.client.save_message(conversation_id, message)
+                self._ack(conversation_id, 1)
+                sent += 1
+        except GAMEAPIError as e:
+            if _retryable(e.status_code) or not self._give_up(conversation_id):
+                logger.warning("Saving history of chat %s failed (status %s), will retry", conversation_id, e.status_code)
+                metrics.inc("history_sink_failures_total")
+                self._retry_later(conversation_id)
+                return
+            logger.error(
+                "Saving history of chat %s failed %d times (status %s), dropping %d messages",
+                conversation_id, self.max_attempts, e.status_code, len(messages) - sent,
+            )
+            self._drop(conversation_id, len(messages) - sent)
+        except Exception:
+            logger.warning("Saving history of chat %s failed, will retry", conversation_id, exc_info=True)
+            metrics.inc("history_sink_failures_total")
+            self._retry_later(conversation_id)
+        finally:
+            self._release(conversation_id)
+
+    def _ack(self, conversation_id: str, count: int):
+        with self._cond:
+            self._pop(conversation_id, count)
+            get_registry().inc("history_sink_messages_total", count)
+
+    def _drop(self, conversation_id: str, count: int):
+        with self._cond:
+            self._pop(conversation_id, count)
+            get_registry().inc("history_sink_dropped_total", count)
+
+    def _pop(self, conversation_id: str, count: int):
+        queue = self._queues[conversation_id]
+        for _ in range(count):
+            queue.messages.popleft()
+        self._pending -= count
+        queue.failures = 0
+        queue.rejections = 0
+        if queue.messages:
+            queue.first_added = time.monotonic()
+        else:
+            # flush() ya terminó para esta conversación, lo que llegue después
+            # vuelve a esperar max_batch o flush_interval
+            queue.flush_requested = False
+        self._cond.notify_all()
+
+    def _give_up(self, conversation_id: str) -> bool:
+        """Counts a non-retryable failure, True once max_attempts is reached"""
+        with self._cond:
+            queue = self._queues[conversation_id]
+            queue.rejections += 1
+            return queue.rejections >= self.max_attempts
+
+    def _retry_later(self, conversation_id: str):
+        with self._cond:
+            queue = self._queues[conversation_id]
+            queue.failures += 1
+            backoff = min(self.max_backoff, 0.5 * (2 ** queue.failures))
+            queue.retry_at = time.monotonic() + random.uniform(backoff / 2, backoff)
+
+    def _release(self, conversation_id: str):
+        with self._cond:
+            queue = self._queues[conversation_id]
+            queue.inflight = False
+            if not queue.messages:
+                del self._queues[conversation_id]
+            self._cond.notify_all()
@@ -0,0 +1,44 @@
+import importlib
+import sys
+import types
+from typing import Optional
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that is imported the first time one of its
+    attributes is used (httpx.post, requests.Session...), so importing this
+    package doesn't pay for HTTP clients a process may never use.
+
+    Annotations that mention the module must not be evaluated at import
+    time (from __future__ import annotations).
+    """
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module: Optional[types.ModuleType] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self._module
+        if module is None:
+            # import_module ya es thread-safe (lock por módulo)
+            module = self._module = importlib.import_module(self.__name__)
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None or self.__name__ in sys.modules
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self.__name__!r} ({'loaded' if self._module is not None else 'not loaded'})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """The module if it was already imported, a LazyModule otherwise"""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
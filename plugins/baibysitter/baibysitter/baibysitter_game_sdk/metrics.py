@@ -0,0 +1,159 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = Tuple[Tuple[str, str], ...]
+Hook = Callable[[str, Dict[str, str], float], None]
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style)"""
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # el último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "buckets": dict(zip(self.buckets + (float("inf"),), self.counts)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process metrics: labelled counters and histograms plus optional hooks.
+
+    Hooks are called as hook(name, labels, value) for every histogram
+    observation, to forward timings to another system. snapshot() and
+    render_text() expose everything for scraping.
+    """
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._hooks: List[Hook] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook):
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Hook):
+        self._hooks.remove(hook)
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+        for hook in self._hooks:
+            hook(name, labels, value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Records the duration of the block in histogram `name`. Exceptions are
+        counted in `errors_total` with the exception class and re-raised
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc("errors_total", metric=name, error=type(e).__name__, **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def get_histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def snapshot(self) -> Dict[str, List[Dict[str, object]]]:
+        with self._lock:
+            histograms = [
+                {"name": name, "labels": dict(labels), **h.as_dict()}
+                for (name, labels), h in self._histograms.items()
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+        return {"histograms": histograms, "counters": counters}
+
+    def render_text(self) -> str:
+        """Prometheus text exposition format"""
+        def fmt(labels: Labels, extra: str = "") -> str:
+            parts = [f'{k}="{v}"' for k, v in labels]
+            if extra:
+                parts.append(extra)
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{name}{fmt(labels)} {value}")
+            for (name, labels), h in sorted(self._histograms.items(), key=lambda item: item[0]):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{fmt(labels, le)} {cumulative}")
+                inf = 'le="+Inf"'
+                lines.append(f"{name}_bucket{fmt(labels, inf)} {h.count}")
+                lines.append(f"{name}_sum{fmt(labels)} {h.sum}")
+                lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+def set_registry(registry: MetricsRegistry):
+    """Replaces the process-wide registry used by Chat, GAMEClientV2 and Babysitter"""
+    global _registry
+    _registry = registry
@@ -0,0 +1,341 @@
+"""
+Local stand-in for the GAME /v2/conversation API and the Babysitter
+validator, for offline load tests and benchmarks.
+
+    server = MockServer(MockConfig(game_latency=lognormal(0.05, 0.5)))
+    server.start()
+    agent = ChatAgent(api_key="apt-mock", prompt="...", base_url=server.game_url)
+    babysitter = Babysitter(api_url=server.validator_url)
+"""
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from decimal import Decimal
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+LatencyModel = Callable[[], float]
+
+
+def fixed(seconds: float) -> LatencyModel:
+    return lambda: seconds
+
+
+def uniform(low: float, high: float) -> LatencyModel:
+    return lambda: random.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float) -> LatencyModel:
+    """Long-tailed latency, median in seconds"""
+    mu = float(Decimal(median).ln()) if median > 0 else 0.0
+    return lambda: random.lognormvariate(mu, sigma) if median > 0 else 0.0
+
+
+# "send 0.01 to 0xabc..." en el mensaje del usuario dispara send_native (una por envío)
+SEND_PATTERN = re.compile(r"send\s+([0-9.]+)\s+(?:eth\s+)?to\s+(0x[0-9a-fA-F]+)", re.IGNORECASE)
+
+
+class MockConfig:
+    """
+    game_latency / validator_latency: LatencyModel per request
+    game_error_rate / validator_error_rate: probability of a 503 response
+    max_amount_wei: transfers above it are rejected by the validator
+    blocked_addresses: destinations the validator always rejects
+    stream_chunk_delay: pause between events of a streamed update_chat
+    accept_encodings: Content-Encodings of request bodies the server takes,
+        others get a 415
+    state_diff: update_chat keeps each chat's state and takes state patches
+    """
+    def __init__(
+        self,
+        game_latency: LatencyModel = fixed(0.0),
+        validator_latency: LatencyModel = fixed(0.0),
+        game_error_rate: float = 0.0,
+        validator_error_rate: float = 0.0,
+        max_amount_wei: Optional[int] = None,
+        blocked_addresses: Optional[Set[str]] = None,
+        stream_chunk_delay: float = 0.0,
+        accept_encodings: Tuple[str, ...] = ("gzip", "zstd"),
+        state_diff: bool = True,
+    ):
+        self.game_latency = game_latency
+        self.validator_latency = validator_latency
+        self.game_error_rate = game_error_rate
+        self.validator_error_rate = validator_error_rate
+        self.max_amount_wei = max_amount_wei
+        self.blocked_addresses = {a.lower() for a in (blocked_addresses or set())}
+        self.stream_chunk_delay = stream_chunk_delay
+        self.accept_encodings = accept_encodings
+        self.state_diff = state_diff
+
+    def verdict(self, tx: Dict[str, Any]) -> str:
+        to_address = str(tx.get("to", "")).lower()
+        if to_address in self.blocked_addresses:
+            return "REJECTED: destination is blocked"
+        value = int(Decimal(str(tx.get("value", "0"))))
+        if self.max_amount_wei is not None and value > self.max_amount_wei:
+            return "REJECTED: amount above limit"
+        return "APPROVED"
+
+
+class MockStats:
+    def __init__(self):
+        self.requests: Dict[str, int] = {}
+        self.bytes_received: Dict[str, int] = {}
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, route: str, size: int):
+        with self._lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            self.bytes_received[route] = self.bytes_received.get(route, 0) + size
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "bytes_received": dict(self.bytes_received),
+                "errors": self.errors,
+            }
+
+
+def decode_body(raw: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    if encoding == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(raw)
+    return raw
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        route, handler = self.server.mock.route(method, self.path)
+        self.server.mock.stats.record(route, len(raw))
+        if handler is None:
+            return self._send(404, {"error": "not found"})
+        encoding = self.headers.get("Content-Encoding")
+        if encoding and encoding not in self.server.mock.config.accept_encodings:
+            return self._send(415, {"error": f"unsupported Content-Encoding {encoding}"})
+        body = json.loads(decode_body(raw, encoding)) if raw else {}
+
+        config = self.server.mock.config
+        is_validator = route == "validate"
+        time.sleep(max((config.validator_latency if is_validator else config.game_latency)(), 0.0))
+        error_rate = config.validator_error_rate if is_validator else config.game_error_rate
+        if error_rate and random.random() < error_rate:
+            self.server.mock.stats.errors += 1
+            return self._send(503, {"error": "unavailable"}, {"Retry-After": "0"})
+
+        status, payload = handler(body)
+        if isinstance(payload, list):
+            return self._send_stream(status, payload)
+        self._send(status, payload)
+
+    def _send_stream(self, status: int, events: List[Dict[str, Any]]):
+        """NDJSON, one chunk per event (chunked transfer encoding)"""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        delay = self.server.mock.config.stream_chunk_delay
+        for event in events:
+            line = json.dumps(event).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+            if delay:
+                time.sleep(delay)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        encoded = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockServer"
+
+
+class MockServer:
+    """Threaded HTTP server on localhost, start() / stop() or use as context manager"""
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        self.stats = MockStats()
+        self._httpd = _Server((host, port), _Handler)
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+        self._conversations: Dict[str, List[Dict[str, Any]]] = {}
+        # conversation_id -> (state_version, state) para los state patches
+        self._states: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._routes: List[Tuple[str, "re.Pattern", str, Callable]] = [
+            ("POST", re.compile(r"^/v2/conversation$"), "create_chat", self._create_chat),
+            ("POST", re.compile(r"^/v2/conversation/([^/]+)/next$"), "update_chat", self._update_chat),
+            ("POST", re.compile(r"^/v2/conversation/([^/]+)/function/result$"), "report_function", self._report_function),
+            ("POST", re.compile(r"^/v2/conversation/([^/]+)/function/results$"), "report_functions", self._report_functions),
+            ("POST", re.compile(r"^/v2/conversation/([^/]+)/end$"), "end_chat", self._end_chat),
+            ("POST", re.compile(r"^/v2/conversation/([^/]+)/history$"), "save_message", self._save_message),
+            ("POST", re.compile(r"^/v2/conversation/([^/]+)/history/batch$"), "save_messages", self._save_messages),
+            ("GET", re.compile(r"^/v2/conversation/([^/]+)/history(\?.*)?$"), "get_chat_history", self._get_history),
+            ("POST", re.compile(r"^/validate$"), "validate", self._validate),
+        ]
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def game_url(self) -> str:
+        return f"{self.url}/v2"
+
+    @property
+    def validator_url(self) -> str:
+        return f"{self.url}/validate"
+
+    def start(self) -> "MockServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def route(self, method: str, path: str) -> Tuple[str, Optional[Callable]]:
+        for route_method, pattern, name, handler in self._routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                return name, lambda body: handler(body, *(g for g in match.groups() if g is not None))
+        return path, None
+
+    def _create_chat(self, body: Dict[str, Any]):
+        conversation_id = uuid.uuid4().hex
+        with self._lock:
+            self._conversations[conversation_id] = []
+        return 200, {"data": {"conversation_id": conversation_id}}
+
+    def _update_chat(self, body: Dict[str, Any], conversation_id: str):
+        data = body.get("data") or {}
+        message = data.get("message") or ""
+        reply = None
+        function_calls = [
+            {"id": uuid.uuid4().hex, "fn_name": "send_native", "args": {"to_address": to_address, "amount": amount}}
+            for amount, to_address in SEND_PATTERN.findall(message)
+        ]
+        if "balance" in message.lower():
+            function_calls.append({"id": uuid.uuid4().hex, "fn_name": "check_balance", "args": {}})
+        if not function_calls:
+            reply = f"echo: {message}"
+        function_call = function_calls[0] if function_calls else None
+        result = {"message": reply, "is_finished": False, "function_call": function_call}
+        if self.config.state_diff and data.get("state_diff"):
+            if not self._apply_state(conversation_id, data):
+                return 409, {"error": "UNKNOWN_STATE_BASE"}
+            result["state_version"] = data["state_version"]
+        # varias acciones en el mismo mensaje -> respuesta multi-llamada
+        if len(function_calls) > 1:
+            result["function_calls"] = function_calls
+        if not data.get("stream"):
+            return 200, {"data": result}
+
+        events = [{"type": "message_delta", "content": word} for word in re.findall(r"\S+\s*", reply or "")]
+        if function_call:
+            events.append({"type": "function_call", "function_call": function_call})
+        events.append({"type": "done", "data": result})
+        return 200, events
+
+    def _apply_state(self, conversation_id: str, data: Dict[str, Any]) -> bool:
+        """Stores the full state or applies a patch, False if the patch base is not the stored version"""
+        with self._lock:
+            version, state = self._states.get(conversation_id, (None, {}))
+            patch = data.get("state_patch")
+            if patch is None:
+                state = dict(data.get("state") or {})
+            elif data.get("state_base") != version:
+                return False
+            else:
+                state = {**state, **patch.get("set", {})}
+                for key in patch.get("unset", []):
+                    state.pop(key, None)
+            self._states[conversation_id] = (data["state_version"], state)
+            return True
+
+    def state(self, conversation_id: str) -> Dict[str, Any]:
+        """State the server holds for the chat (what the agent would see)"""
+        with self._lock:
+            return dict(self._states.get(conversation_id, (None, {}))[1])
+
+    def _report_function(self, body: Dict[str, Any], conversation_id: str):
+        result = (body.get("data") or {}).get("result", "")
+        return 200, {"data": {"message": f"function result: {result}"}}
+
+    def _report_functions(self, body: Dict[str, Any], conversation_id: str):
+        results = [r.get("result", "") for r in (body.get("data") or {}).get("results", [])]
+        return 200, {"data": {"message": f"function results: {'; '.join(results)}"}}
+
+    def _end_chat(self, body: Dict[str, Any], conversation_id: str):
+        return 200, {"data": {}}
+
+    def _save_message(self, body: Dict[str, Any], conversation_id: str):
+        with self._lock:
+            self._conversations.setdefault(conversation_id, []).append(body.get("data"))
+        return 200, {"data": {}}
+
+    def _save_messages(self, body: Dict[str, Any], conversation_id: str):
+        messages = (body.get("data") or {}).get("messages", [])
+        with self._lock:
+            self._conversations.setdefault(conversation_id, []).extend(messages)
+        return 200, {"data": {}}
+
+    def _get_history(self, body: Dict[str, Any], conversation_id: str, query: str = ""):
+        params = {name: int(values[0]) for name, values in parse_qs(query.lstrip("?")).items()}
+        offset = params.get("offset", 0)
+        limit = params.get("limit")
+        with self._lock:
+            messages = self._conversations.get(conversation_id, [])
+            messages = messages[offset:offset + limit] if limit is not None else messages[offset:]
+        return 200, {"data": {"messages": messages}}
+
+    def _validate(self, body: Dict[str, Any]):
+        results = [{"message": self.config.verdict(tx)} for tx in body.get("transactions", [])]
+        approved = all(r["message"] == "APPROVED" for r in results)
+        response = {
+            "message": "APPROVED" if approved else "REJECTED",
+            "results": results,
+        }
+        if body.get("createContext") or body.get("contextId"):
+            response["contextId"] = body.get("contextId") or uuid.uuid4().hex
+        return 200, response
@@ -0,0 +1,117 @@
+import heapq
+import threading
+from typing import Dict, List, Optional, Set
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+from baibysitter.baibysitter_game_sdk.lazy import lazy_import
+
+# lo usan los métodos a*
+asyncio = lazy_import("asyncio")
+
+
+class _WalletNonces:
+    __slots__ = ("next_nonce", "released", "in_flight", "lock")
+
+    def __init__(self):
+        self.next_nonce: Optional[int] = None
+        self.released: List[int] = []   # heap de nonces devueltos (huecos)
+        self.in_flight: Set[int] = set()
+        self.lock = threading.Lock()
+
+
+class NonceManager:
+    """
+    Allocates nonces locally per wallet so concurrent sends don't collide.
+
+    reserve() hands out the lowest free nonce; the pending nonce is read from
+    the node only the first time (or after resync). If a reserved nonce ends
+    up not being broadcast (e.g. Babysitter rejected the transfer) release()
+    gives it back and it is reused before allocating new ones, so no gaps are
+    left. confirm() marks it as broadcast. resync() reloads from the node,
+    call it when a send fails with a nonce error.
+
+    Thread-safe. From asyncio use the `a*` variants, which run the RPC call
+    in a thread instead of blocking the loop.
+    """
+    def __init__(self, w3):
+        self.w3 = w3
+        self._wallets: Dict[str, _WalletNonces] = {}
+        self._wallets_lock = threading.Lock()
+
+    def _wallet(self, address: str) -> _WalletNonces:
+        key = address.lower()
+        with self._wallets_lock:
+            wallet = self._wallets.get(key)
+            if wallet is None:
+                wallet = self._wallets[key] = _WalletNonces()
+            return wallet
+
+    def _pending_nonce(self, address: str) -> int:
+        with get_registry().timer("rpc_seconds", call="get_transaction_count"):
+            return self.w3.eth.get_transaction_count(address, "pending")
+
+    def ensure_synced(self, address: str) -> int:
+        """Loads the pending nonce from the node if the wallet isn't tracked yet"""
+        wallet = self._wallet(address)
+        with wallet.lock:
+            if wallet.next_nonce is None:
+                wallet.next_nonce = self._pending_nonce(address)
+            return wallet.next_nonce
+
+    def reserve(self, address: str) -> int:
+        wallet = self._wallet(address)
+        with wallet.lock:
+            if wallet.next_nonce is None:
+                wallet.next_nonce = self._pending_nonce(address)
+            if wallet.released:
+                nonce = heapq.heappop(wallet.released)
+            else:
+                nonce = wallet.next_nonce
+                wallet.next_nonce += 1
+            wallet.in_flight.add(nonce)
+            return nonce
+
+    def release(self, address: str, nonce: int):
+        """The nonce was reserved but the transaction was never broadcast"""
+        wallet = self._wallet(address)
+        with wallet.lock:
+            if nonce not in wallet.in_flight:
+                return
+            wallet.in_flight.discard(nonce)
+            if wallet.next_nonce is not None and nonce == wallet.next_nonce - 1:
+                wallet.next_nonce -= 1
+                # los huecos que quedaron al final también se pueden recortar
+                while wallet.released and wallet.next_nonce - 1 in wallet.released:
+                    wallet.released.remove(wallet.next_nonce - 1)
+                    wallet.next_nonce -= 1
+                heapq.heapify(wallet.released)
+            else:
+                heapq.heappush(wallet.released, nonce)
+
+    def confirm(self, address: str, nonce: int):
+        """The transaction with this nonce was broadcast"""
+        wallet = self._wallet(address)
+        with wallet.lock:
+            wallet.in_flight.discard(nonce)
+
+    def resync(self, address: str) -> int:
+        """Reloads the pending nonce from the node, dropping local state"""
+        wallet = self._wallet(address)
+        with wallet.lock:
+            wallet.next_nonce = self._pending_nonce(address)
+            wallet.released = []
+            wallet.in_flight.clear()
+            return wallet.next_nonce
+
+    def peek(self, address: str) -> Optional[int]:
+        """Next nonce that would be allocated (None if never synced)"""
+        wallet = self._wallet(address)
+        with wallet.lock:
+            if wallet.released:
+                return wallet.released[0]
+            return wallet.next_nonce
+
+    async def areserve(self, address: str) -> int:
+        return await asyncio.to_thread(self.reserve, address)
+
+    async def aresync(self, address: str) -> int:
+        return await asyncio.to_thread(self.resync, address)
@@ -0,0 +1,227 @@
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+from baibysitter.baibysitter_game_sdk.transactions import ETH, Token
+
+APPROVE = "APPROVE"
+REJECT = "REJECT"
+ESCALATE = "ESCALATE"
+
+ADDRESS_PATTERN = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+
+class PolicyDecision:
+    __slots__ = ("decision", "rule", "message")
+
+    def __init__(self, decision: str, rule: str, message: str):
+        self.decision = decision
+        self.rule = rule
+        self.message = message
+
+    def __repr__(self) -> str:
+        return f"PolicyDecision({self.decision}, rule={self.rule!r})"
+
+
+class SpendWindow:
+    """Rolling sum of the wei sent by each wallet in the last `seconds`"""
+    __slots__ = ("seconds", "limit_wei", "_spends", "_totals")
+
+    def __init__(self, seconds: float, limit_wei: int):
+        self.seconds = seconds
+        self.limit_wei = limit_wei
+        # entradas [momento, wei], listas para poder anular una reserva
+        self._spends: Dict[str, Deque[List]] = {}
+        self._totals: Dict[str, int] = {}
+
+    def spent(self, wallet: str, now: float) -> int:
+        spends = self._spends.get(wallet)
+        if not spends:
+            return 0
+        total = self._totals[wallet]
+        while spends and spends[0][0] <= now - self.seconds:
+            total -= spends.popleft()[1]
+        self._totals[wallet] = total
+        return total
+
+    def add(self, wallet: str, value_wei: int, now: float) -> List:
+        self.spent(wallet, now)
+        entry = [now, value_wei]
+        self._spends.setdefault(wallet, deque()).append(entry)
+        self._totals[wallet] = self._totals.get(wallet, 0) + value_wei
+        return entry
+
+    def remove(self, wallet: str, entry: List, now: float):
+        """Takes back an entry returned by add (if it did not expire yet)"""
+        self.spent(wallet, now)
+        if entry[0] > now - self.seconds:
+            self._totals[wallet] -= entry[1]
+        entry[1] = 0
+
+
+class SpendReservation:
+    """
+    Spend of a transfer counted in the windows before its final verdict.
+    Keep it if the transfer is approved, release() it if not
+    """
+    __slots__ = ("_entries", "_lock")
+
+    def __init__(self, entries: List[Tuple[SpendWindow, str, List]], lock: threading.Lock):
+        self._entries = entries
+        self._lock = lock
+
+    def release(self):
+        now = time.monotonic()
+        with self._lock:
+            for window, wallet, entry in self._entries:
+                window.remove(wallet, entry, now)
+            self._entries = []
+
+
+class PolicyEngine:
+    """
+    Local rules checked before calling the remote validator. The rules are
+    compiled once into address sets, per-address caps (base units of token)
+    and rolling spend windows, so evaluate_value() costs a few dict lookups.
+
+    Order: malformed amount/address -> REJECT, denylisted destination ->
+    REJECT, above max_amount -> REJECT, over a spend window -> REJECT,
+    allowlisted destination within its cap -> APPROVE, anything else ->
+    ESCALATE (remote Babysitter).
+
+    evaluate_and_reserve() checks the spend windows and counts the transfer
+    in them in one step under the lock, so concurrent transfers (or several
+    in one batch) cannot all pass the same limit.
+
+    allowlist: {address: cap per transfer, in token units (ETH)}
+    spend_windows: [(seconds, max sent by a wallet in that window, in token units)]
+    token: the amounts above and the ones given to evaluate() are in its units
+    """
+    def __init__(
+        self,
+        allowlist: Optional[Dict[str, float]] = None,
+        denylist: Iterable[str] = (),
+        max_amount: Optional[float] = None,
+        spend_windows: Iterable[Tuple[float, float]] = (),
+        token: Token = ETH,
+    ):
+        self.token = token
+        self._allow_caps: Dict[str, int] = {
+            address.lower(): token.to_units(cap) for address, cap in (allowlist or {}).items()
+        }
+        self._deny = frozenset(address.lower() for address in denylist)
+        self._max_wei = token.to_units(max_amount) if max_amount is not None else None
+        self._windows: List[SpendWindow] = [
+            SpendWindow(seconds, token.to_units(limit)) for seconds, limit in spend_windows
+        ]
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def evaluate(self, from_address: str, to_address: str, amount) -> PolicyDecision:
+        """Adapter of evaluate_value for amounts in token units"""
+        try:
+            value = self.token.to_units(amount)
+        except ValueError:
+            return self._count(PolicyDecision(REJECT, "invalid_amount", f"REJECTED: invalid amount {amount!r}"))
+        return self.evaluate_value(from_address, to_address, value)
+
+    def evaluate_value(self, from_address: str, to_address: str, value: int) -> PolicyDecision:
+        """value in base units (wei)"""
+        return self._count(self._evaluate(from_address.lower(), to_address, value)[0])
+
+    def evaluate_and_reserve(
+        self,
+        from_address: str,
+        to_address: str,
+        value: int,
+    ) -> Tuple[PolicyDecision, Optional[SpendReservation]]:
+        """
+        evaluate_value that also reserves the spend of anything not rejected.
+        The reservation is None for REJECT (or without spend windows)
+        """
+        decision, reservation = self._evaluate(from_address.lower(), to_address, value, reserve=True)
+        return self._count(decision), reservation
+
+    def _count(self, decision: PolicyDecision) -> PolicyDecision:
+        key = (decision.decision, decision.rule)
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+        get_registry().inc("policy_decisions_total", decision=decision.decision, rule=decision.rule)
+        return decision
+
+    def _evaluate(
+        self,
+        wallet: str,
+        to_address: str,
+        value_wei: int,
+        reserve: bool = False,
+    ) -> Tuple[PolicyDecision, Optional[SpendReservation]]:
+        if not isinstance(value_wei, int) or value_wei <= 0:
+            return PolicyDecision(REJECT, "invalid_amount", f"REJECTED: invalid amount {value_wei!r}"), None
+        if not isinstance(to_address, str) or not ADDRESS_PATTERN.match(to_address):
+            return PolicyDecision(REJECT, "invalid_address", f"REJECTED: malformed address {to_address!r}"), None
+
+        destination = to_address.lower()
+        if destination in self._deny:
+            return PolicyDecision(REJECT, "denylist", "REJECTED: destination is denylisted"), None
+        if self._max_wei is not None and value_wei > self._max_wei:
+            return PolicyDecision(REJECT, "max_amount", "REJECTED: amount above the allowed maximum"), None
+
+        reservation = None
+        if self._windows:
+            now = time.monotonic()
+            with self._lock:
+                for window in self._windows:
+                    if window.spent(wallet, now) + value_wei > window.limit_wei:
+                        return PolicyDecision(
+                            REJECT,
+                            "spend_window",
+                            f"REJECTED: more than the allowed spend in {window.seconds:g}s",
+                        ), None
+                # lo que queda no rechaza, se reserva sin soltar el lock
+                if reserve:
+                    reservation = self._add_spend(wallet, value_wei, now)
+
+        cap = self._allow_caps.get(destination)
+        if cap is not None and value_wei <= cap:
+            return PolicyDecision(APPROVE, "allowlist", "APPROVED: allowlisted destination within its cap"), reservation
+        return PolicyDecision(ESCALATE, "default", ""), reservation
+
+    def _add_spend(self, wallet: str, value_wei: int, now: float) -> SpendReservation:
+        """Adds the spend to every window (call it holding the lock)"""
+        return SpendReservation(
+            [(window, wallet, window.add(wallet, value_wei, now)) for window in self._windows],
+            self._lock,
+        )
+
+    def record_spend(self, from_address: str, amount):
+        """Counts an approved transfer (amount in token units) in the spend windows"""
+        try:
+            value = self.token.to_units(amount)
+        except ValueError:
+            return
+        self.record_spend_value(from_address, value)
+
+    def record_spend_value(self, from_address: str, value_wei: int):
+        self.reserve_value(from_address, value_wei)
+
+    def reserve_value(self, from_address: str, value_wei: int) -> Optional[SpendReservation]:
+        """Counts value_wei in the spend windows without checking them"""
+        if not self._windows or value_wei <= 0:
+            return None
+        with self._lock:
+            return self._add_spend(from_address.lower(), value_wei, time.monotonic())
+
+    def stats(self) -> Dict[str, object]:
+        """Decisions per (decision, rule) and the share decided locally"""
+        with self._lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        escalated = sum(count for (decision, _), count in counts.items() if decision == ESCALATE)
+        return {
+            "decisions": {f"{decision}:{rule}": count for (decision, rule), count in counts.items()},
+            "total": total,
+            "local_ratio": (total - escalated) / total if total else 0.0,
+        }
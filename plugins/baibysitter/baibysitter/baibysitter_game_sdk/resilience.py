@@ -0,0 +1,329 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Generator, Iterator, Optional, Tuple, Type, TypeVar
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+from baibysitter.baibysitter_game_sdk.lazy import lazy_import
+
+# solo lo usa acall_with_retry
+asyncio = lazy_import("asyncio")
+
+T = TypeVar("T")
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# un POST que falló con 5xx puede haberse aplicado en el servidor, solo se
+# reintenta cuando seguro no se procesó (rate limit o servicio no disponible)
+POST_RETRY_STATUSES = (429, 503)
+
+
+class CircuitOpenError(Exception):
+    """The endpoint failed too many times recently, the call was not attempted"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The time budget of the current operation (e.g. a chat turn) ran out"""
+
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("baibysitter_deadline", default=None)
+
+
+def deadline_at(seconds: Optional[float]) -> Optional[float]:
+    """Absolute (monotonic) deadline seconds from now, never past the current one"""
+    current = _deadline.get()
+    if seconds is None:
+        return current
+    new_deadline = time.monotonic() + seconds
+    if current is not None:
+        new_deadline = min(current, new_deadline)
+    return new_deadline
+
+
+@contextmanager
+def within(at: Optional[float]) -> Iterator[None]:
+    """Runs the block under an absolute deadline taken from deadline_at"""
+    if at is None:
+        yield
+        return
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Gives the block a time budget. Nested deadlines never extend the outer
+    one. HTTP calls made inside use the remaining time as their timeout
+    """
+    if seconds is None:
+        yield
+        return
+    with within(deadline_at(seconds)):
+        yield
+
+
+def iter_within(events: Generator[T, None, None], at: Optional[float]) -> Iterator[T]:
+    """
+    Iterates a generator with the deadline set only while it runs, never
+    while the caller holds an event (its own calls are not bounded by it)
+    """
+    try:
+        while True:
+            with within(at):
+                try:
+                    event = next(events)
+                except StopIteration:
+                    return
+            yield event
+    finally:
+        with within(at):
+            events.close()
+
+
+async def aiter_within(events: AsyncGenerator[T, None], at: Optional[float]) -> AsyncIterator[T]:
+    """Async version of iter_within. Each step runs in the caller's task"""
+    try:
+        while True:
+            with within(at):
+                try:
+                    event = await events.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield event
+    finally:
+        with within(at):
+            await events.aclose()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current deadline (None if there is no deadline)"""
+    current = _deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def check_deadline():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+
+
+def bounded_timeout(timeout: float) -> float:
+    """timeout capped by the remaining deadline"""
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(min(timeout, left), 0.001)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header in seconds (either delta-seconds or an HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        # email es caro de importar y Retry-After casi nunca trae fecha
+        from email.utils import parsedate_to_datetime
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter. Retries responses with a status in
+    retry_statuses and the exceptions in retry_exceptions, honouring the
+    Retry-After header when present (capped at max_delay). retry_if, when
+    given, narrows retry_exceptions: an exception is only retried if
+    retry_if(exc) is true.
+    """
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 10.0,
+        retry_statuses: Tuple[int, ...] = RETRY_STATUSES,
+        retry_exceptions: Tuple[Type[BaseException], ...] = (OSError,),
+        retry_if: Optional[Callable[[BaseException], bool]] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        self.retry_exceptions = retry_exceptions
+        self.retry_if = retry_if
+
+    def retries(self, exc: BaseException) -> bool:
+        return isinstance(exc, self.retry_exceptions) and (self.retry_if is None or self.retry_if(exc))
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after failure_threshold consecutive failures. While open
+    calls fail fast with CircuitOpenError; after reset_timeout one probe call
+    is let through (half-open) and its result closes or re-opens the circuit.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per endpoint, created on first use"""
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        with self._lock:
+            return {endpoint: b.state for endpoint, b in self._breakers.items()}
+
+
+def _retry_delay(policy: RetryPolicy, attempt: int, response: Any) -> Optional[float]:
+    """Delay before the next attempt, None if there is no time left for it"""
+    retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+    delay = policy.backoff(attempt, retry_after)
+    left = remaining()
+    if left is not None and delay >= left:
+        return None
+    return delay
+
+
+def _before_attempt(breaker: Optional[CircuitBreaker], endpoint: str):
+    check_deadline()
+    if breaker is not None and not breaker.allow():
+        get_registry().inc("circuit_open_total", endpoint=endpoint)
+        raise CircuitOpenError(f"Circuit open for {endpoint}")
+
+
+def call_with_retry(
+    send: Callable[[], Any],
+    policy: RetryPolicy,
+    breaker: Optional[CircuitBreaker] = None,
+    endpoint: str = "",
+) -> Any:
+    """
+    Calls send() (which returns a response with status_code/headers) with
+    retries, circuit breaking and the current deadline. After the last attempt
+    a retryable response is returned as is so the caller reports the status
+    """
+    metrics = get_registry()
+    for attempt in range(policy.max_attempts):
+        _before_attempt(breaker, endpoint)
+        last_attempt = attempt == policy.max_attempts - 1
+        try:
+            response = send()
+        except Exception as exc:
+            if breaker is not None:
+                breaker.record_failure()
+            delay = None if last_attempt or not policy.retries(exc) else _retry_delay(policy, attempt, None)
+            if delay is None:
+                raise
+        else:
+            if response.status_code not in policy.retry_statuses:
+                if breaker is not None:
+                    breaker.record_success()
+                return response
+            if breaker is not None:
+                breaker.record_failure()
+            delay = None if last_attempt else _retry_delay(policy, attempt, response)
+            if delay is None:
+                return response
+            # libera la conexión (importa con respuestas en streaming)
+            response.close()
+        metrics.inc("retries_total", endpoint=endpoint)
+        time.sleep(delay)
+
+
+async def acall_with_retry(
+    send: Callable[[], Awaitable[Any]],
+    policy: RetryPolicy,
+    breaker: Optional[CircuitBreaker] = None,
+    endpoint: str = "",
+) -> Any:
+    """asyncio version of call_with_retry"""
+    metrics = get_registry()
+    for attempt in range(policy.max_attempts):
+        _before_attempt(breaker, endpoint)
+        last_attempt = attempt == policy.max_attempts - 1
+        try:
+            response = await send()
+        except Exception as exc:
+            if breaker is not None:
+                breaker.record_failure()
+            delay = None if last_attempt or not policy.retries(exc) else _retry_delay(policy, attempt, None)
+            if delay is None:
+                raise
+        else:
+            if response.status_code not in policy.retry_statuses:
+                if breaker is not None:
+                    breaker.record_success()
+                return response
+            if breaker is not None:
+                breaker.record_failure()
+            delay = None if last_attempt else _retry_delay(policy, attempt, response)
+            if delay is None:
+                return response
+            await response.aclose()
+        metrics.inc("retries_total", endpoint=endpoint)
+        await asyncio.sleep(delay)
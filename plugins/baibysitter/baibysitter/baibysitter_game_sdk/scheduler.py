@@ -0,0 +1,221 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from baibysitter.baibysitter_game_sdk.chat_agent import Chat
+
+
+class SchedulerFull(Exception):
+    """Raised by ChatScheduler.submit when max_pending turns are queued and block=False"""
+
+
+class RateLimiter:
+    """Token bucket, `rate` turns per second with bursts of up to `burst`"""
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ChatStats:
+    """Turn counters and latencies (seconds) of one chat"""
+    __slots__ = ("turns", "errors", "total_latency", "max_latency", "queued", "_recent")
+
+    def __init__(self, window: int = 256):
+        self.turns = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.queued = 0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float, error: bool):
+        self.turns += 1
+        if error:
+            self.errors += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self._recent.append(latency)
+
+    def percentile(self, p: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "turns": self.turns,
+            "errors": self.errors,
+            "queued": self.queued,
+            "avg_latency": self.total_latency / self.turns if self.turns else 0.0,
+            "p50_latency": self.percentile(50),
+            "p99_latency": self.percentile(99),
+            "max_latency": self.max_latency,
+        }
+
+
+class ChatScheduler:
+    """
+    Runs turns of many chats on a bounded thread pool.
+
+    Turns of the same chat run one at a time and in submission order, turns
+    of different chats run concurrently (up to max_workers). rate_limit caps
+    turns started per second across all chats (GAME API quota) and
+    max_pending bounds queued turns: submit blocks (or raises SchedulerFull
+    when block=False) until there is room.
+
+    shutdown() runs every queued turn before returning, shutdown(wait=False)
+    fails the turns that haven't started (RuntimeError).
+    """
+    def __init__(
+        self,
+        max_workers: int = 32,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_pending: int = 1000,
+        block: bool = True,
+    ):
+        self.max_workers = max_workers
+        self.block = block
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-scheduler")
+        self._rate_limiter = RateLimiter(rate_limit, burst) if rate_limit else None
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._queues: Dict[str, Deque[Tuple[str, Future, float]]] = {}
+        self._running: Set[str] = set()
+        self._stats: Dict[str, ChatStats] = {}
+        self._lock = threading.Lock()
+        # avisa a shutdown() cuando no queda ningún chat con turnos
+        self._idle = threading.Condition(self._lock)
+        self._closed = False
+
+    def submit(self, chat: Chat, message: str) -> Future:
+        """Queues a turn of the chat, the future resolves to the ChatResponse"""
+        if not self._pending.acquire(blocking=self.block):
+            raise SchedulerFull("Too many pending chat turns")
+
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                self._pending.release()
+                raise RuntimeError("ChatScheduler is shut down")
+            queue = self._queues.setdefault(chat.chat_id, deque())
+            queue.append((message, future, time.monotonic()))
+            stats = self._stats.setdefault(chat.chat_id, ChatStats())
+            stats.queued += 1
+            if chat.chat_id not in self._running:
+                self._running.add(chat.chat_id)
+                self._executor.submit(self._run_next, chat)
+        return future
+
+    def _run_next(self, chat: Chat):
+        with self._lock:
+            queue = self._queues.get(chat.chat_id)
+            if not queue:
+                # shutdown(wait=False) ya falló los turnos que quedaban
+                self._finish_chat(chat.chat_id)
+                return
+            message, future, _ = queue.popleft()
+            stats = self._stats[chat.chat_id]
+            stats.queued -= 1
+
+        error = False
+        start = time.monotonic()
+        try:
+            if future.set_running_or_notify_cancel():
+                if self._rate_limiter:
+                    self._rate_limiter.acquire()
+                start = time.monotonic()
+                future.set_result(chat.next(message))
+        except Exception as e:
+            error = True
+            future.set_exception(e)
+        finally:
+            latency = time.monotonic() - start
+            self._pending.release()
+
+        failed: List[Future] = []
+        with self._lock:
+            stats.record(latency, error)
+            # una tarea por turno, así un chat con muchos mensajes no acapara un worker
+            if self._queues.get(chat.chat_id):
+                try:
+                    self._executor.submit(self._run_next, chat)
+                    return
+                except RuntimeError:
+                    # el executor ya se cerró
+                    failed = self._drop_queued(chat.chat_id)
+            self._finish_chat(chat.chat_id)
+        self._fail(failed)
+
+    def _finish_chat(self, chat_id: str):
+        """Called with the lock held once a chat has no turns left"""
+        self._queues.pop(chat_id, None)
+        self._running.discard(chat_id)
+        if not self._running:
+            self._idle.notify_all()
+
+    def _drop_queued(self, chat_id: str) -> List[Future]:
+        """Removes the turns of a chat that haven't started (lock held)"""
+        queue = self._queues.get(chat_id)
+        if not queue:
+            return []
+        futures = [future for _, future, _ in queue]
+        self._stats[chat_id].queued -= len(queue)
+        queue.clear()
+        return futures
+
+    def _fail(self, futures: List[Future]):
+        for future in futures:
+            self._pending.release()
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("ChatScheduler was shut down before running this turn"))
+
+    def stats(self, chat_id: Optional[str] = None) -> Dict[str, Any]:
+        """Stats of one chat, or of every chat keyed by chat_id"""
+        with self._lock:
+            if chat_id is not None:
+                stats = self._stats.get(chat_id)
+                return stats.as_dict() if stats else {}
+            return {cid: s.as_dict() for cid, s in self._stats.items()}
+
+    def throughput(self, elapsed: float) -> float:
+        """Turns per second over `elapsed` seconds"""
+        with self._lock:
+            turns = sum(s.turns for s in self._stats.values())
+        return turns / elapsed if elapsed > 0 else 0.0
+
+    def shutdown(self, wait: bool = True):
+        """Stops taking turns. wait=True runs the queued ones first, wait=False fails them"""
+        failed: List[Future] = []
+        with self._lock:
+            self._closed = True
+            if wait:
+                while self._running:
+                    self._idle.wait()
+            else:
+                for chat_id in list(self._queues):
+                    failed.extend(self._drop_queued(chat_id))
+        self._fail(failed)
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from baibysitter.baibysitter_game_sdk.lazy import lazy_import
+
+sqlite3 = lazy_import("sqlite3")
+
+
+class SessionStore(ABC):
+    """
+    Durable storage for chats so a worker can resume them after a restart.
+
+    A session is the chat metadata (partner, creation time...) plus its
+    messages, stored by absolute index (the same index HistoryStore uses) so
+    checkpoints only write what is new and reads can be ranged.
+    """
+    @abstractmethod
+    def save_session(self, chat_id: str, meta: Dict[str, Any]):
+        """Creates or replaces the metadata of chat_id"""
+
+    @abstractmethod
+    def load_session(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        """The metadata saved for chat_id, None if there is no such session"""
+
+    @abstractmethod
+    def append_messages(self, chat_id: str, start: int, messages: List[Dict[str, str]]):
+        """
+        Stores messages with absolute indexes start, start + 1... Writing an
+        index that is already stored is a no-op, so checkpoints can be retried
+        """
+
+    @abstractmethod
+    def read_range(self, chat_id: str, start: int = 0, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """Messages with absolute index >= start, at most limit of them"""
+
+    @abstractmethod
+    def read_recent(self, chat_id: str, last_n: int) -> Tuple[int, List[Dict[str, str]]]:
+        """(start, messages) with the last last_n messages, start is the index of messages[0]"""
+
+    @abstractmethod
+    def message_count(self, chat_id: str) -> int:
+        """Number of messages stored for chat_id"""
+
+    @abstractmethod
+    def delete_session(self, chat_id: str):
+        """Removes the metadata and the messages of chat_id"""
+
+    def close(self):
+        pass
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SessionStore on a local SQLite file (WAL mode). Messages are keyed by
+    (chat_id, index) so recent and ranged reads only touch the rows returned.
+    Safe to share between threads.
+    """
+    def __init__(self, path: str = "baibysitter_sessions.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "chat_id TEXT PRIMARY KEY, meta TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "chat_id TEXT NOT NULL, idx INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL, "
+                "PRIMARY KEY (chat_id, idx)) WITHOUT ROWID"
+            )
+
+    def save_session(self, chat_id: str, meta: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (chat_id, meta, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(chat_id) DO UPDATE SET meta = excluded.meta, updated_at = excluded.updated_at",
+                (chat_id, json.dumps(meta), time.time()),
+            )
+
+    def load_session(self, chat_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT meta FROM sessions WHERE chat_id = ?", (chat_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def append_messages(self, chat_id: str, start: int, messages: List[Dict[str, str]]):
+        rows = [(chat_id, start + i, m["role"], m["content"]) for i, m in enumerate(messages)]
+        with self._lock:
+            # una sola transacción por checkpoint
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO messages (chat_id, idx, role, content) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("UPDATE sessions SET updated_at = ? WHERE chat_id = ?", (time.time(), chat_id))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def read_range(self, chat_id: str, start: int = 0, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content FROM messages WHERE chat_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                (chat_id, start, -1 if limit is None else limit),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def read_recent(self, chat_id: str, last_n: int) -> Tuple[int, List[Dict[str, str]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, role, content FROM messages WHERE chat_id = ? ORDER BY idx DESC LIMIT ?",
+                (chat_id, max(last_n, 0)),
+            ).fetchall()
+        if not rows:
+            return self.message_count(chat_id), []
+        rows.reverse()
+        return rows[0][0], [{"role": role, "content": content} for _, role, content in rows]
+
+    def message_count(self, chat_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(idx) FROM messages WHERE chat_id = ?", (chat_id,)).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def delete_session(self, chat_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE chat_id = ?", (chat_id,))
+            self._conn.execute("DELETE FROM sessions WHERE chat_id = ?", (chat_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
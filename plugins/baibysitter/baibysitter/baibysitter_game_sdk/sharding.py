@@ -0,0 +1,388 @@
+import bisect
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+
+logger = logging.getLogger(__name__)
+
+_STOP = None
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hashing of wallet addresses onto shards 0..shards-1.
+
+    Each shard owns `replicas` points of the ring, so load is even and
+    growing from N to N+1 shards only moves about 1/(N+1) of the wallets.
+    Addresses are compared lowercased (checksummed or not, same shard).
+    """
+    def __init__(self, shards: int, replicas: int = 100):
+        if shards < 1:
+            raise ValueError("At least one shard is needed")
+        self.shards = shards
+        points = sorted(
+            (_hash(f"shard-{shard}-{replica}"), shard)
+            for shard in range(shards)
+            for replica in range(replicas)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, wallet_address: str) -> int:
+        i = bisect.bisect(self._hashes, _hash(wallet_address.lower()))
+        return self._owners[i % len(self._owners)]
+
+
+class ShardError(Exception):
+    """A turn failed in a shard with an exception that couldn't be sent back as is"""
+
+
+class ShardApp(ABC):
+    """
+    What runs inside one shard process. ShardedRunner calls the class (or
+    any picklable factory) with the shard id in the new process, so
+    everything built in __init__ is private to the shard: its ChatAgent and
+    requests pool, Babysitter, Web3 provider, NonceManager, accounts...
+
+    Every wallet hashed to a shard always lands there, so its nonces are
+    only ever allocated by that shard's NonceManager.
+    """
+    def __init__(self, shard_id: int):
+        self.shard_id = shard_id
+
+    @abstractmethod
+    def open_chat(self, wallet_address: str, partner_id: str, partner_name: str):
+        """Creates (or resumes) the Chat for this wallet and partner, with its action space"""
+
+    def close(self):
+        pass
+
+
+def _reply(outbox, request_id, future: Future):
+    error = future.exception()
+    try:
+        payload = pickle.dumps(future.result() if error is None else error)
+        ok = error is None
+    except Exception as e:
+        # el resultado o la excepción no se pueden serializar
+        failure = error if error is not None else e
+        payload = pickle.dumps(ShardError(f"{type(failure).__name__}: {failure}"))
+        ok = False
+    outbox.put((request_id, ok, payload))
+
+
+class _ShardChat:
+    __slots__ = ("chat", "failed", "waiting", "lock")
+
+    def __init__(self):
+        self.chat = None
+        self.failed: Optional[Future] = None
+        # (request_id, message) que llegaron mientras se abría el chat
+        self.waiting: List[Tuple[Any, str]] = []
+        self.lock = threading.Lock()
+
+
+def _shard_main(shard_id: int, setup: Callable[[int], ShardApp], inbox, outbox, max_workers: int, rate_limit):
+    """Entry point of a shard process: builds the ShardApp and runs turns until told to stop"""
+    from baibysitter.baibysitter_game_sdk.scheduler import ChatScheduler
+
+    try:
+        app = setup(shard_id)
+    except Exception as e:
+        future: Future = Future()
+        future.set_exception(e)
+        _reply(outbox, ("ready", shard_id), future)
+        return
+    outbox.put((("ready", shard_id), True, pickle.dumps(os.getpid())))
+
+    scheduler = ChatScheduler(max_workers=max_workers, rate_limit=rate_limit)
+    # abrir un chat es una request, que no frene la lectura del inbox
+    opener = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f"shard-{shard_id}-open")
+    chats: Dict[Tuple[str, str], _ShardChat] = {}
+    chats_lock = threading.Lock()
+
+    def run_turn(request_id, chat, message: str):
+        turn = scheduler.submit(chat, message)
+        turn.add_done_callback(lambda f: _reply(outbox, request_id, f))
+
+    def open_chat(key: Tuple[str, str], entry: _ShardChat, wallet_address: str, partner_id: str, partner_name: str):
+        try:
+            chat = app.open_chat(wallet_address, partner_id, partner_name)
+        except Exception as e:
+            with chats_lock:
+                # el próximo mensaje lo vuelve a intentar
+                chats.pop(key, None)
+            failed: Future = Future()
+            failed.set_exception(e)
+            with entry.lock:
+                entry.failed = failed
+                for request_id, _ in entry.waiting:
+                    _reply(outbox, request_id, failed)
+                entry.waiting.clear()
+            return
+        with entry.lock:
+            # con el lock tomado, así ningún mensaje nuevo se adelanta a los que esperaban
+            for request_id, message in entry.waiting:
+                run_turn(request_id, chat, message)
+            entry.waiting.clear()
+            entry.chat = chat
+
+    try:
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                break
+            kind, request_id = item[0], item[1]
+            if kind == "stats":
+                future = Future()
+                future.set_result({
+                    "shard": shard_id,
+                    "pid": os.getpid(),
+                    "chats": len(chats),
+                    "chat_stats": scheduler.stats(),
+                    "metrics": get_registry().snapshot(),
+                })
+                _reply(outbox, request_id, future)
+                continue
+
+            _, _, wallet_address, partner_id, partner_name, message = item
+            key = (wallet_address.lower(), partner_id)
+            with chats_lock:
+                entry = chats.get(key)
+                opening = entry is None
+                if opening:
+                    entry = chats[key] = _ShardChat()
+            with entry.lock:
+                if entry.chat is not None:
+                    run_turn(request_id, entry.chat, message)
+                elif entry.failed is not None:
+                    _reply(outbox, request_id, entry.failed)
+                else:
+                    entry.waiting.append((request_id, message))
+            if opening:
+                opener.submit(open_chat, key, entry, wallet_address, partner_id, partner_name)
+    finally:
+        opener.shutdown(wait=True)
+        scheduler.shutdown(wait=True)
+        app.close()
+
+
+class _Shard:
+    __slots__ = ("process", "inbox", "pending", "routed")
+
+    def __init__(self, process, inbox):
+        self.process = process
+        self.inbox = inbox
+        self.pending: Set[Any] = set()
+        self.routed = 0
+
+
+class ShardedRunner:
+    """
+    Runs chats for many wallets on `shards` worker processes (default: one
+    per core), so signing, JSON encoding and response validation of
+    different wallets don't serialize on one GIL.
+
+    The parent only routes: submit() hashes the wallet address on a
+    HashRing and queues the message to that shard. Inside the shard the
+    ShardApp opens the chat on its first message and turns run on a
+    ChatScheduler (turns of one chat in order, max_workers threads per
+    shard, rate_limit split evenly between shards).
+
+    setup is called in each shard process, it must be picklable (a
+    ShardApp subclass or a module-level function). Results come back
+    pickled, so the ChatResponse of a turn must be picklable too.
+    """
+    def __init__(
+        self,
+        setup: Callable[[int], ShardApp],
+        shards: Optional[int] = None,
+        replicas: int = 100,
+        max_workers: int = 32,
+        rate_limit: Optional[float] = None,
+        start_method: str = "spawn",
+        start_timeout: float = 60.0,
+    ):
+        self.setup = setup
+        self.shards = shards or os.cpu_count() or 1
+        self.ring = HashRing(self.shards, replicas)
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self.start_timeout = start_timeout
+        # spawn: el padre tiene threads, con fork los hijos heredarían locks tomados
+        self._context = multiprocessing.get_context(start_method)
+        self._outbox = None
+        self._shards: List[_Shard] = []
+        self._futures: Dict[Any, Tuple[Future, int, float]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._closed = False
+
+    def start(self) -> "ShardedRunner":
+        if self._shards:
+            return self
+        self._outbox = self._context.Queue()
+        rate_limit = self.rate_limit / self.shards if self.rate_limit else None
+        ready = []
+        for shard_id in range(self.shards):
+            inbox = self._context.Queue()
+            process = self._context.Process(
+                target=_shard_main,
+                args=(shard_id, self.setup, inbox, self._outbox, self.max_workers, rate_limit),
+                name=f"baibysitter-shard-{shard_id}",
+                daemon=True,
+            )
+            shard = _Shard(process, inbox)
+            self._shards.append(shard)
+            ready.append(self._track(("ready", shard_id), shard_id))
+            process.start()
+
+        self._collector = threading.Thread(target=self._collect, name="shard-collector", daemon=True)
+        self._collector.start()
+        try:
+            for future in ready:
+                future.result(timeout=self.start_timeout)
+        except Exception:
+            self.close()
+            raise
+        return self
+
+    def shard_for(self, wallet_address: str) -> int:
+        return self.ring.shard_for(wallet_address)
+
+    def submit(self, wallet_address: str, partner_id: str, message: str, partner_name: Optional[str] = None) -> Future:
+        """Queues a turn of the wallet's chat with partner_id, the future resolves to the ChatResponse"""
+        self._check_running()
+        shard_id = self.ring.shard_for(wallet_address)
+        request_id = next(self._ids)
+        future = self._track(request_id, shard_id)
+        self._send(shard_id, ("turn", request_id, wallet_address, partner_id, partner_name or partner_id, message))
+        get_registry().inc("shard_messages_total", shard=str(shard_id))
+        return future
+
+    def stats(self, timeout: float = 10.0) -> List[Dict[str, Any]]:
+        """Per shard: pid, open chats, ChatScheduler stats and that process' metrics snapshot"""
+        self._check_running()
+        futures = []
+        for shard_id in range(len(self._shards)):
+            request_id = next(self._ids)
+            futures.append(self._track(request_id, shard_id))
+            self._send(shard_id, ("stats", request_id))
+        results = [future.result(timeout=timeout) for future in futures]
+        with self._lock:
+            for result, shard in zip(results, self._shards):
+                result["routed"] = shard.routed
+                result["pending"] = len(shard.pending)
+        return results
+
+    def _check_running(self):
+        if not self._shards or self._closed:
+            raise RuntimeError("ShardedRunner is not running, call start() first")
+
+    def _track(self, request_id, shard_id: int) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._futures[request_id] = (future, shard_id, time.monotonic())
+            self._shards[shard_id].pending.add(request_id)
+        return future
+
+    def _send(self, shard_id: int, item: tuple):
+        shard = self._shards[shard_id]
+        if not shard.process.is_alive():
+            self._fail(item[1], ShardError(f"Shard {shard_id} exited with code {shard.process.exitcode}"))
+            return
+        with self._lock:
+            shard.routed += 1
+        shard.inbox.put(item)
+
+    def _fail(self, request_id, error: Exception):
+        with self._lock:
+            entry = self._futures.pop(request_id, None)
+            if entry is not None:
+                self._shards[entry[1]].pending.discard(request_id)
+        if entry is not None:
+            entry[0].set_exception(error)
+
+    def _collect(self):
+        while True:
+            try:
+                item = self._outbox.get(timeout=1.0)
+            except queue.Empty:
+                self._check_shards()
+                continue
+            except (EOFError, OSError):
+                return
+            if item is _STOP:
+                return
+            request_id, ok, payload = item
+            with self._lock:
+                entry = self._futures.pop(request_id, None)
+                if entry is not None:
+                    self._shards[entry[1]].pending.discard(request_id)
+            if entry is None:
+                continue
+            future, shard_id, submitted = entry
+            if not isinstance(request_id, tuple):  # los ("ready", shard) no son turnos
+                get_registry().observe("shard_turn_seconds", time.monotonic() - submitted, shard=str(shard_id))
+            try:
+                value = pickle.loads(payload)
+            except Exception as e:
+                future.set_exception(ShardError(f"Could not read the result from shard {shard_id}: {e}"))
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _check_shards(self):
+        # un shard que murió no va a contestar, fallamos lo que tenía pendiente
+        for shard_id, shard in enumerate(self._shards):
+            if shard.process.is_alive() or not shard.pending:
+                continue
+            logger.error("Shard %s exited with code %s", shard_id, shard.process.exitcode)
+            error = ShardError(f"Shard {shard_id} exited with code {shard.process.exitcode}")
+            for request_id in list(shard.pending):
+                self._fail(request_id, error)
+
+    def close(self, timeout: float = 30.0):
+        """Lets each shard finish its queued turns, then stops the processes"""
+        if self._closed:
+            return
+        self._closed = True
+        for shard in self._shards:
+            if shard.process.is_alive():
+                shard.inbox.put(_STOP)
+        deadline_at = time.monotonic() + timeout
+        for shard in self._shards:
+            shard.process.join(max(0.0, deadline_at - time.monotonic()))
+            if shard.process.is_alive():
+                shard.process.terminate()
+                shard.process.join()
+        if self._outbox is not None:
+            self._outbox.put(_STOP)
+        if self._collector is not None:
+            self._collector.join(timeout=5.0)
+        for shard_id, shard in enumerate(self._shards):
+            for request_id in list(shard.pending):
+                self._fail(request_id, ShardError(f"Shard {shard_id} stopped before answering"))
+
+    def __enter__(self) -> "ShardedRunner":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,79 @@
+from decimal import Decimal, InvalidOperation, ROUND_DOWN
+from typing import Any, Dict, Optional
+
+
+class Token:
+    """
+    Asset validated by Babysitter. Amounts are kept as integers in its
+    smallest unit (wei for ETH), decimals is only used to convert from the
+    human amounts the agent works with.
+
+    address: value sent as erc20TokenAddress ("ETH" for the native coin)
+    """
+    __slots__ = ("symbol", "decimals", "address", "_scale")
+
+    def __init__(self, symbol: str = "ETH", decimals: int = 18, address: Optional[str] = None):
+        self.symbol = symbol
+        self.decimals = decimals
+        self.address = address or symbol
+        self._scale = 10 ** decimals
+
+    @property
+    def is_native(self) -> bool:
+        """True for the chain's own coin (no contract address)"""
+        return self.address == self.symbol
+
+    def to_units(self, amount) -> int:
+        """
+        Human amount (int, str, Decimal or float) to base units, exact up to
+        `decimals` digits, extra digits are truncated. ValueError if amount
+        is not a finite number
+        """
+        if isinstance(amount, int) and not isinstance(amount, bool):
+            return amount * self._scale
+        try:
+            # str() da el decimal más corto del float, sin basura binaria
+            value = amount if isinstance(amount, Decimal) else Decimal(str(amount))
+        except (InvalidOperation, ValueError):
+            raise ValueError(f"Invalid amount {amount!r}")
+        if not value.is_finite():
+            raise ValueError(f"Invalid amount {amount!r}")
+        return int(value.scaleb(self.decimals).to_integral_value(rounding=ROUND_DOWN))
+
+    def from_units(self, value: int) -> Decimal:
+        return Decimal(value).scaleb(-self.decimals)
+
+    def __repr__(self) -> str:
+        return f"Token({self.symbol!r}, decimals={self.decimals})"
+
+
+ETH = Token("ETH", 18)
+
+
+def same_token(a: Token, b: Token) -> bool:
+    """Same asset and scale (addresses compared case-insensitively)"""
+    return a.decimals == b.decimals and a.address.lower() == b.address.lower()
+
+
+class Transaction:
+    """One transfer to validate, value in base units of the Babysitter token"""
+    __slots__ = ("to", "value", "data")
+
+    def __init__(self, to: str, value: int, data: str = ""):
+        self.to = to
+        self.value = value
+        self.data = data
+
+    def as_payload(self) -> Dict[str, Any]:
+        return {"to": self.to, "data": self.data, "value": str(self.value)}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Transaction):
+            return NotImplemented
+        return (self.to, self.value, self.data) == (other.to, other.value, other.data)
+
+    def __hash__(self) -> int:
+        return hash((self.to, self.value, self.data))
+
+    def __repr__(self) -> str:
+        return f"Transaction(to={self.to!r}, value={self.value}, data={self.data[:10]!r})"
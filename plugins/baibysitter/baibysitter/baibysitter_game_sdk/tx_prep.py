@@ -0,0 +1,157 @@
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from baibysitter.baibysitter_game_sdk.custom_types import FunctionResultStatus
+from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter
+from baibysitter.baibysitter_game_sdk.transactions import Transaction
+from baibysitter.baibysitter_game_sdk.chat_agent import Chat
+from baibysitter.baibysitter_game_sdk.nonce import NonceManager
+from baibysitter.baibysitter_game_sdk.chain_cache import ChainReadCache
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+
+
+class PreparedTransaction:
+    __slots__ = ("tx", "approved", "message", "balance")
+
+    def __init__(self, tx: Optional[Dict[str, Any]], approved: bool, message: str, balance: Optional[int] = None):
+        self.tx = tx
+        self.approved = approved
+        self.message = message
+        self.balance = balance
+
+
+class TransactionPreparer:
+    """
+    Builds native transfers for one wallet while the Babysitter validation
+    is in flight.
+
+    The validation request and the RPC lookups (balance, gas price, chain id,
+    pending nonce) run concurrently. Reads go through a ChainReadCache
+    (chain_id for good, gas price and balance per block / gas_price_ttl
+    seconds, balance dropped after every send) and nonces come from a
+    NonceManager; pass the same cache and NonceManager to everything that
+    uses this wallet. Only signing and broadcast wait for the verdict.
+    """
+    def __init__(
+        self,
+        w3,
+        address: str,
+        gas_limit: int = 300000,
+        gas_price_ttl: float = 3.0,
+        executor: Optional[ThreadPoolExecutor] = None,
+        nonce_manager: Optional[NonceManager] = None,
+        read_cache: Optional[ChainReadCache] = None,
+    ):
+        self.w3 = w3
+        self.address = address
+        self.gas_limit = gas_limit
+        self._executor = executor or ThreadPoolExecutor(max_workers=8, thread_name_prefix="tx-prep")
+        self.read_cache = read_cache or ChainReadCache(w3, ttl=gas_price_ttl)
+        # compartir el NonceManager entre todo lo que envíe desde la misma wallet
+        self.nonce_manager = nonce_manager or NonceManager(w3)
+
+    def chain_id(self) -> int:
+        return self.read_cache.chain_id()
+
+    def gas_price(self) -> int:
+        return self.read_cache.gas_price()
+
+    def balance(self) -> int:
+        return self.read_cache.balance(self.address)
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        # cada tarea corre con una copia del contexto, así respeta el deadline del turno
+        return self._executor.submit(contextvars.copy_context().run, fn, *args)
+
+    def prepare(
+        self,
+        to_address: str,
+        value_wei: int,
+        validate: Callable[[], Tuple[bool, str]],
+    ) -> PreparedTransaction:
+        """
+        Runs validate() alongside the RPC lookups and returns the unsigned
+        transaction if it was approved (and the wallet can pay for it)
+        """
+        verdict = self._submit(validate)
+        balance = self._submit(self.balance)
+        gas_price = self._submit(self.gas_price)
+        chain_id = self._submit(self.chain_id)
+        nonce_synced = self._submit(self.nonce_manager.ensure_synced, self.address)
+
+        approved, message = verdict.result()
+        if not approved:
+            return PreparedTransaction(None, False, message)
+
+        gas_price_wei = gas_price.result()
+        balance_wei = balance.result()
+        if balance_wei < value_wei + self.gas_limit * gas_price_wei:
+            return PreparedTransaction(None, False, "Insufficient balance", balance_wei)
+
+        nonce_synced.result()
+        tx = {
+            "to": to_address,
+            "value": value_wei,
+            "gas": self.gas_limit,
+            "gasPrice": gas_price_wei,
+            "nonce": self.nonce_manager.reserve(self.address),
+            "chainId": chain_id.result(),
+        }
+        return PreparedTransaction(tx, True, message, balance_wei)
+
+    def send(self, prepared: PreparedTransaction, account) -> Any:
+        """Signs with the LocalAccount and broadcasts, returns the tx hash"""
+        nonce = prepared.tx["nonce"]
+        try:
+            signed_txn = account.sign_transaction(prepared.tx)
+            with get_registry().timer("rpc_seconds", call="send_raw_transaction"):
+                tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        except Exception as e:
+            if "nonce" in str(e).lower():
+                # el nonce local quedó desfasado respecto al nodo
+                self.nonce_manager.resync(self.address)
+            else:
+                self.nonce_manager.release(self.address, nonce)
+            raise
+        self.nonce_manager.confirm(self.address, nonce)
+        self.read_cache.invalidate_address(self.address)
+        return tx_hash
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+def wrap_send_native_pipelined(
+    preparer: TransactionPreparer,
+    babysitter: Babysitter,
+    account,
+    chat: Chat,
+) -> callable:
+    """
+    send_native replacement that validates with Babysitter while the
+    transaction is being prepared, then signs and broadcasts it.
+    babysitter must validate the native coin (ValueError for an ERC-20 token)
+    """
+    if not babysitter.token.is_native:
+        # el monto se firma como wei de la moneda nativa, no en unidades del token
+        raise ValueError(f"send_native moves the native coin, babysitter validates {babysitter.token!r}")
+
+    def wrapped_send_native(to_address: str, amount: float) -> Tuple[FunctionResultStatus, str, Dict[str, Any]]:
+        try:
+            # una sola conversión: el mismo valor en wei se valida y se firma
+            value = babysitter.token.to_units(amount)
+            prepared = preparer.prepare(
+                to_address,
+                value,
+                lambda: babysitter.validate_txs(account.address, [Transaction(to_address, value)], chat)[0],
+            )
+            if not prepared.approved:
+                return FunctionResultStatus.FAILED, f"Transaction rejected: {prepared.message}", {}
+
+            tx_hash = preparer.send(prepared, account)
+            return FunctionResultStatus.DONE, f"Transaction sent with hash: {tx_hash.hex()}", {}
+
+        except Exception as e:
+            return FunctionResultStatus.FAILED, f"Execution error: {str(e)}", {}
+
+    return wrapped_send_native
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class VerdictCache:
+    """
+    LRU cache of validator verdicts with a TTL per verdict.
+
+    Keys are (from, to, amount in base units, token, calldata, context
+    digest), so the same transfer retried in an unchanged conversation
+    doesn't go to the validator again. APPROVED verdicts and rejections have
+    their own TTL (rejected_ttl=0 disables caching rejections). Validation
+    errors are never cached.
+    """
+    def __init__(
+        self,
+        max_size: int = 1024,
+        approved_ttl: float = 60.0,
+        rejected_ttl: float = 10.0,
+    ):
+        self.max_size = max_size
+        self.approved_ttl = approved_ttl
+        self.rejected_ttl = rejected_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[bool, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        from_address: str,
+        to_address: str,
+        amount_wei: int,
+        token: str,
+        context_digest: str,
+        data: str = "",
+    ) -> Tuple:
+        return (from_address.lower(), to_address.lower(), amount_wei, token.lower(), data.lower(), context_digest)
+
+    def get(self, key: Hashable) -> Optional[Tuple[bool, str]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, verdict: Tuple[bool, str]):
+        ttl = self.approved_ttl if verdict[0] else self.rejected_ttl
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
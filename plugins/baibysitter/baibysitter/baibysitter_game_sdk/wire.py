@@ -0,0 +1,100 @@
+import gzip
+import json
+from typing import Any, Dict, Optional, Tuple
+from baibysitter.baibysitter_game_sdk.metrics import get_registry
+
+try:
+    import orjson  # opcional (pip install baibysitter[fast]), varias veces más rápido que json
+except ImportError:
+    orjson = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+# respuesta de un servidor que no acepta el Content-Encoding del cuerpo
+UNSUPPORTED_ENCODING_STATUSES = (415,)
+
+
+def json_dumps(payload: Any) -> bytes:
+    """Compact JSON body, with orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # tipos que orjson no maneja (claves no str, enteros de más de 64 bits...)
+            pass
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def _zstd_compressor(level: int):
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression needs the zstandard package (pip install zstandard)")
+    return zstandard.ZstdCompressor(level=level)
+
+
+class Compression:
+    """
+    Request body compression. Bodies smaller than min_size bytes are sent
+    as they are (compressing them costs more than it saves).
+
+    algorithm: "gzip" or "zstd" (needs the zstandard package)
+    level: compression level, default 6 for gzip and 3 for zstd
+
+    A server that answers 415 to a compressed body gets the same request
+    uncompressed and compression is turned off for that client.
+    """
+    def __init__(self, algorithm: str = GZIP, min_size: int = 4096, level: Optional[int] = None):
+        if algorithm not in (GZIP, ZSTD):
+            raise ValueError(f"Unknown compression {algorithm!r}, use 'gzip' or 'zstd'")
+        self.algorithm = algorithm
+        self.min_size = min_size
+        self.level = level if level is not None else (6 if algorithm == GZIP else 3)
+        self._zstd = _zstd_compressor(self.level) if algorithm == ZSTD else None
+
+    def compress(self, body: bytes) -> Tuple[bytes, Optional[str]]:
+        """(body to send, its Content-Encoding or None if it was left as is)"""
+        if len(body) < self.min_size:
+            return body, None
+        if self._zstd is not None:
+            # ZstdCompressor.compress es thread-safe si no se comparte un stream
+            compressed = self._zstd.compress(body)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.level, mtime=0)
+        if len(compressed) >= len(body):
+            return body, None
+        return compressed, self.algorithm
+
+
+class WireEncoder:
+    """
+    Encodes request bodies for one client (GAME API or Babysitter):
+    compact JSON plus optional compression, turned off for good once the
+    server rejects a compressed body.
+    """
+    def __init__(self, compression: Optional[Compression] = None, name: str = "game"):
+        self.compression = compression
+        self.name = name
+
+    def encode(self, payload: Any, headers: Dict[str, str]) -> Tuple[bytes, bytes, Dict[str, str]]:
+        """(plain body, body to send, headers for it)"""
+        body = json_dumps(payload)
+        compression = self.compression
+        if compression is None:
+            return body, body, headers
+        sent, encoding = compression.compress(body)
+        if encoding is None:
+            return body, body, headers
+        get_registry().inc("wire_bytes_saved_total", len(body) - len(sent), client=self.name)
+        return body, sent, {**headers, "Content-Encoding": encoding}
+
+    def rejected(self, status_code: int, headers: Dict[str, str]) -> bool:
+        """
+        True if the server refused a compressed body. Compression is disabled
+        and the caller resends the plain body
+        """
+        if "Content-Encoding" not in headers or status_code not in UNSUPPORTED_ENCODING_STATUSES:
+            return False
+        self.compression = None
+        get_registry().inc("wire_compression_rejected_total", client=self.name)
+        return True
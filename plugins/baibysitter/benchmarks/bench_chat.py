@@ -0,0 +1,201 @@
+"""
+Offline load test for ChatAgent / Chat / wrap_send_native.
+
+Starts the local mock server (GAME API + Babysitter validator), opens
+--chats conversations and drives --turns messages in each through a
+ChatScheduler, then reports throughput, turn latency percentiles, memory
+per chat and payload bytes per turn.
+
+    python benchmarks/bench_chat.py --chats 200 --turns 5 --concurrency 64 \
+        --game-latency 0.05 --validator-latency 0.02 --json results.json
+
+    # bytes per turn with a large state, compressed and as diffs
+    python benchmarks/bench_chat.py --state-keys 200 --state-diff --compression gzip
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+from baibysitter.baibysitter_game_sdk.chat_agent import ChatAgent
+from baibysitter.baibysitter_game_sdk.custom_types import Argument, Function, FunctionResultStatus
+from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter, wrap_send_native
+from baibysitter.baibysitter_game_sdk.api_v2 import PoolConfig
+from baibysitter.baibysitter_game_sdk.metrics import MetricsRegistry, set_registry
+from baibysitter.baibysitter_game_sdk.mock_server import MockConfig, MockServer, fixed, lognormal
+from baibysitter.baibysitter_game_sdk.scheduler import ChatScheduler
+from baibysitter.baibysitter_game_sdk.wire import Compression
+
+WALLET = "0x000000000000000000000000000000000000dEaD"
+DESTINATIONS = [f"0x{i:040x}" for i in range(1, 9)]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def fake_send_native(to_address: str, amount: float) -> Tuple[FunctionResultStatus, str, Dict[str, Any]]:
+    # no firmamos nada, solo medimos el overhead del plugin
+    return FunctionResultStatus.DONE, f"Sent {amount} ETH to {to_address}", {"tx_hash": "0x0"}
+
+
+def check_balance() -> Tuple[FunctionResultStatus, str, Dict[str, Any]]:
+    return FunctionResultStatus.DONE, "Balance: 1.0 ETH", {"balance": 1.0}
+
+
+def build_functions(babysitter: Babysitter, chat) -> List[Function]:
+    return [
+        Function(
+            fn_name="check_balance",
+            fn_description="Check ETH balance of current address",
+            args=[],
+            executable=check_balance,
+        ),
+        Function(
+            fn_name="send_native",
+            fn_description="Send ETH to an address",
+            args=[
+                Argument(name="to_address", description="Destination address"),
+                Argument(name="amount", description="Amount of ETH to send"),
+            ],
+            executable=wrap_send_native(fake_send_native, babysitter, wallet_address=WALLET, chat=chat),
+        ),
+    ]
+
+
+def make_state_fn(rng: random.Random, keys: int):
+    """State with `keys` fixed entries plus a balance that changes on some turns"""
+    state = {f"token_{i}": {"symbol": f"TK{i}", "balance": str(rng.getrandbits(64))} for i in range(keys)}
+
+    def get_state():
+        if rng.random() < 0.3:
+            state["eth_balance"] = str(rng.getrandbits(64))
+        return state
+    return get_state
+
+
+def next_message(rng: random.Random, send_ratio: float) -> str:
+    roll = rng.random()
+    if roll < send_ratio:
+        return f"send {rng.choice(['0.001', '0.01', '0.5', '2'])} to {rng.choice(DESTINATIONS)}"
+    if roll < send_ratio + 0.1:
+        return "what is my balance?"
+    return "hello, how are you?"
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    registry = MetricsRegistry()
+    set_registry(registry)
+    turn_latencies: List[float] = []
+    registry.add_hook(lambda name, labels, value: turn_latencies.append(value) if name == "chat_turn_seconds" else None)
+
+    latency = lognormal if args.lognormal else (lambda median, sigma: fixed(median))
+    config = MockConfig(
+        game_latency=latency(args.game_latency, 0.5),
+        validator_latency=latency(args.validator_latency, 0.5),
+        game_error_rate=args.error_rate,
+        validator_error_rate=args.error_rate,
+        max_amount_wei=10 ** 18,
+    )
+
+    with MockServer(config) as server:
+        compression = Compression(args.compression, min_size=args.compress_min_size) if args.compression else None
+        agent = ChatAgent(
+            api_key="apt-benchmark",
+            prompt="You are a wallet assistant",
+            pool_config=PoolConfig(pool_maxsize=args.concurrency),
+            base_url=server.game_url,
+            compression=compression,
+            state_diff=args.state_diff,
+        )
+        babysitter = Babysitter(api_url=server.validator_url, incremental=args.incremental, compression=compression)
+
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        chats = []
+        for i in range(args.chats):
+            chat = agent.create_chat(
+                partner_id=f"bench-{i}",
+                partner_name="bench",
+                get_state_fn=make_state_fn(rng, args.state_keys) if args.state_keys else None,
+            )
+            chat.action_space = build_functions(babysitter, chat)
+            chats.append(chat)
+
+        errors = 0
+        start = time.perf_counter()
+        with ChatScheduler(max_workers=args.concurrency, rate_limit=args.rate) as scheduler:
+            futures = [
+                scheduler.submit(chat, next_message(rng, args.send_ratio))
+                for _ in range(args.turns)
+                for chat in chats
+            ]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    errors += 1
+        elapsed = time.perf_counter() - start
+        memory_after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        agent.close()
+
+    turns = len(futures)
+    game_bytes = sum(
+        h["sum"] for h in registry.snapshot()["histograms"] if h["name"] == "game_request_bytes"
+    )
+    babysitter_bytes = sum(
+        h["sum"] for h in registry.snapshot()["histograms"] if h["name"] == "babysitter_request_bytes"
+    )
+    return {
+        "chats": args.chats,
+        "turns": turns,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "turns_per_second": round(turns / elapsed, 2) if elapsed else 0.0,
+        "turn_p50_ms": round(percentile(turn_latencies, 0.50) * 1000, 2),
+        "turn_p99_ms": round(percentile(turn_latencies, 0.99) * 1000, 2),
+        "memory_per_chat_bytes": (memory_after - memory_before) // max(args.chats, 1),
+        "game_bytes_per_turn": round(game_bytes / turns, 1) if turns else 0.0,
+        "babysitter_bytes_per_turn": round(babysitter_bytes / turns, 1) if turns else 0.0,
+        "server": server.stats.as_dict(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chats", type=int, default=50, help="concurrent conversations")
+    parser.add_argument("--turns", type=int, default=5, help="messages per conversation")
+    parser.add_argument("--concurrency", type=int, default=32, help="scheduler worker threads")
+    parser.add_argument("--rate", type=float, default=None, help="max turns per second (default: unlimited)")
+    parser.add_argument("--game-latency", type=float, default=0.02, help="GAME API latency in seconds (median)")
+    parser.add_argument("--validator-latency", type=float, default=0.01, help="validator latency in seconds (median)")
+    parser.add_argument("--lognormal", action="store_true", help="long-tailed latencies instead of fixed ones")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503 from the mock")
+    parser.add_argument("--send-ratio", type=float, default=0.5, help="share of messages that trigger send_native")
+    parser.add_argument("--incremental", action="store_true", help="send the context to the validator as a delta")
+    parser.add_argument("--compression", choices=["gzip", "zstd"], help="compress request bodies")
+    parser.add_argument("--compress-min-size", type=int, default=1024, help="smallest body that gets compressed")
+    parser.add_argument("--state-keys", type=int, default=0, help="entries in the chat state (0: no get_state_fn)")
+    parser.add_argument("--state-diff", action="store_true", help="send only the state keys that changed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    for key, value in results.items():
+        if key != "server":
+            print(f"{key:>28}: {value}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Throughput of ShardedRunner against the local mock server.
+
+Opens --chats conversations, each with its own wallet, and drives --turns
+messages in each through a ShardedRunner, once per value of --shards
+(1 is the single-process baseline). Every shard builds its own ChatAgent,
+connection pool and Babysitter.
+
+    python benchmarks/bench_shards.py --shards 1 2 4 8 --chats 400 --turns 5 --json shards.json
+"""
+import argparse
+import json
+import random
+import time
+from functools import partial
+from typing import Any, Dict, List
+
+from bench_chat import check_balance, fake_send_native, next_message, percentile
+from baibysitter.baibysitter_game_sdk.mock_server import MockConfig, MockServer, fixed
+from baibysitter.baibysitter_game_sdk.sharding import ShardApp, ShardedRunner
+
+
+class BenchShard(ShardApp):
+    def __init__(self, shard_id: int, game_url: str, validator_url: str, concurrency: int):
+        super().__init__(shard_id)
+        from baibysitter.baibysitter_game_sdk.api_v2 import PoolConfig
+        from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter
+        from baibysitter.baibysitter_game_sdk.chat_agent import ChatAgent
+
+        self.agent = ChatAgent(
+            api_key="apt-benchmark",
+            prompt="You are a wallet assistant",
+            pool_config=PoolConfig(pool_maxsize=concurrency),
+            base_url=game_url,
+        )
+        self.babysitter = Babysitter(api_url=validator_url)
+
+    def open_chat(self, wallet_address: str, partner_id: str, partner_name: str):
+        from baibysitter.baibysitter_game_sdk.baibysitter import wrap_send_native
+        from baibysitter.baibysitter_game_sdk.custom_types import Argument, Function
+
+        def functions(chat) -> List[Function]:
+            return [
+                Function(
+                    fn_name="check_balance",
+                    fn_description="Check ETH balance of current address",
+                    args=[],
+                    executable=check_balance,
+                ),
+                Function(
+                    fn_name="send_native",
+                    fn_description="Send ETH to an address",
+                    args=[
+                        Argument(name="to_address", description="Destination address"),
+                        Argument(name="amount", description="Amount of ETH to send"),
+                    ],
+                    executable=wrap_send_native(fake_send_native, self.babysitter, wallet_address=wallet_address, chat=chat),
+                ),
+            ]
+
+        return self.agent.create_chat(partner_id=partner_id, partner_name=partner_name, action_space=functions)
+
+    def close(self):
+        self.babysitter.close()
+        self.agent.close()
+
+
+def run(args: argparse.Namespace, shards: int, server: MockServer) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    wallets = [f"0x{rng.getrandbits(160):040x}" for _ in range(args.chats)]
+    setup = partial(
+        BenchShard,
+        game_url=server.game_url,
+        validator_url=server.validator_url,
+        concurrency=args.concurrency,
+    )
+
+    with ShardedRunner(setup, shards=shards, max_workers=args.concurrency) as runner:
+        latencies: List[float] = []
+        errors = 0
+        start = time.perf_counter()
+        futures = []
+        for _ in range(args.turns):
+            for wallet in wallets:
+                submitted = time.perf_counter()
+                future = runner.submit(wallet, "bench", next_message(rng, args.send_ratio))
+                future.add_done_callback(lambda f, t=submitted: latencies.append(time.perf_counter() - t))
+                futures.append(future)
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                errors += 1
+        elapsed = time.perf_counter() - start
+        routed = [s["routed"] for s in runner.stats()]
+
+    return {
+        "shards": shards,
+        "turns": len(futures),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "turns_per_second": round(len(futures) / elapsed, 2) if elapsed else 0.0,
+        "turn_p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "turn_p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "routed_per_shard": routed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4], help="shard counts to compare")
+    parser.add_argument("--chats", type=int, default=200, help="conversations, one wallet each")
+    parser.add_argument("--turns", type=int, default=5, help="messages per conversation")
+    parser.add_argument("--concurrency", type=int, default=16, help="scheduler threads per shard")
+    parser.add_argument("--game-latency", type=float, default=0.01, help="GAME API latency in seconds")
+    parser.add_argument("--validator-latency", type=float, default=0.005, help="validator latency in seconds")
+    parser.add_argument("--send-ratio", type=float, default=0.5, help="share of messages that trigger send_native")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        game_latency=fixed(args.game_latency),
+        validator_latency=fixed(args.validator_latency),
+        max_amount_wei=10 ** 18,
+    )
+    results = []
+    with MockServer(config) as server:
+        for shards in args.shards:
+            result = run(args, shards, server)
+            results.append(result)
+            print(
+                f"{shards:>3} shards: {result['turns_per_second']:>9} turns/s  "
+                f"p50 {result['turn_p50_ms']} ms  p99 {result['turn_p99_ms']} ms  errors {result['errors']}"
+            )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Startup cost of the baibysitter package.
+
+Two measurements, each in fresh interpreters:
+
+- import profile: `python -X importtime -c "import <module>"` for each
+  module, with the total and the heaviest imports it pulls in
+- time to first turn: a child process imports ChatAgent / Babysitter,
+  creates a chat against the local mock server and runs the first
+  chat.next() (a send_native validated by Babysitter)
+
+    python benchmarks/bench_startup.py --runs 5 --top 15 --json startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+MODULES = [
+    "baibysitter.baibysitter_game_sdk",
+    "baibysitter.baibysitter_game_sdk.baibysitter",
+    "baibysitter.baibysitter_game_sdk.chat_agent",
+    "baibysitter.baibysitter_game_sdk.async_chat_agent",
+]
+
+
+def _env() -> Dict[str, str]:
+    # el hijo tiene que encontrar el paquete igual que este proceso
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [os.getcwd(), env.get("PYTHONPATH", "")] if p)
+    return env
+
+
+def import_profile(module: str) -> Tuple[int, List[Tuple[int, int, str]]]:
+    """(cumulative us of module, [(self us, cumulative us, name)]) from -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=_env(),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    total = next((c for _, c, n in reversed(rows) if n.strip() == module), 0)
+    return total, rows
+
+
+def first_turn_child(game_url: str, validator_url: str):
+    """Runs in the child: everything from the first import to the first verdict"""
+    start = time.perf_counter()
+    from baibysitter.baibysitter_game_sdk.chat_agent import ChatAgent
+    from baibysitter.baibysitter_game_sdk.custom_types import Argument, Function, FunctionResultStatus
+    from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter, wrap_send_native
+    imported = time.perf_counter()
+
+    def fake_send_native(to_address: str, amount: float):
+        return FunctionResultStatus.DONE, f"Sent {amount} ETH to {to_address}", {}
+
+    def build_functions(chat):
+        return [
+            Function(
+                fn_name="send_native",
+                fn_description="Send ETH to an address",
+                args=[
+                    Argument(name="to_address", description="Destination address"),
+                    Argument(name="amount", description="Amount of ETH to send"),
+                ],
+                executable=wrap_send_native(fake_send_native, babysitter, wallet_address="0x" + "0" * 40, chat=chat),
+            ),
+        ]
+
+    agent = ChatAgent(api_key="apt-startup", prompt="You are a wallet assistant", base_url=game_url)
+    babysitter = Babysitter(api_url=validator_url)
+    chat = agent.create_chat(partner_id="startup", partner_name="startup", action_space=build_functions)
+    created = time.perf_counter()
+    chat.next(f"send 0.01 to 0x{1:040x}")
+    done = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - start) * 1000,
+        "create_chat_ms": (created - imported) * 1000,
+        "first_next_ms": (done - created) * 1000,
+        "in_process_ms": (done - start) * 1000,
+    }))
+
+
+def first_turn(runs: int) -> Dict[str, float]:
+    from baibysitter.baibysitter_game_sdk.mock_server import MockConfig, MockServer, fixed
+
+    samples: List[Dict[str, float]] = []
+    config = MockConfig(game_latency=fixed(0.0), validator_latency=fixed(0.0))
+    with MockServer(config) as server:
+        for _ in range(runs):
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", server.game_url, server.validator_url],
+                capture_output=True,
+                text=True,
+                env=_env(),
+            )
+            wall = (time.perf_counter() - start) * 1000
+            if proc.returncode != 0:
+                raise RuntimeError(f"first turn failed:\n{proc.stderr.strip()}")
+            sample = json.loads(proc.stdout.strip().splitlines()[-1])
+            sample["process_wall_ms"] = wall
+            samples.append(sample)
+    return {key: round(statistics.median(s[key] for s in samples), 2) for key in samples[0]}
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        first_turn_child(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="child processes per measurement (median)")
+    parser.add_argument("--top", type=int, default=10, help="heaviest imports listed per module")
+    parser.add_argument("--modules", nargs="*", default=MODULES)
+    parser.add_argument("--skip-first-turn", action="store_true")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {"imports": {}}
+    for module in args.modules:
+        try:
+            profiles = [import_profile(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module}: {e}")
+            continue
+        total_ms = statistics.median(total for total, _ in profiles) / 1000
+        rows = [row for row in profiles[-1][1] if row[2].strip() != module]
+        heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]
+        results["imports"][module] = {
+            "total_ms": round(total_ms, 2),
+            "heaviest": [{"module": name.strip(), "cumulative_ms": round(c / 1000, 2)} for _, c, name in heaviest],
+        }
+        print(f"import {module}: {total_ms:.1f} ms")
+        for _, cumulative, name in heaviest:
+            print(f"    {cumulative / 1000:8.1f} ms  {name.strip()}")
+
+    if not args.skip_first_turn:
+        results["first_turn"] = first_turn(args.runs)
+        print("time to first chat.next():")
+        for key, value in results["first_turn"].items():
+            print(f"{key:>20}: {value}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,19 @@
 import os
-import traceback
-from typing import Any, Tuple, Dict
+import logging
+from functools import lru_cache
+from typing import Any, List, Tuple
 from dotenv import load_dotenv
 from pathlib import Path
 from baibysitter.baibysitter_game_sdk.chat_agent import ChatAgent
 from baibysitter.baibysitter_game_sdk.custom_types import Argument, Function, FunctionResultStatus
-from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter, wrap_send_native
+from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter, wrap_send_native, wrap_transaction_fn
+from baibysitter.baibysitter_game_sdk.calldata import erc20_transfer
+from baibysitter.baibysitter_game_sdk.chain_cache import ChainReadCache
+from baibysitter.baibysitter_game_sdk.transactions import Token
 from web3 import Web3
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 
-# Importaciones de goat
-from goat_adapters.langchain import get_on_chain_tools
-from goat_plugins.erc20.token import USDC
-from goat_plugins.erc20 import erc20, ERC20PluginOptions
-from goat_wallets.evm import send_eth
-from goat_wallets.web3 import Web3EVMWalletClient
-
 # Configuración de chains
 CHAIN_CONFIG = {
     "base_sepolia": {
@@ -28,10 +25,14 @@ CHAIN_CONFIG = {
             "symbol": "ETH",
             "decimals": 18,
             "name": "base sepolia"
-        }
+        },
+        "usdc_address": "0x036CbD53842c5426634e7929541eC2318f3dCF7e"
     }
 }
 
+logger = logging.getLogger("chat_blockchain")
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING").upper())
+
 # Cargar variables de entorno
 env_path = Path(__file__).parent / '.env'
 load_dotenv(dotenv_path=env_path)
@@ -43,34 +44,42 @@ if SELECTED_CHAIN not in CHAIN_CONFIG:
 
 chain_config = CHAIN_CONFIG[SELECTED_CHAIN]
 rpc_url = os.environ.get("RPC_PROVIDER_URL", chain_config["rpc_url"])
+native_token = Token(chain_config["native_token"]["symbol"], chain_config["native_token"]["decimals"])
+usdc_token = Token("USDC", 6, chain_config["usdc_address"])
+build_usdc_transfer = erc20_transfer(usdc_token)
 
 private_key = os.environ.get("WALLET_PRIVATE_KEY")
 assert private_key is not None, "WALLET_PRIVATE_KEY must be configured"
 assert private_key.startswith("0x"), "Private key must start with 0x"
 
-# Inicializar Web3 y cuenta
+# Inicializar Web3 y cuenta (Web3 no se conecta hasta la primera llamada)
 w3 = Web3(Web3.HTTPProvider(rpc_url))
 account: LocalAccount = Account.from_key(private_key)
 w3.eth.default_account = account.address
 
-# Verificar conexión y chain
-print(f"Connected to {chain_config['name']}")
-print(f"Chain ID: {w3.eth.chain_id}")
-print(f"Wallet address: {account.address}")
-print(f"Explorer: {chain_config['explorer']}")
-
-# Inicializar wallet y herramientas
-wallet = Web3EVMWalletClient(w3)
-tools = get_on_chain_tools(
-    wallet=wallet,
-    plugins=[
-        send_eth(),
-        erc20(options=ERC20PluginOptions(tokens=[USDC]))
-    ]
-)
-
 # Después de inicializar Web3 y la cuenta
-babysitter = Babysitter(api_url=os.environ.get("API_URL"))
+babysitter = Babysitter(api_url=os.environ.get("API_URL"), token=native_token)
+
+# balance, gas price y chain id se leen una vez por bloque (como mucho cada 2s)
+read_cache = ChainReadCache(w3, ttl=2.0)
+
+
+@lru_cache(maxsize=None)
+def get_goat_tools():
+    """goat on-chain tools, imported and built only when something asks for them"""
+    from goat_adapters.langchain import get_on_chain_tools
+    from goat_plugins.erc20.token import USDC
+    from goat_plugins.erc20 import erc20, ERC20PluginOptions
+    from goat_wallets.evm import send_eth
+    from goat_wallets.web3 import Web3EVMWalletClient
+
+    return get_on_chain_tools(
+        wallet=Web3EVMWalletClient(w3),
+        plugins=[
+            send_eth(),
+            erc20(options=ERC20PluginOptions(tokens=[USDC]))
+        ]
+    )
 
 # Mantener un historial de la conversación
 conversation_history = []
@@ -83,13 +92,10 @@ def handle_message(message: str):
 def check_balance() -> Tuple[FunctionResultStatus, str, dict[str, Any]]:
     """Check balance using web3"""
     try:
-        balance_wei = w3.eth.get_balance(account.address)
+        balance_wei = read_cache.balance(account.address)
         balance_eth = w3.from_wei(balance_wei, 'ether')
         
-        print("\n=== DEBUG INFO ===")
-        print(f"Balance in wei: {balance_wei}")
-        print(f"Balance in ETH: {balance_eth}")
-        print("=== END DEBUG ===\n")
+        logger.debug("Balance: %s wei (%s ETH)", balance_wei, balance_eth)
         
         return FunctionResultStatus.DONE, f"Balance: {balance_eth} ETH", {
             "balance": float(balance_eth),
@@ -98,30 +104,28 @@ def check_balance() -> Tuple[FunctionResultStatus, str, dict[str, Any]]:
             "wei_balance": str(balance_wei)
         }
     except Exception as e:
-        print(f"Error in check_balance: {e}")
+        logger.exception("Error in check_balance")
         return FunctionResultStatus.FAILED, f"Error checking balance: {str(e)}", {}
 
 def send_native(to_address: str, amount: float) -> Tuple[FunctionResultStatus, str, dict[str, Any]]:
     try:
-        print(f"\n💰 Starting send_native:")
-        print(f"   From: {account.address}")
-        print(f"   To: {to_address}")
-        print(f"   Amount: {amount} ETH")
-        
-        balance = w3.eth.get_balance(account.address)
-        eth_balance = w3.from_wei(balance, 'ether')
-        print(f"   Current balance: {eth_balance} ETH")
+        logger.debug("send_native from=%s to=%s amount=%s ETH", account.address, to_address, amount)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            balance = read_cache.balance(account.address)
+            logger.debug("Current balance: %s ETH", w3.from_wei(balance, 'ether'))
         
         transaction = {
             'to': to_address,
-            'value': w3.to_wei(amount, 'ether'),
+            # misma conversión que usó Babysitter al validar
+            'value': native_token.to_units(amount),
             'gas': 300000,
-            'gasPrice': w3.eth.gas_price,
+            'gasPrice': read_cache.gas_price(),
             'nonce': w3.eth.get_transaction_count(account.address),
-            'chainId': w3.eth.chain_id
+            'chainId': read_cache.chain_id()
         }
         
-        print(f"   Transaction built: {transaction}")
+        logger.debug("Transaction built: %s", transaction)
         
         signed_txn = w3.eth.account.sign_transaction(transaction, private_key)
         tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
@@ -129,13 +133,85 @@ def send_native(to_address: str, amount: float) -> Tuple[FunctionResultStatus, s
         return FunctionResultStatus.DONE, f"Transaction sent with hash: {tx_hash.hex()}", {}
         
     except Exception as e:
-        print(f"❌ Error in send_native: {str(e)}")
-        print(f"❌ Complete traceback: {traceback.format_exc()}")
+        logger.exception("Error in send_native")
         return FunctionResultStatus.FAILED, f"Transaction error: {str(e)}", {}
 
-# Crear el agente
-agent = ChatAgent(
-    prompt=f"""You are a blockchain assistant operating with wallet {account.address}.
+def send_usdc(to_address: str, amount: float) -> Tuple[FunctionResultStatus, str, dict[str, Any]]:
+    try:
+        # la misma transacción (calldata incluida) que validó Babysitter
+        tx = build_usdc_transfer(to_address, amount)
+        transaction = {
+            'to': tx.to,
+            'value': tx.value,
+            'data': tx.data,
+            'gas': 100000,
+            'gasPrice': read_cache.gas_price(),
+            'nonce': w3.eth.get_transaction_count(account.address),
+            'chainId': read_cache.chain_id()
+        }
+
+        signed_txn = w3.eth.account.sign_transaction(transaction, private_key)
+        tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+
+        return FunctionResultStatus.DONE, f"Transaction sent with hash: {tx_hash.hex()}", {}
+
+    except Exception as e:
+        logger.exception("Error in send_usdc")
+        return FunctionResultStatus.FAILED, f"Transaction error: {str(e)}", {}
+
+def build_action_space(chat) -> List[Function]:
+    """Called by the chat the first time it needs its functions"""
+    return [
+        Function(
+            fn_name="check_balance",
+            fn_description="Check ETH balance of current address",
+            args=[],
+            executable=check_balance,
+        ),
+        Function(
+            fn_name="send_native",
+            fn_description="Send ETH to an address",
+            args=[
+                Argument(name="to_address", description="Destination address"),
+                Argument(name="amount", description="Amount of ETH to send")
+            ],
+            executable=wrap_send_native(
+                send_native,
+                babysitter,
+                wallet_address=account.address,
+                chat=chat,  # Pass complete chat object
+                read_cache=read_cache,  # drops the cached balance after each send
+            ),
+        ),
+        Function(
+            fn_name="send_usdc",
+            fn_description="Send USDC to an address",
+            args=[
+                Argument(name="to_address", description="Destination address"),
+                Argument(name="amount", description="Amount of USDC to send")
+            ],
+            executable=wrap_transaction_fn(
+                send_usdc,
+                babysitter,
+                wallet_address=account.address,
+                chat=chat,
+                build_tx=build_usdc_transfer,  # ERC-20 transfer, validated with its calldata
+                read_cache=read_cache,
+            ),
+        )
+    ]
+
+
+def main():
+    # Verificar conexión y chain (chain id queda cacheado para las transacciones)
+    print(f"Connected to {chain_config['name']}")
+    print(f"Chain ID: {read_cache.chain_id()}")
+    print(f"Wallet address: {account.address}")
+    print(f"Explorer: {chain_config['explorer']}")
+
+    # Crear el agente
+    agent = ChatAgent(
+        prompt=f"""You are a blockchain assistant operating with wallet {account.address}.
     You are empathetic and friendly, always trying to help users.
     This is your interface for both configuration and responses.
     1. For eth balance queries:
@@ -150,66 +226,44 @@ agent = ChatAgent(
 
     if warining comes from firewall review with warningemoticons
     The current wallet is {account.address}""",
-    api_key=os.environ.get("GAME_API_KEY")
-)
-
-# Crear el chat
-chat = agent.create_chat(
-    partner_id="blockchain_user",
-    partner_name="User",
-)
-
-# Luego configuramos el action_space con los mensajes del chat
-action_space = [
-    Function(
-        fn_name="check_balance",
-        fn_description="Check ETH balance of current address",
-        args=[],
-        executable=check_balance,
-    ),
-    Function(
-        fn_name="send_native",
-        fn_description="Send ETH to an address",
-        args=[
-            Argument(name="to_address", description="Destination address"),
-            Argument(name="amount", description="Amount of ETH to send")
-        ],
-        executable=wrap_send_native(
-            send_native,
-            babysitter,
-            wallet_address=account.address,
-            chat=chat  # Pass complete chat object
-        ),
+        api_key=os.environ.get("GAME_API_KEY")
     )
-]
 
-# Actualizamos el chat con el action_space
-chat.action_space = {f.fn_name: f for f in action_space}
+    # Crear el chat, las funciones se arman recién en el primer turno
+    chat = agent.create_chat(
+        partner_id="blockchain_user",
+        partner_name="User",
+        action_space=build_action_space,
+    )
 
-print(f"Wallet address: {account.address}")
-print("\nWelcome to Blockchain Chat! Type 'exit' to end.")
+    print(f"Wallet address: {account.address}")
+    print("\nWelcome to Blockchain Chat! Type 'exit' to end.")
 
-# Loop principal
-chat_continue = True
-while chat_continue:
-    user_message = input("Enter a message: ")
+    # Loop principal
+    chat_continue = True
+    while chat_continue:
+        user_message = input("Enter a message: ")
     
-    if user_message.lower() == 'exit':
-        chat_continue = False
-        break
+        if user_message.lower() == 'exit':
+            chat_continue = False
+            break
         
-    response = chat.next(user_message)
+        response = chat.next(user_message)
     
-    if response.function_call:
-        print(f"Function call: {response.function_call.fn_name}")
-        print(f"Arguments: {response.function_call.fn_args}")
-        print(f"Result: {response.function_call.result}")
+        if response.function_call:
+            print(f"Function call: {response.function_call.fn_name}")
+            print(f"Arguments: {response.function_call.fn_args}")
+            print(f"Result: {response.function_call.result}")
     
-    if response.message:
-        print(f"Response: {response.message}")
+        if response.message:
+            print(f"Response: {response.message}")
     
-    if response.is_finished:
-        chat_continue = False
-        break
+        if response.is_finished:
+            chat_continue = False
+            break
+
+    print("Chat ended")
+
 
-print("Chat ended")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
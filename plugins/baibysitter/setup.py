@@ -8,9 +8,15 @@ setup(
         "web3",
         "python-dotenv",
         "httpx",
+        "requests",
         "game-sdk",  # si este es un requisito
         "goat-sdk",  # si este es un requisito
     ],
+    extras_require={
+        # JSON más rápido y compresión zstd, ambos opcionales
+        "fast": ["orjson", "zstandard"],
+        "test": ["pytest"],
+    },
     author="Tu Nombre",
     author_email="tu@email.com",
     description=" plugin  baibysitter  GAME SDK",
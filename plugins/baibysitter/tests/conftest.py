@@ -0,0 +1,32 @@
+import pytest
+
+from baibysitter.baibysitter_game_sdk.history import CompactHistoryStore
+from baibysitter.baibysitter_game_sdk.mock_server import MockConfig, MockServer
+
+WALLET = "0x" + "11" * 20
+ALICE = "0x" + "aa" * 20
+BOB = "0x" + "bb" * 20
+MALLORY = "0x" + "dd" * 20
+
+
+class FakeChat:
+    """What Babysitter reads from a Chat: its id and history"""
+    def __init__(self, chat_id: str = "chat-1", *messages: str):
+        self.chat_id = chat_id
+        self.history = CompactHistoryStore()
+        for message in messages:
+            self.history.append("user", message)
+
+
+@pytest.fixture
+def chat():
+    return FakeChat("chat-1", "send some ETH please")
+
+
+@pytest.fixture
+def mock_server(request):
+    """MockServer with the MockConfig given by @pytest.mark.mock_config(...) (defaults otherwise)"""
+    marker = request.node.get_closest_marker("mock_config")
+    config = MockConfig(**marker.kwargs) if marker else MockConfig()
+    with MockServer(config) as server:
+        yield server
@@ -0,0 +1,71 @@
+import socket
+import threading
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from baibysitter.baibysitter_game_sdk.api_v2 import GAMEClientV2, is_connect_error
+
+
+class DropServer:
+    """Reads each request and closes the connection without answering"""
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen()
+        self.requests = 0
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                data = b""
+                while b"\r\n\r\n" not in data:
+                    data += conn.recv(65536)
+                self.requests += 1
+
+
+def closed_port_url() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def counting_client(base_url: str):
+    client = GAMEClientV2("key", base_url=base_url)
+    posts = []
+    post = client.session.post
+
+    def counted(*args, **kwargs):
+        posts.append(1)
+        return post(*args, **kwargs)
+
+    client.session.post = counted
+    return client, posts
+
+
+def test_post_dropped_after_send_is_not_retried():
+    server = DropServer()
+    client, posts = counting_client(server.url)
+    with pytest.raises(requests.ConnectionError) as raised:
+        client.create_agent("name", "description", "goal")
+    assert not is_connect_error(raised.value)
+    assert len(posts) == server.requests == 1
+    server.sock.close()
+
+
+def test_post_connect_failure_is_retried():
+    client, posts = counting_client(closed_port_url())
+    with pytest.raises(requests.ConnectionError) as raised:
+        client.create_agent("name", "description", "goal")
+    assert is_connect_error(raised.value)
+    assert len(posts) == client.post_retry_policy.max_attempts
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("baibysitter.baibysitter_game_sdk.custom_types")
+
+from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter
+from baibysitter.baibysitter_game_sdk.batching import TransactionBatcher, wrap_send_native_batched
+from baibysitter.baibysitter_game_sdk.custom_types import FunctionResultStatus
+
+from conftest import ALICE, BOB, WALLET, FakeChat
+
+
+class ReadCache:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate_address(self, address):
+        self.invalidated.append(address)
+
+
+def send(to_address, amount):
+    return FunctionResultStatus.DONE, f"sent {amount} to {to_address}", {}
+
+
+def run_together(fn, calls):
+    results = [None] * len(calls)
+
+    def run(i):
+        results[i] = fn(*calls[i])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(calls))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def validate_requests(server) -> int:
+    return server.stats.as_dict()["requests"]["validate"]
+
+
+@pytest.mark.mock_config(max_amount_wei=10**18)
+def test_one_batcher_shared_by_chats(mock_server):
+    batcher = TransactionBatcher(Babysitter(mock_server.validator_url), WALLET, window=0.2)
+    chats = [FakeChat("chat-a", "pay them"), FakeChat("chat-b", "pay them")]
+    verdicts = run_together(
+        batcher.validate,
+        [(chat, to, amount) for chat in chats for to, amount in ((ALICE, 0.1), (BOB, 0.2), (BOB, 2))],
+    )
+    assert [approved for approved, _ in verdicts] == [True, True, False] * 2
+    # una petición por chat, no una por transferencia
+    assert validate_requests(mock_server) == 2
+
+
+def test_wrapped_parallel_calls_share_a_request(mock_server):
+    chat = FakeChat("chat-1", "send to both")
+    chat.max_parallel_calls = 4
+    read_cache = ReadCache()
+    batcher = TransactionBatcher(Babysitter(mock_server.validator_url), WALLET, window=0.2)
+    wrapped = wrap_send_native_batched(send, batcher, chat, read_cache)
+    results = run_together(wrapped, [(ALICE, 0.1), (BOB, 0.1)])
+    assert [status for status, _, _ in results] == [FunctionResultStatus.DONE] * 2
+    assert validate_requests(mock_server) == 1
+    assert read_cache.invalidated == [WALLET, WALLET]
+
+
+@pytest.mark.mock_config(blocked_addresses={BOB})
+def test_serial_chat_skips_the_window(mock_server):
+    chat = FakeChat("chat-1", "send to bob")
+    chat.max_parallel_calls = 1
+    read_cache = ReadCache()
+    batcher = TransactionBatcher(Babysitter(mock_server.validator_url), WALLET, window=5)
+    wrapped = wrap_send_native_batched(send, batcher, chat, read_cache)
+    started = time.monotonic()
+    status, message, _ = wrapped(BOB, 0.1)
+    assert time.monotonic() - started < 5
+    assert status == FunctionResultStatus.FAILED and "rejected" in message
+    # rechazada: no se mandó nada, la caché sigue valiendo
+    assert read_cache.invalidated == []
+    assert wrapped(ALICE, 0.1)[0] == FunctionResultStatus.DONE
+    assert read_cache.invalidated == [WALLET]
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from baibysitter.baibysitter_game_sdk.chain_cache import ChainReadCache
+
+WALLET = "0x" + "ab" * 20
+
+
+class Loader:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self.calls
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ChainReadCache()
+    load = Loader(delay=0.1)
+    results = []
+
+    def read():
+        results.append(cache.get("balance", load, address=WALLET))
+
+    threads = [threading.Thread(target=read) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert load.calls == 1 and results == [1] * 20
+    assert cache.stats() == (1, 0)
+
+
+def test_failed_load_is_shared_and_not_cached():
+    cache = ChainReadCache()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise ConnectionError("rpc down")
+
+    errors = []
+
+    def read():
+        try:
+            cache.get("balance", failing)
+        except ConnectionError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=read)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=read)
+    follower.start()
+    leader.join()
+    follower.join()
+    assert len(errors) == 2
+    assert cache.stats() == (0, 0)
+
+
+def test_invalidate_drops_entries_and_reads_started_before():
+    cache = ChainReadCache()
+    assert cache.get("balance", lambda: 100, address=WALLET) == 100
+    cache.invalidate_address("0x" + WALLET[2:].upper())
+    assert cache.get("balance", lambda: 95, address=WALLET) == 95
+
+    def stale_read():
+        # el envío termina mientras la lectura está en curso: no se guarda
+        cache.invalidate_address(WALLET)
+        return 95
+
+    cache.invalidate_address(WALLET)
+    assert cache.get("balance", stale_read, address=WALLET) == 95
+    assert cache.get("balance", lambda: 90, address=WALLET) == 90
+
+
+def test_new_block_and_ttl_expire_entries():
+    cache = ChainReadCache(ttl=0.05)
+    cache.on_new_block(10)
+    load = Loader()
+    assert cache.get("gas", load) == 1
+    assert cache.get("gas", load) == 1
+    cache.on_new_block(11)
+    assert cache.get("gas", load) == 2
+    time.sleep(0.06)
+    assert cache.get("gas", load) == 3
+    # per_block=False no caduca con los bloques
+    assert cache.get("chain", lambda: 8453, ttl=float("inf"), per_block=False) == 8453
+    cache.on_new_block(12)
+    assert cache.get("chain", pytest.fail, per_block=False) == 8453
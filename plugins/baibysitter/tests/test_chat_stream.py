@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("baibysitter.baibysitter_game_sdk.custom_types")
+
+from baibysitter.baibysitter_game_sdk.async_chat_agent import AsyncChat
+from baibysitter.baibysitter_game_sdk.chat_agent import Chat, MultiChatResponse
+from baibysitter.baibysitter_game_sdk.custom_types import Function, FunctionResultStatus
+
+
+def _call(fn_id, fn_name):
+    return {"id": fn_id, "fn_name": fn_name, "args": {}}
+
+
+TWO_CALLS = [
+    {"type": "message_delta", "content": "Running both"},
+    {"type": "function_call", "function_call": _call("1", "a")},
+    {"type": "function_call", "function_call": _call("2", "b")},
+    {"type": "done", "data": {"message": "Running both", "is_finished": False,
+                              "function_calls": [_call("1", "a"), _call("2", "b")]}},
+]
+# sin eventos de llamadas, solo la lista en el cuerpo final
+CALLS_IN_DONE = [
+    {"type": "done", "data": {"message": "ok", "is_finished": False,
+                              "function_call": _call("1", "a"),
+                              "function_calls": [_call("1", "a"), _call("2", "b")]}},
+]
+
+
+class FakeClient:
+    def __init__(self, events):
+        self.events = events
+        self.reports = []
+        self.batches = []
+
+    def stream_chat(self, conversation_id, data):
+        return iter(self.events)
+
+    def update_chat(self, conversation_id, data):
+        return self.events[-1]["data"]
+
+    def report_function(self, conversation_id, data):
+        self.reports.append(data)
+        return {"message": "reported"}
+
+    def report_functions(self, conversation_id, data):
+        self.batches.append(data)
+        return {"message": "reported batch"}
+
+
+class AsyncFakeClient(FakeClient):
+    async def stream_chat(self, conversation_id, data):
+        async def events():
+            for event in self.events:
+                yield event
+        return events()
+
+    async def report_function(self, conversation_id, data):
+        return FakeClient.report_function(self, conversation_id, data)
+
+    async def report_functions(self, conversation_id, data):
+        return FakeClient.report_functions(self, conversation_id, data)
+
+
+def _functions(ran):
+    def make(name):
+        def run():
+            ran.append(name)
+            return FunctionResultStatus.DONE, f"{name} done", {}
+        return Function(fn_name=name, fn_description=name, args=[], executable=run)
+    return [make("a"), make("b")]
+
+
+@pytest.mark.parametrize("events", [TWO_CALLS, CALLS_IN_DONE])
+def test_stream_runs_every_call(events):
+    ran = []
+    client = FakeClient(events)
+    chat = Chat("chat-1", client, action_space=_functions(ran))
+
+    stream = list(chat.stream_next("run a and b"))
+
+    assert sorted(ran) == ["a", "b"]
+    assert [e.function_call.fn_name for e in stream if e.type == "function_call"] == ["a", "b"]
+    assert len([e for e in stream if e.type == "function_result"]) == 2
+    assert client.reports == []
+    assert [r["fn_id"] for r in client.batches[0]["results"]] == ["1", "2"]
+    response = stream[-1].response
+    assert isinstance(response, MultiChatResponse)
+    assert [c.fn_name for c in response.function_calls] == ["a", "b"]
+    assert response.message == "reported batch"
+
+
+def test_stream_matches_next():
+    ran_stream, ran_next = [], []
+    streamed = list(Chat("s", FakeClient(TWO_CALLS), action_space=_functions(ran_stream)).stream_next("go"))[-1].response
+    nexted = Chat("n", FakeClient(TWO_CALLS), action_space=_functions(ran_next)).next("go")
+    assert sorted(ran_stream) == sorted(ran_next)
+    assert [c.fn_name for c in streamed.function_calls] == [c.fn_name for c in nexted.function_calls]
+
+
+def test_stream_single_call_reports_once():
+    events = [
+        {"type": "function_call", "function_call": _call("1", "a")},
+        {"type": "done", "data": {"message": "", "is_finished": False, "function_call": _call("1", "a")}},
+    ]
+    ran = []
+    client = FakeClient(events)
+    stream = list(Chat("chat-1", client, action_space=_functions(ran)).stream_next("run a"))
+    assert ran == ["a"]
+    assert len(client.reports) == 1 and client.batches == []
+    assert not isinstance(stream[-1].response, MultiChatResponse)
+
+
+def test_async_stream_runs_every_call():
+    ran = []
+    client = AsyncFakeClient(TWO_CALLS)
+    chat = AsyncChat("chat-1", client, action_space=_functions(ran))
+
+    async def collect():
+        return [event async for event in chat.stream_next("run a and b")]
+
+    stream = asyncio.run(collect())
+    assert sorted(ran) == ["a", "b"]
+    assert isinstance(stream[-1].response, MultiChatResponse)
+    assert len(client.batches) == 1
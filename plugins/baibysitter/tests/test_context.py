@@ -0,0 +1,76 @@
+from baibysitter.baibysitter_game_sdk.context import ConversationContext
+from baibysitter.baibysitter_game_sdk.history import CompactHistoryStore
+
+
+def _history(count, max_messages=None):
+    history = CompactHistoryStore(max_messages=max_messages)
+    for i in range(count):
+        history.append("user", f"m{i}")
+    return history
+
+
+def test_full_transcript_without_incremental():
+    history = _history(2)
+    context = ConversationContext()
+    context.sync(history)
+    assert context.build_fields(incremental=False) == {"reason": "User: m0\nUser: m1"}
+
+
+def test_delta_after_acknowledge():
+    history = _history(2)
+    context = ConversationContext()
+    context.sync(history)
+    fields = context.build_fields(incremental=True)
+    assert fields["createContext"] is True
+    context.acknowledge("ctx-1", fields["contextLength"], fields["contextDigest"])
+
+    history.append("assistant", "m2")
+    context.sync(history)
+    fields = context.build_fields(incremental=True)
+    assert fields["contextId"] == "ctx-1"
+    assert fields["contextOffset"] == 2
+    assert fields["contextLength"] == 3
+    assert fields["reason"] == "Assistant: m2"
+
+
+def test_acknowledge_ignores_stale_counts():
+    history = _history(3)
+    context = ConversationContext()
+    context.sync(history)
+    context.acknowledge("ctx-1", 3, "d3")
+    context.acknowledge("ctx-1", 2, "d2")
+    context.acknowledge("ctx-1", 10, "d10")
+    assert (context.acked_count, context.acked_digest) == (3, "d3")
+
+
+def test_evicted_unacknowledged_messages_open_a_new_context():
+    history = _history(2, max_messages=3)
+    context = ConversationContext()
+    context.sync(history)
+    fields = context.build_fields(incremental=True)
+    context.acknowledge("ctx-1", fields["contextLength"], fields["contextDigest"])
+
+    for i in range(2, 8):
+        history.append("user", f"m{i}")
+    context.sync(history)
+    fields = context.build_fields(incremental=True)
+
+    # m2..m4 se desalojaron sin llegar al validador: no se manda un delta con hueco
+    assert "contextOffset" not in fields
+    assert "contextId" not in fields
+    assert fields["createContext"] is True
+    assert fields["reason"] == "User: m5\nUser: m6\nUser: m7"
+    assert context.context_id is None
+
+
+def test_evicted_acknowledged_messages_keep_the_delta():
+    history = _history(4, max_messages=3)
+    context = ConversationContext()
+    context.sync(history)
+    context.acknowledge("ctx-1", 4, context.digest)
+
+    history.append("user", "m4")
+    context.sync(history)
+    fields = context.build_fields(incremental=True)
+    assert fields["contextOffset"] == 4
+    assert fields["reason"] == "User: m4"
@@ -0,0 +1,55 @@
+import pytest
+
+from baibysitter.baibysitter_game_sdk.history import CompactHistoryStore, HistoryStore
+
+
+def test_history_store_is_abstract():
+    with pytest.raises(TypeError):
+        HistoryStore()
+
+    class Partial(HistoryStore):
+        def append(self, role, content):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+    assert isinstance(CompactHistoryStore(), HistoryStore)
+
+
+def fill(store, count):
+    for i in range(count):
+        store.append("user" if i % 2 == 0 else "assistant", f"m{i}")
+
+
+def test_eviction_keeps_absolute_indexes():
+    store = CompactHistoryStore(max_messages=3)
+    fill(store, 5)
+    assert (store.total, store.first_index, len(store)) == (5, 2, 3)
+    assert [m["content"] for m in store.get_history()] == ["m2", "m3", "m4"]
+    assert [m["content"] for m in store.get_history(last_n=2)] == ["m3", "m4"]
+    # lo desalojado ya no está: empieza en el primer índice retenido
+    assert store.read_from(0) == (2, store.get_history())
+    assert store.read_from(4) == (4, [{"role": "user", "content": "m4"}])
+    assert store.read_from(9) == (9, [])
+
+
+def test_token_budget_always_keeps_the_newest_message():
+    store = CompactHistoryStore(max_tokens=10)
+    store.append("user", "x" * 20)
+    store.append("user", "y" * 20)
+    assert store.get_history() == [{"role": "user", "content": "y" * 20}]
+    assert store.first_index == 1
+
+
+def test_evicted_messages_are_spilled(tmp_path):
+    store = CompactHistoryStore(max_messages=2, spill_path=str(tmp_path / "spill.jsonl"))
+    fill(store, 5)
+    assert [(m["index"], m["content"]) for m in store.read_spilled()] == [(0, "m0"), (1, "m1"), (2, "m2")]
+
+
+def test_restore_resumes_at_an_offset():
+    store = CompactHistoryStore(max_messages=3)
+    store.restore(10, [{"role": "user", "content": f"m{i}"} for i in range(10, 14)])
+    assert (store.first_index, store.total) == (11, 14)
+    with pytest.raises(ValueError):
+        store.restore(0, [])
@@ -0,0 +1,161 @@
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+from baibysitter.baibysitter_game_sdk.api_v2 import GAMEAPIError
+from baibysitter.baibysitter_game_sdk.history_sink import HistorySink
+
+
+class Client:
+    """save_messages/save_message recording the seqs received per chat"""
+    def __init__(self, batch: bool = True, failure_rate: float = 0.0):
+        self.batch = batch
+        self.failure_rate = failure_rate
+        self.received = {}
+        self.batch_calls = 0
+
+    def save_messages(self, conversation_id, messages):
+        self.batch_calls += 1
+        if not self.batch:
+            raise GAMEAPIError("not found", 404)
+        if random.random() < self.failure_rate:
+            raise GAMEAPIError("unavailable", 503)
+        self.received.setdefault(conversation_id, []).extend(m["seq"] for m in messages)
+
+    def save_message(self, conversation_id, message):
+        if random.random() < self.failure_rate:
+            raise ConnectionError()
+        self.received.setdefault(conversation_id, []).append(message["seq"])
+
+
+def fill(sink, chats: int, messages: int):
+    def produce(conversation_id):
+        for seq in range(messages):
+            sink.add(conversation_id, "user", f"m{seq}", seq)
+
+    threads = [threading.Thread(target=produce, args=(f"chat-{i}",)) for i in range(chats)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_ordered_delivery_with_retries():
+    for batch in (True, False):
+        client = Client(batch, failure_rate=0.3)
+        sink = HistorySink(client, max_batch=10, flush_interval=0.01, max_backoff=0.01, workers=3)
+        fill(sink, chats=4, messages=60)
+        assert sink.close(timeout=10)
+        assert sink.pending == 0
+        for seqs in client.received.values():
+            # al menos una vez y en orden (un lote reintentado puede repetirse)
+            assert sorted(set(seqs)) == list(range(60)) and seqs == sorted(seqs)
+        assert len(client.received) == 4
+
+
+def test_batch_endpoint_fallback_is_remembered():
+    client = Client(batch=False)
+    sink = HistorySink(client, max_batch=5, flush_interval=0.01)
+    fill(sink, chats=1, messages=20)
+    assert sink.close(timeout=5)
+    assert client.received["chat-0"] == list(range(20))
+    assert client.batch_calls == 1
+
+
+def test_rejected_batch_is_dropped_after_max_attempts():
+    class Rejecting(Client):
+        def save_messages(self, conversation_id, messages):
+            if messages[0]["seq"] == 0:
+                self.batch_calls += 1
+                raise GAMEAPIError("unprocessable", 422)
+            super().save_messages(conversation_id, messages)
+
+    client = Rejecting()
+    sink = HistorySink(client, max_batch=2, flush_interval=60, max_backoff=0.01, max_attempts=3)
+    for seq in range(4):
+        sink.add("chat", "user", "m", seq)
+    assert sink.flush("chat", timeout=5)
+    assert client.received["chat"] == [2, 3]
+    assert client.batch_calls == 4
+
+
+def test_non_blocking_add_when_full():
+    release = threading.Event()
+
+    class Stuck(Client):
+        def save_messages(self, conversation_id, messages):
+            release.wait()
+            super().save_messages(conversation_id, messages)
+
+    client = Stuck()
+    sink = HistorySink(client, max_pending=2, flush_interval=0.01)
+    assert sink.add("chat", "user", "a", 0, block=False)
+    assert sink.add("chat", "user", "b", 1, block=False)
+    assert not sink.add("chat", "user", "c", 2, block=False)
+    assert sink.pending == 2
+    release.set()
+    assert sink.close(timeout=5)
+    assert client.received["chat"] == [0, 1]
+
+
+def test_flush_request_ends_when_queue_drains():
+    release = threading.Event()
+
+    class Stuck(Client):
+        def save_messages(self, conversation_id, messages):
+            release.wait()
+            super().save_messages(conversation_id, messages)
+
+    client = Stuck()
+    sink = HistorySink(client, flush_interval=60)
+    ack = sink._ack
+
+    def ack_then_add(conversation_id, count):
+        ack(conversation_id, count)
+        # llega justo después de vaciarse la cola, sin un flush esperando
+        if client.received["chat"] == [0]:
+            sink.add("chat", "user", "late", 1)
+
+    sink._ack = ack_then_add
+    sink.add("chat", "user", "first", 0)
+    assert not sink.flush("chat", timeout=0.05)
+    release.set()
+    time.sleep(0.3)
+    assert client.received["chat"] == [0]
+    assert sink.pending == 1
+    # un flush nuevo sí lo manda
+    assert sink.flush("chat", timeout=5)
+    assert client.received["chat"] == [0, 1]
+
+
+def test_async_chat_does_not_block_the_event_loop_on_a_full_sink():
+    pytest.importorskip("baibysitter.baibysitter_game_sdk.custom_types")
+    from baibysitter.baibysitter_game_sdk.async_chat_agent import AsyncChat
+
+    release = threading.Event()
+
+    class Stuck(Client):
+        def save_messages(self, conversation_id, messages):
+            release.wait()
+            super().save_messages(conversation_id, messages)
+
+    client = Stuck()
+    sink = HistorySink(client, max_pending=1, flush_interval=0.01)
+    chat = AsyncChat("chat", client=None, history_sink=sink)
+
+    async def main():
+        await chat._aadd_message("user", "a")
+        adding = asyncio.create_task(chat._aadd_message("assistant", "b"))
+        # el loop sigue libre mientras add espera sitio en un hilo
+        await asyncio.sleep(0.05)
+        assert not adding.done()
+        release.set()
+        await adding
+
+    asyncio.run(main())
+    assert sink.close(timeout=5)
+    assert client.received["chat"] == [0, 1]
+    assert [m["content"] for m in chat.get_history()] == ["a", "b"]
@@ -0,0 +1,73 @@
+import threading
+
+from baibysitter.baibysitter_game_sdk.nonce import NonceManager
+
+WALLET = "0x" + "ab" * 20
+
+
+class Node:
+    """w3 stand-in: eth.get_transaction_count returns self.pending"""
+    def __init__(self, pending: int):
+        self.pending = pending
+        self.calls = 0
+        self.eth = self
+
+    def get_transaction_count(self, address, block_identifier):
+        assert block_identifier == "pending"
+        self.calls += 1
+        return self.pending
+
+
+def test_concurrent_reservations_are_unique_and_read_the_node_once():
+    node = Node(7)
+    nonces = NonceManager(node)
+    reserved = []
+    lock = threading.Lock()
+
+    def reserve():
+        nonce = nonces.reserve(WALLET)
+        with lock:
+            reserved.append(nonce)
+
+    threads = [threading.Thread(target=reserve) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(reserved) == list(range(7, 57))
+    assert node.calls == 1
+    # el mismo wallet con otra capitalización
+    assert nonces.peek("0x" + WALLET[2:].upper()) == 57
+
+
+def test_released_nonces_are_reused_without_gaps():
+    nonces = NonceManager(Node(0))
+    a, b, c = (nonces.reserve(WALLET) for _ in range(3))
+    nonces.release(WALLET, b)
+    assert nonces.reserve(WALLET) == b
+    nonces.confirm(WALLET, a)
+    # confirmado ya no se puede devolver
+    nonces.release(WALLET, a)
+    assert nonces.peek(WALLET) == 3
+
+
+def test_releasing_the_tail_shrinks_next_nonce():
+    nonces = NonceManager(Node(0))
+    reserved = [nonces.reserve(WALLET) for _ in range(4)]
+    nonces.release(WALLET, reserved[2])
+    nonces.release(WALLET, reserved[3])
+    assert nonces.peek(WALLET) == 2
+    assert nonces.reserve(WALLET) == 2 and nonces.reserve(WALLET) == 3
+
+
+def test_resync_reloads_from_the_node():
+    node = Node(5)
+    nonces = NonceManager(node)
+    assert nonces.reserve(WALLET) == 5
+    nonces.reserve(WALLET)
+    node.pending = 9
+    assert nonces.resync(WALLET) == 9
+    # lo que estaba en vuelo se olvida, release no abre huecos
+    nonces.release(WALLET, 6)
+    assert nonces.reserve(WALLET) == 9
+    assert node.calls == 2
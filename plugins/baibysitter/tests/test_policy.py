@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter
+from baibysitter.baibysitter_game_sdk.calldata import erc20_transfer, raw_call
+from baibysitter.baibysitter_game_sdk.policy import APPROVE, ESCALATE, REJECT, PolicyEngine
+from baibysitter.baibysitter_game_sdk.transactions import ETH, Token
+
+from conftest import ALICE, BOB, MALLORY, WALLET
+
+USDC = Token("USDC", 6, "0x036CbD53842c5426634e7929541eC2318f3dCF7e")
+
+
+def test_decisions():
+    policy = PolicyEngine(allowlist={ALICE: 0.5}, denylist=[MALLORY], max_amount=10)
+    assert policy.evaluate(WALLET, ALICE, 0.1).decision == APPROVE
+    assert policy.evaluate(WALLET, ALICE, 0.6).decision == ESCALATE
+    assert policy.evaluate(WALLET, BOB, 0.1).decision == ESCALATE
+    assert policy.evaluate(WALLET, MALLORY, 0.1).rule == "denylist"
+    assert policy.evaluate(WALLET, BOB, 11).rule == "max_amount"
+    assert policy.evaluate(WALLET, "0x12", 1).rule == "invalid_address"
+    for amount in (0, -1, "nan"):
+        assert policy.evaluate(WALLET, BOB, amount).rule == "invalid_amount"
+    assert policy.stats()["total"] == 9
+
+
+def test_reservation_counts_and_releases():
+    policy = PolicyEngine(spend_windows=[(60, 1.0)])
+    first, reservation = policy.evaluate_and_reserve(WALLET, BOB, ETH.to_units(0.9))
+    assert first.decision == ESCALATE
+    second, none = policy.evaluate_and_reserve(WALLET, BOB, ETH.to_units(0.9))
+    assert (second.rule, none) == ("spend_window", None)
+    reservation.release()
+    reservation.release()  # liberar dos veces no descuenta de más
+    assert policy.evaluate_and_reserve(WALLET, BOB, ETH.to_units(0.9))[0].decision == ESCALATE
+    assert policy.evaluate_value(WALLET, BOB, ETH.to_units(0.2)).rule == "spend_window"
+
+
+def test_spend_windows_are_per_wallet():
+    policy = PolicyEngine(spend_windows=[(60, 1.0)])
+    policy.record_spend(WALLET, 1.0)
+    assert policy.evaluate(WALLET, BOB, 0.1).rule == "spend_window"
+    assert policy.evaluate("0x" + "22" * 20, BOB, 0.1).decision == ESCALATE
+
+
+def test_batch_cannot_overspend(mock_server, chat):
+    babysitter = Babysitter(mock_server.validator_url, policy=PolicyEngine(spend_windows=[(60, 1.0)]))
+    verdicts = babysitter.validate_transactions(WALLET, [(ALICE, 0.9), (BOB, 0.9)], chat)
+    assert [approved for approved, _ in verdicts] == [True, False]
+    assert "spend" in verdicts[1][1]
+
+
+def test_concurrent_transfers_cannot_overspend(mock_server, chat):
+    babysitter = Babysitter(mock_server.validator_url, policy=PolicyEngine(spend_windows=[(60, 1.0)]))
+    approved = []
+
+    def send():
+        approved.append(babysitter.validate_transaction(WALLET, BOB, 0.3, chat)[0])
+
+    threads = [threading.Thread(target=send) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(approved) == 3
+
+
+@pytest.mark.mock_config(blocked_addresses={BOB})
+def test_remote_rejection_releases_reservation(mock_server, chat):
+    babysitter = Babysitter(mock_server.validator_url, policy=PolicyEngine(spend_windows=[(60, 1.0)]))
+    assert babysitter.validate_transaction(WALLET, BOB, 0.9, chat)[0] is False
+    assert babysitter.validate_transaction(WALLET, ALICE, 0.9, chat)[0] is True
+
+
+@pytest.mark.mock_config(validator_error_rate=1.0)
+def test_validator_error_releases_reservation(mock_server, chat):
+    from baibysitter.baibysitter_game_sdk.resilience import NO_RETRY
+    policy = PolicyEngine(spend_windows=[(60, 1.0)])
+    babysitter = Babysitter(mock_server.validator_url, policy=policy, retry_policy=NO_RETRY)
+    approved, message = babysitter.validate_transaction(WALLET, BOB, 0.9, chat)
+    assert not approved and "error" in message.lower()
+    assert policy.evaluate(WALLET, BOB, 0.9).decision == ESCALATE
+
+
+def test_policy_token_must_match_babysitter_token():
+    with pytest.raises(ValueError):
+        Babysitter("http://validator.invalid", token=USDC, policy=PolicyEngine(max_amount=100))
+    Babysitter("http://validator.invalid", token=USDC, policy=PolicyEngine(max_amount=100, token=USDC))
+
+
+def test_erc20_calls_on_policy_token_are_checked_locally(mock_server, chat):
+    policy = PolicyEngine(denylist=[MALLORY], spend_windows=[(60, 1.0)], token=USDC)
+    babysitter = Babysitter(mock_server.validator_url, policy=policy, token=USDC)
+    transfer = erc20_transfer(USDC)
+    verdicts = babysitter.validate_txs(
+        WALLET,
+        [transfer(MALLORY, 0.1), transfer(BOB, 0.9), transfer(BOB, 0.9), raw_call(BOB, "0xdeadbeef")],
+        chat,
+    )
+    assert [approved for approved, _ in verdicts] == [False, True, False, True]
+    assert mock_server.stats.as_dict()["requests"]["validate"] == 1
+
+
+def test_erc20_builders_need_a_contract():
+    with pytest.raises(ValueError):
+        erc20_transfer(ETH)
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from baibysitter.baibysitter_game_sdk.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    acall_with_retry,
+    call_with_retry,
+)
+
+
+class Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+        self.headers = {}
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+
+def sender(*outcomes):
+    """send() that raises or returns the outcomes in order, counting calls"""
+    calls = []
+
+    def send():
+        calls.append(1)
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return Response(outcome)
+
+    return send, calls
+
+
+FAST = dict(max_attempts=3, base_delay=0.001)
+
+
+def test_retries_statuses_and_exceptions():
+    send, calls = sender(ConnectionError(), 503, 200)
+    assert call_with_retry(send, RetryPolicy(**FAST)).status_code == 200
+    assert len(calls) == 3
+
+
+def test_last_retryable_response_is_returned():
+    send, calls = sender(503, 503, 503)
+    assert call_with_retry(send, RetryPolicy(**FAST)).status_code == 503
+    assert len(calls) == 3
+
+
+def test_retry_if_narrows_retry_exceptions():
+    policy = RetryPolicy(retry_if=lambda exc: "connect" in str(exc), **FAST)
+    send, calls = sender(ConnectionError("connect refused"), ConnectionError("dropped after send"))
+    with pytest.raises(ConnectionError, match="dropped"):
+        call_with_retry(send, policy)
+    assert len(calls) == 2
+
+
+def test_retry_if_async():
+    policy = RetryPolicy(retry_if=lambda exc: False, **FAST)
+    calls = []
+
+    async def send():
+        calls.append(1)
+        raise ConnectionError()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(acall_with_retry(send, policy))
+    assert len(calls) == 1
+
+
+def test_other_exceptions_are_not_retried_but_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    send, calls = sender(ValueError())
+    with pytest.raises(ValueError):
+        call_with_retry(send, RetryPolicy(**FAST), breaker)
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(send, RetryPolicy(**FAST), breaker)
+    assert len(calls) == 1
@@ -0,0 +1,37 @@
+import pytest
+
+from baibysitter.baibysitter_game_sdk.sessions import SessionStore, SQLiteSessionStore
+
+
+def messages(*contents):
+    return [{"role": "user", "content": content} for content in contents]
+
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+    class Partial(SessionStore):
+        def save_session(self, chat_id, meta):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_sqlite_store_round_trip(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    store.save_session("chat", {"partner_id": "p1"})
+    store.append_messages("chat", 0, messages("a", "b", "c"))
+    # reintentar un checkpoint no duplica mensajes
+    store.append_messages("chat", 2, messages("c", "d"))
+    assert store.message_count("chat") == 4
+    assert store.read_range("chat", 1, 2) == messages("b", "c")
+    assert store.read_recent("chat", 2) == (2, messages("c", "d"))
+    store.close()
+
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+    assert store.load_session("chat") == {"partner_id": "p1"}
+    store.delete_session("chat")
+    assert store.load_session("chat") is None and store.message_count("chat") == 0
+    store.close()
@@ -0,0 +1,43 @@
+import pytest
+
+from baibysitter.baibysitter_game_sdk.sharding import HashRing, ShardApp
+
+
+def test_shard_app_needs_open_chat():
+    with pytest.raises(TypeError):
+        ShardApp(0)
+
+    class Shard(ShardApp):
+        def open_chat(self, wallet_address, partner_id, partner_name):
+            return (self.shard_id, wallet_address)
+
+    assert Shard(3).open_chat("0xabc", "p", "P") == (3, "0xabc")
+
+
+def wallets(count):
+    return [f"0x{i:040x}" for i in range(count)]
+
+
+def test_hash_ring_is_stable_and_case_insensitive():
+    ring = HashRing(8)
+    assert [ring.shard_for(w) for w in wallets(200)] == [HashRing(8).shard_for(w) for w in wallets(200)]
+    wallet = "0xAbCdEf0000000000000000000000000000000001"
+    assert ring.shard_for(wallet) == ring.shard_for(wallet.lower())
+
+
+def test_hash_ring_growth_moves_few_wallets():
+    before, after = HashRing(8), HashRing(9)
+    moved = [w for w in wallets(5000) if before.shard_for(w) != after.shard_for(w)]
+    # lo ideal es 1/9 (~11%), todos se van al shard nuevo
+    assert len(moved) < 5000 * 0.2
+    assert {after.shard_for(w) for w in moved} == {8}
+
+
+def test_hash_ring_spreads_load():
+    ring = HashRing(4)
+    counts = [0] * 4
+    for wallet in wallets(4000):
+        counts[ring.shard_for(wallet)] += 1
+    assert min(counts) > 4000 / 4 * 0.6
+    with pytest.raises(ValueError):
+        HashRing(0)
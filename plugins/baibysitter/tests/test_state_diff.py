@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("baibysitter.baibysitter_game_sdk.custom_types")
+
+from baibysitter.baibysitter_game_sdk.async_api_v2 import AsyncGAMEClientV2
+from baibysitter.baibysitter_game_sdk.async_chat_agent import AsyncChat
+
+
+def run_turns(server, states, between=None):
+    """Runs one turn per state, returns what each update_chat request carried"""
+    sent = []
+
+    async def main():
+        client = AsyncGAMEClientV2("key", base_url=server.game_url)
+        update_chat = client.update_chat
+
+        async def recording(conversation_id, data):
+            sent.append(data)
+            return await update_chat(conversation_id, data)
+
+        client.update_chat = recording
+        chat_id = await client.create_chat({"prompt": "p", "partner_id": "u", "partner_name": "U"})
+        current = {}
+        chat = AsyncChat(chat_id, client, get_state_fn=lambda: current, state_diff=True)
+        for turn, state in enumerate(states):
+            if between is not None:
+                between(turn)
+            current = state
+            await chat.next(f"turn {turn}")
+        await client.aclose()
+        return chat_id
+
+    return asyncio.run(main()), sent
+
+
+def test_patches_after_the_server_confirms(mock_server):
+    states = [{"balance": 1, "tier": "a"}, {"balance": 2, "tier": "a"}, {"balance": 2}]
+    chat_id, sent = run_turns(mock_server, states)
+    assert sent[0]["state"] == states[0] and "state_patch" not in sent[0]
+    assert sent[1]["state_patch"] == {"set": {"balance": 2}, "unset": []}
+    assert sent[2]["state_patch"] == {"set": {}, "unset": ["tier"]}
+    assert mock_server.state(chat_id) == states[2]
+
+
+def test_unknown_base_falls_back_to_full_state(mock_server):
+    def server_forgets(turn):
+        if turn == 2:
+            # el servidor perdió el estado (reinicio): el parche no tiene base
+            with mock_server._lock:
+                mock_server._states.clear()
+
+    states = [{"balance": 1}, {"balance": 2}, {"balance": 3}, {"balance": 4}]
+    chat_id, sent = run_turns(mock_server, states, server_forgets)
+    assert "state_patch" in sent[2]
+    assert sent[3]["state"] == {"balance": 3} and "state_patch" not in sent[3]
+    assert "state_patch" in sent[4]
+    assert mock_server.state(chat_id) == {"balance": 4}
+
+
+@pytest.mark.mock_config(state_diff=False)
+def test_server_without_diffs_always_gets_the_full_state(mock_server):
+    states = [{"balance": 1}, {"balance": 2}, {"balance": 3}]
+    _, sent = run_turns(mock_server, states)
+    assert [data.get("state") for data in sent] == states
+    assert not any("state_patch" in data for data in sent)
@@ -0,0 +1,25 @@
+from decimal import Decimal
+
+import pytest
+
+from baibysitter.baibysitter_game_sdk.transactions import ETH, Token
+
+USDC = Token("USDC", 6, "0x036CbD53842c5426634e7929541eC2318f3dCF7e")
+
+
+def test_to_units_is_exact():
+    assert ETH.to_units(0.1) == 10 ** 17
+    assert ETH.to_units("1.000000000000000001") == 10 ** 18 + 1
+    assert USDC.to_units(1.5) == 1_500_000
+    assert USDC.from_units(1_500_000) == Decimal("1.5")
+
+
+@pytest.mark.parametrize("amount", ["nan", "inf", "abc"])
+def test_to_units_rejects_non_numbers(amount):
+    with pytest.raises(ValueError):
+        ETH.to_units(amount)
+
+
+def test_is_native():
+    assert ETH.is_native
+    assert not USDC.is_native
@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("baibysitter.baibysitter_game_sdk.custom_types")
+
+from baibysitter.baibysitter_game_sdk.baibysitter import Babysitter
+from baibysitter.baibysitter_game_sdk.transactions import Token
+from baibysitter.baibysitter_game_sdk.tx_prep import wrap_send_native_pipelined
+
+USDC = Token("USDC", 6, "0x036CbD53842c5426634e7929541eC2318f3dCF7e")
+
+
+def test_pipelined_send_rejects_erc20_babysitter():
+    babysitter = Babysitter("http://validator.invalid", token=USDC)
+    with pytest.raises(ValueError):
+        wrap_send_native_pipelined(preparer=None, babysitter=babysitter, account=None, chat=None)
+
+
+def test_pipelined_send_with_native_babysitter():
+    babysitter = Babysitter("http://validator.invalid")
+    assert callable(wrap_send_native_pipelined(preparer=None, babysitter=babysitter, account=None, chat=None))